@@ -11,4 +11,16 @@ class PetSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Pet
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+class PetListSerializer(serializers.ModelSerializer):
+    """Pet summary for list views; medical record bodies are only in the detail view."""
+    medical_record_count = serializers.IntegerField(read_only=True)
+    last_visit = serializers.DateTimeField(read_only=True)
+
+    class Meta:
+        model = Pet
+        fields = [
+            'id', 'name', 'owner', 'species', 'breed', 'age', 'weight',
+            'created_at', 'updated_at', 'medical_record_count', 'last_visit'
+        ]
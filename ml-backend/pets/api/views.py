@@ -1,18 +1,37 @@
+from django.db.models import Count, Max, Prefetch
 from rest_framework import viewsets
 from pets.models import Pet, MedicalRecord
-from .serializers import PetSerializer, MedicalRecordSerializer
+from .pagination import StandardResultsSetPagination
+from .serializers import PetSerializer, PetListSerializer, MedicalRecordSerializer
 
 class PetViewSet(viewsets.ModelViewSet):
     serializer_class = PetSerializer
+    pagination_class = StandardResultsSetPagination
 
     def get_queryset(self):
-        return Pet.objects.filter(owner=self.request.user)
+        queryset = Pet.objects.filter(owner=self.request.user).order_by('name', 'id')
+        if self.action == 'list':
+            # Summary columns computed in the same query as the pets
+            return queryset.annotate(
+                medical_record_count=Count('medical_records'),
+                last_visit=Max('medical_records__date')
+            )
+        # One extra query for every pet's records instead of one per pet
+        return queryset.prefetch_related(
+            Prefetch('medical_records', queryset=MedicalRecord.objects.order_by('-date'))
+        )
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return PetListSerializer
+        return PetSerializer
 
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
 class MedicalRecordViewSet(viewsets.ModelViewSet):
     serializer_class = MedicalRecordSerializer
+    pagination_class = StandardResultsSetPagination
 
     def get_queryset(self):
-        return MedicalRecord.objects.filter(pet__owner=self.request.user)
\ No newline at end of file
+        return MedicalRecord.objects.for_owner(self.request.user)
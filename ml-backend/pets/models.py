@@ -1,6 +1,11 @@
 from django.db import models
 from django.conf import settings
 
+class MedicalRecordQuerySet(models.QuerySet):
+    def for_owner(self, user):
+        """Records of the user's pets, with each pet fetched in the same query."""
+        return self.filter(pet__owner=user).select_related('pet')
+
 class Pet(models.Model):
     SPECIES_CHOICES = [
         ('dog', 'Dog'),
@@ -22,6 +27,12 @@ class Pet(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Owner's pet list, sorted by name
+            models.Index(fields=['owner', 'name'], name='pet_owner_name_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.species})"
 
@@ -33,5 +44,14 @@ class MedicalRecord(models.Model):
     treatment = models.TextField(blank=True)
     notes = models.TextField(blank=True)
 
+    objects = MedicalRecordQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-date', '-id']
+        indexes = [
+            # A pet's history, newest first
+            models.Index(fields=['pet', '-date'], name='medicalrecord_pet_date_idx'),
+        ]
+
     def __str__(self):
         return f"Medical record for {self.pet.name} - {self.date}"
\ No newline at end of file
@@ -1,3 +1,44 @@
+from django.contrib.auth.models import User
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from pets.models import Pet, MedicalRecord
+
+
+class PetApiQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('owner', password='secret')
+        for i in range(50):
+            pet = Pet.objects.create(name=f'Pet {i:02d}', owner=cls.user, species='dog', breed='Aspin', age=i % 15, weight=10.0)
+            MedicalRecord.objects.bulk_create([
+                MedicalRecord(pet=pet, symptoms=f'Symptoms {j}', diagnosis='Checkup') for j in range(3)
+            ])
+        cls.pet = pet
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_pet_list_query_count(self):
+        # Page count + one page of annotated pets, whatever the number of pets
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/pets/pets/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 50)
+        first = response.data['results'][0]
+        self.assertEqual(first['medical_record_count'], 3)
+        self.assertNotIn('medical_records', first)
+
+    def test_pet_detail_query_count(self):
+        # The pet + its prefetched records
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/pets/pets/{self.pet.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['medical_records']), 3)
+
+    def test_medical_record_list_query_count(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/pets/medical-records/', {'page_size': 200})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 150)
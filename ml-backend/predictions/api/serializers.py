@@ -5,4 +5,4 @@ class PredictionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Prediction
         fields = '__all__'
-        read_only_fields = ['prediction_date', 'is_confirmed', 'confirmed_by']
\ No newline at end of file
+        read_only_fields = ['prediction_date', 'is_confirmed', 'confirmed_by', 'confirmed_at']
\ No newline at end of file
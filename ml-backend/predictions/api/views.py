@@ -1,17 +1,52 @@
+from collections import defaultdict
+
+from django.db import transaction
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from predictions.models import Prediction
+from pets.models import Pet, MedicalRecord
+from pets.api.pagination import StandardResultsSetPagination
 from .serializers import PredictionSerializer
-from ..preprocessors.data_processor import process_input_data
-import tensorflow as tf
-import os
+from ..events import broadcast_predictions
+from ..ml_pipeline import inference_service
+
+# Largest number of animals accepted by one batch request
+MAX_BATCH_SIZE = 1000
+
+
+def build_patient_data(pet, symptoms, medical_record=None):
+    """
+    Build the species model input for a pet.
+
+    Args:
+        pet (Pet): The pet being examined
+        symptoms (str): Free-text symptoms
+        medical_record (MedicalRecord): Record the prediction belongs to
+
+    Returns:
+        dict: Patient information in the training column names
+    """
+    patient_data = {
+        'Breed': pet.breed,
+        'Age (years)': float(pet.age),
+        'Weight (kg)': float(pet.weight),
+        'Symptoms': symptoms,
+    }
+    if medical_record is not None:
+        if medical_record.diagnosis:
+            patient_data['Past Diagnosis'] = medical_record.diagnosis
+        if medical_record.treatment:
+            patient_data['Treatment'] = medical_record.treatment
+    return patient_data
+
 
 class PredictionViewSet(viewsets.ModelViewSet):
     serializer_class = PredictionSerializer
-    
+    pagination_class = StandardResultsSetPagination
+
     def get_queryset(self):
-        return Prediction.objects.filter(pet__owner=self.request.user)
+        return Prediction.objects.for_owner(self.request.user)
 
     @action(detail=False, methods=['post'])
     def predict(self, request):
@@ -21,28 +56,32 @@ class PredictionViewSet(viewsets.ModelViewSet):
             medical_record_id = request.data.get('medical_record_id')
             symptoms = request.data.get('symptoms', '')
 
-            # Process input data
-            processed_data = process_input_data(symptoms)
+            pet = Pet.objects.get(id=pet_id, owner=request.user)
+            medical_record = MedicalRecord.objects.get(id=medical_record_id, pet=pet)
+            if not symptoms:
+                symptoms = medical_record.symptoms
 
-            # Load the model
-            model_path = os.path.join('predictions', 'ml_models', 'pet_disease_model.h5')
-            model = tf.keras.models.load_model(model_path)
+            # Score with the pet's species model
+            patient_data = build_patient_data(pet, symptoms, medical_record)
+            predictions, model_version = inference_service.predict(pet.species, patient_data)
 
-            # Make prediction
-            prediction = model.predict(processed_data)
-            
-            # Get the predicted disease (you'll need to map the prediction to disease names)
-            diseases = ['Disease1', 'Disease2', 'Disease3']  # Replace with your actual disease classes
-            predicted_disease = diseases[prediction.argmax()]
-            confidence_score = float(prediction.max())
+            predicted_disease, confidence_score = predictions[0]
 
             # Create prediction record
             prediction_obj = Prediction.objects.create(
-                pet_id=pet_id,
-                medical_record_id=medical_record_id,
+                pet=pet,
+                medical_record=medical_record,
                 predicted_disease=predicted_disease,
                 confidence_score=confidence_score,
-                details={'raw_prediction': prediction.tolist()}
+                details={
+                    'species': pet.species,
+                    'model_version': model_version,
+                    'top_predictions': [
+                        {'disease': disease, 'probability': probability}
+                        for disease, probability in predictions
+                    ],
+                    'diagnostics': inference_service.get_recommended_diagnostics(predictions, pet.species)
+                }
             )
 
             return Response({
@@ -52,8 +91,110 @@ class PredictionViewSet(viewsets.ModelViewSet):
                 'details': prediction_obj.details
             })
 
+        except (Pet.DoesNotExist, MedicalRecord.DoesNotExist):
+            return Response(
+                {'error': 'Pet or medical record not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
         except Exception as e:
             return Response(
                 {'error': str(e)},
                 status=status.HTTP_400_BAD_REQUEST
-            )
\ No newline at end of file
+            )
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """
+        Score many animals in one request.
+
+        Expects ``{"items": [{"pet_id", "medical_record_id", "symptoms"}, ...]}``.
+        Items are grouped by species and each group is scored with a single
+        ``predict_proba`` call; all predictions are saved with one
+        ``bulk_create``, announced to the owners' prediction-events groups
+        and returned as one result per item, in input order.
+        """
+        items = request.data.get('items')
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'items must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > MAX_BATCH_SIZE:
+            return Response(
+                {'error': f'At most {MAX_BATCH_SIZE} items can be scored per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = [None] * len(items)
+        item_ids = {}
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                results[index] = {'index': index, 'error': 'Item must be an object'}
+                continue
+            try:
+                item_ids[index] = (int(item.get('pet_id')), int(item.get('medical_record_id')))
+            except (TypeError, ValueError):
+                results[index] = {'index': index, 'error': 'pet_id and medical_record_id must be integers'}
+
+        # Two queries for the whole batch instead of two per item
+        pets = Pet.objects.filter(owner=request.user).in_bulk({pet_id for pet_id, _ in item_ids.values()})
+        records = MedicalRecord.objects.filter(pet__owner=request.user).in_bulk(
+            {record_id for _, record_id in item_ids.values()}
+        )
+
+        groups = defaultdict(list)
+        for index, (pet_id, record_id) in item_ids.items():
+            item = items[index]
+            pet = pets.get(pet_id)
+            record = records.get(record_id)
+            if pet is None or record is None or record.pet_id != pet.id:
+                results[index] = {'index': index, 'error': 'Pet or medical record not found'}
+                continue
+            symptoms = item.get('symptoms') or record.symptoms
+            groups[pet.species.lower()].append((index, pet, record, build_patient_data(pet, symptoms, record)))
+
+        # One vectorized call per species
+        scored = []
+        for species, group in groups.items():
+            try:
+                group_predictions, model_version = inference_service.predict_batch(
+                    species, [patient_data for _, _, _, patient_data in group]
+                )
+            except Exception as e:
+                for index, _, _, _ in group:
+                    results[index] = {'index': index, 'error': str(e)}
+                continue
+
+            for (index, pet, record, _), predictions in zip(group, group_predictions):
+                # Rows that failed to encode or score come back as exceptions
+                if isinstance(predictions, Exception):
+                    results[index] = {'index': index, 'error': str(predictions)}
+                    continue
+                scored.append((index, Prediction(
+                    pet=pet,
+                    medical_record=record,
+                    predicted_disease=predictions[0][0],
+                    confidence_score=predictions[0][1],
+                    details={
+                        'species': species,
+                        'model_version': model_version,
+                        'top_predictions': [
+                            {'disease': disease, 'probability': probability}
+                            for disease, probability in predictions
+                        ],
+                        'diagnostics': inference_service.get_recommended_diagnostics(predictions, species)
+                    }
+                )))
+
+        created = Prediction.objects.bulk_create([prediction for _, prediction in scored])
+        # bulk_create skips post_save, so announce the whole batch at once
+        if created:
+            transaction.on_commit(lambda: broadcast_predictions(created))
+        for (index, _), prediction_obj in zip(scored, created):
+            results[index] = {
+                'index': index,
+                'id': prediction_obj.id,
+                'pet_id': prediction_obj.pet_id,
+                'predicted_disease': prediction_obj.predicted_disease,
+                'confidence_score': prediction_obj.confidence_score,
+                'details': prediction_obj.details
+            }
+
+        return Response({'results': results})
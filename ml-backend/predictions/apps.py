@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class PredictionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'predictions'
+
+    def ready(self):
+        # Announce new predictions to subscribed clinicians
+        from . import signals  # noqa: F401
+
+        # Load the species models at startup instead of on the first request
+        if getattr(settings, 'PREDICTION_MODEL_WARM_UP', False):
+            from .ml_pipeline import inference_service
+            inference_service.warm_up()
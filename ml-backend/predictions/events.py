@@ -0,0 +1,54 @@
+from collections import defaultdict
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+# Clinicians subscribe to the group of the owner whose pets they follow
+PREDICTION_EVENTS_GROUP = 'prediction_events'
+
+
+def prediction_events_group(user_id):
+    """Channel-layer group that receives new predictions for a user's pets."""
+    return f"{PREDICTION_EVENTS_GROUP}.user.{user_id}"
+
+
+def prediction_event(prediction):
+    """JSON-serializable summary of a prediction for subscribers."""
+    return {
+        'id': prediction.id,
+        'pet_id': prediction.pet_id,
+        'medical_record_id': prediction.medical_record_id,
+        'predicted_disease': prediction.predicted_disease,
+        'confidence_score': prediction.confidence_score,
+        'prediction_date': prediction.prediction_date.isoformat() if prediction.prediction_date else None,
+        'details': prediction.details
+    }
+
+
+def broadcast_predictions(predictions):
+    """
+    Send new predictions to the prediction-events group of each pet owner.
+
+    One message is sent per owner, however many predictions they received,
+    so a bulk import doesn't flood the channel layer. Failures are logged
+    rather than raised; the predictions are already saved.
+
+    Args:
+        predictions (list): Saved Prediction objects with their pet loaded
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None or not predictions:
+        return
+
+    by_owner = defaultdict(list)
+    for prediction in predictions:
+        by_owner[prediction.pet.owner_id].append(prediction_event(prediction))
+
+    for owner_id, events in by_owner.items():
+        try:
+            async_to_sync(channel_layer.group_send)(prediction_events_group(owner_id), {
+                'type': 'prediction.created',
+                'predictions': events
+            })
+        except Exception as e:
+            print(f"Error broadcasting predictions to user {owner_id}: {str(e)}")
@@ -0,0 +1,123 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from rest_framework.test import APIClient
+
+from pets.models import Pet, MedicalRecord
+from predictions.models import Prediction
+
+BENCHMARK_USER_PREFIX = 'benchmark_owner_'
+DISEASES = ['Parvovirus', 'Heatstroke', 'Mange', 'Otitis', 'Gastroenteritis', 'Kennel Cough']
+
+
+class Command(BaseCommand):
+    help = 'Seed a database with predictions and time the prediction and medical-record list endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true',
+                            help='Create benchmark owners, pets, records and predictions first')
+        parser.add_argument('--predictions', type=int, default=1000000,
+                            help='Number of predictions to seed')
+        parser.add_argument('--owners', type=int, default=100,
+                            help='Number of owners to seed')
+        parser.add_argument('--pets-per-owner', type=int, default=20,
+                            help='Number of pets per seeded owner')
+        parser.add_argument('--runs', type=int, default=20,
+                            help='Requests timed per endpoint')
+        parser.add_argument('--cleanup', action='store_true',
+                            help='Delete the benchmark data afterwards')
+
+    def handle(self, *args, **options):
+        if options['seed']:
+            self.seed(options['predictions'], options['owners'], options['pets_per_owner'])
+
+        owner = User.objects.filter(username__startswith=BENCHMARK_USER_PREFIX).order_by('id').first()
+        if owner is None:
+            self.stderr.write('No benchmark data found; run with --seed first')
+            return
+
+        self.stdout.write(f"Predictions in database: {Prediction.objects.count()}")
+        self.stdout.write(f"Predictions for {owner.username}: {Prediction.objects.for_owner(owner).count()}")
+
+        # Show that the history queries are served from the new indexes
+        pet = Pet.objects.filter(owner=owner).first()
+        self.stdout.write('\nQuery plans:')
+        self.stdout.write(f"Owner's predictions:\n{Prediction.objects.for_owner(owner)[:50].explain()}")
+        self.stdout.write(f"Pet's prediction history:\n{Prediction.objects.filter(pet=pet)[:50].explain()}")
+        self.stdout.write(f"Pet's medical history:\n{MedicalRecord.objects.filter(pet=pet)[:50].explain()}")
+
+        client = APIClient()
+        client.force_authenticate(owner)
+        self.stdout.write('\nList endpoint latency:')
+        for url in ['/api/predictions/predictions/', '/api/pets/medical-records/', '/api/pets/pets/']:
+            self.time_endpoint(client, url, options['runs'])
+
+        if options['cleanup']:
+            self.stdout.write('Deleting benchmark data...')
+            User.objects.filter(username__startswith=BENCHMARK_USER_PREFIX).delete()
+
+    def time_endpoint(self, client, url, runs):
+        client.get(url)  # Warm caches
+        timings = []
+        for _ in range(runs):
+            start_time = time.perf_counter()
+            response = client.get(url)
+            timings.append((time.perf_counter() - start_time) * 1000)
+            if response.status_code != 200:
+                self.stderr.write(f"{url} returned {response.status_code}")
+                return
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(f"{url}: median {statistics.median(timings):.1f} ms, p95 {p95:.1f} ms")
+
+    def seed(self, n_predictions, n_owners, pets_per_owner, batch_size=10000):
+        rng = random.Random(42)
+        self.stdout.write(f"Seeding {n_owners} owners, {n_owners * pets_per_owner} pets and {n_predictions} predictions...")
+        start_time = time.perf_counter()
+
+        with transaction.atomic():
+            User.objects.bulk_create([
+                User(username=f"{BENCHMARK_USER_PREFIX}{i}") for i in range(n_owners)
+            ], ignore_conflicts=True)
+            owners = list(User.objects.filter(username__startswith=BENCHMARK_USER_PREFIX))
+
+            Pet.objects.bulk_create([
+                Pet(name=f"Pet {i}", owner=owner, species=rng.choice(['dog', 'cat', 'rabbit']),
+                    breed='Mixed', age=rng.randint(0, 15), weight=rng.uniform(1, 40))
+                for owner in owners for i in range(pets_per_owner)
+            ], batch_size=batch_size)
+            pet_ids = list(Pet.objects.filter(owner__in=owners).values_list('id', flat=True))
+
+            MedicalRecord.objects.bulk_create([
+                MedicalRecord(pet_id=pet_id, symptoms='Vomiting, lethargy', diagnosis='Checkup')
+                for pet_id in pet_ids
+            ], batch_size=batch_size)
+            record_by_pet = dict(MedicalRecord.objects.filter(pet_id__in=pet_ids).values_list('pet_id', 'id'))
+
+        created = 0
+        while created < n_predictions:
+            count = min(batch_size, n_predictions - created)
+            with transaction.atomic():
+                batch = []
+                for _ in range(count):
+                    pet_id = rng.choice(pet_ids)
+                    batch.append(Prediction(
+                        pet_id=pet_id,
+                        medical_record_id=record_by_pet[pet_id],
+                        predicted_disease=rng.choice(DISEASES),
+                        confidence_score=rng.random(),
+                        details={}
+                    ))
+                Prediction.objects.bulk_create(batch)
+            created += count
+            self.stdout.write(f"  {created}/{n_predictions}", ending='\r')
+        self.stdout.write('')
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        self.stdout.write(f"Seeded in {time.perf_counter() - start_time:.1f} s")
@@ -0,0 +1,102 @@
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, connections, transaction, OperationalError
+
+from pets.models import Pet, MedicalRecord
+from predictions.models import Prediction
+
+LOAD_TEST_USERNAME = 'load_test_owner'
+
+# Django's stock SQLite setup: rollback journal, deferred transactions, 5 s timeout
+SQLITE_BASELINE_OPTIONS = {'timeout': 5}
+
+
+class Command(BaseCommand):
+    help = 'Create predictions from concurrent threads and report throughput and lock errors'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8,
+                            help='Number of concurrent writers')
+        parser.add_argument('--writes', type=int, default=200,
+                            help='Predictions created by each writer')
+        parser.add_argument('--no-baseline', action='store_true',
+                            help="Skip the run with Django's default SQLite settings")
+
+    def handle(self, *args, **options):
+        owner, _ = User.objects.get_or_create(username=LOAD_TEST_USERNAME)
+        pet = Pet.objects.create(name='Load test', owner=owner, species='dog', breed='Mixed', age=3, weight=10.0)
+        record = MedicalRecord.objects.create(pet=pet, symptoms='Vomiting')
+
+        try:
+            if connection.vendor == 'sqlite' and not options['no_baseline']:
+                configured_options = connection.settings_dict['OPTIONS']
+                try:
+                    connection.settings_dict['OPTIONS'] = SQLITE_BASELINE_OPTIONS
+                    self.set_journal_mode('DELETE')
+                    self.run_load('SQLite defaults', pet, record, options['threads'], options['writes'])
+                finally:
+                    connection.settings_dict['OPTIONS'] = configured_options
+                    connection.close()
+
+            self.run_load(f'Configured ({connection.vendor})', pet, record, options['threads'], options['writes'])
+        finally:
+            owner.delete()
+
+    def set_journal_mode(self, mode):
+        connection.close()
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA journal_mode={mode}')
+        connection.close()
+
+    def run_load(self, label, pet, record, n_threads, n_writes):
+        """Run n_threads writers, each creating n_writes predictions in its own transactions."""
+        errors = []
+        latencies = []
+        lock = threading.Lock()
+        # Start every writer at once to maximise contention
+        barrier = threading.Barrier(n_threads)
+
+        def writer():
+            barrier.wait()
+            try:
+                for _ in range(n_writes):
+                    start_time = time.perf_counter()
+                    try:
+                        # Read then write, like the predict endpoint does
+                        with transaction.atomic():
+                            Pet.objects.get(id=pet.id)
+                            Prediction.objects.create(
+                                pet_id=pet.id,
+                                medical_record_id=record.id,
+                                predicted_disease='Load test',
+                                confidence_score=0.5
+                            )
+                    except OperationalError as e:
+                        with lock:
+                            errors.append(str(e))
+                        continue
+                    with lock:
+                        latencies.append(time.perf_counter() - start_time)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=writer) for _ in range(n_threads)]
+        start_time = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start_time
+
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0
+        lock_errors = sum('locked' in error for error in errors)
+        self.stdout.write(
+            f"{label}: {len(latencies)}/{n_threads * n_writes} writes in {elapsed:.2f} s "
+            f"({len(latencies) / elapsed:.0f} writes/s, p95 {p95:.1f} ms), "
+            f"{len(errors)} errors ({lock_errors} 'database is locked')"
+        )
+        return {'writes': len(latencies), 'errors': len(errors), 'lock_errors': lock_errors, 'seconds': elapsed}
@@ -0,0 +1,109 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from pets.models import Pet
+from predictions.models import Prediction
+from predictions.ml_pipeline.feedback_data import (
+    FEEDBACK_DIR_NAME, ID_COLUMN, read_watermark, write_watermark, write_feedback_part
+)
+
+SPECIES_NAMES = dict(Pet.SPECIES_CHOICES)
+
+
+class Command(BaseCommand):
+    help = 'Append predictions confirmed since the last export to the per-species training sets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', type=str,
+                            default=os.path.join(settings.BASE_DIR, 'species_data', FEEDBACK_DIR_NAME),
+                            help='Feedback directory next to the species CSVs')
+        parser.add_argument('--chunk-size', type=int, default=2000,
+                            help='Rows fetched per database round trip and written per part file')
+        parser.add_argument('--full', action='store_true',
+                            help='Ignore the watermark and export every confirmed prediction')
+
+    def handle(self, *args, **options):
+        output_dir = options['output_dir']
+        chunk_size = options['chunk_size']
+        watermark_at, watermark_id = (None, None) if options['full'] else read_watermark(output_dir)
+
+        # Upper bound so confirmations made during the export wait for the next run
+        export_started = timezone.now()
+
+        # Confirmations set with QuerySet.update() skip Prediction.save() and have no
+        # timestamp; stamp them now so this export picks them up
+        unstamped = Prediction.objects.filter(is_confirmed=True, confirmed_at__isnull=True).update(
+            confirmed_at=export_started
+        )
+        if unstamped:
+            self.stderr.write(f"Stamped {unstamped} confirmed predictions that had no confirmation time")
+
+        queryset = Prediction.objects.filter(
+            is_confirmed=True, confirmed_at__isnull=False, confirmed_at__lte=export_started
+        )
+        if watermark_at is not None:
+            queryset = queryset.filter(
+                Q(confirmed_at__gt=watermark_at) | Q(confirmed_at=watermark_at, id__gt=watermark_id)
+            )
+            self.stdout.write(f"Exporting confirmations after {watermark_at.isoformat()} (id {watermark_id})")
+
+        # One streamed query joining the pet and the medical record
+        rows = queryset.order_by('confirmed_at', 'id').values_list(
+            'id', 'confirmed_at', 'predicted_disease',
+            'pet__species', 'pet__breed', 'pet__age', 'pet__weight',
+            'medical_record__diagnosis', 'medical_record__symptoms', 'medical_record__treatment'
+        ).iterator(chunk_size=chunk_size)
+
+        part_prefix = f"part-{export_started:%Y%m%dT%H%M%S%f}"
+        buffers = {}
+        counts = {}
+        parts = []
+        buffered = 0
+        last = None
+        for (prediction_id, confirmed_at, disease, species, breed, age, weight,
+             diagnosis, symptoms, treatment) in rows:
+            buffers.setdefault(species, []).append({
+                ID_COLUMN: prediction_id,
+                'Pet Species': SPECIES_NAMES.get(species, species.title()),
+                'Breed': breed,
+                'Age (years)': float(age),
+                'Weight (kg)': float(weight),
+                'Past Diagnosis': diagnosis or 'Unknown',
+                'Symptoms': symptoms,
+                'Treatment': treatment or 'Unknown',
+                'Future Disease': disease,
+            })
+            counts[species] = counts.get(species, 0) + 1
+            buffered += 1
+            last = (confirmed_at, prediction_id)
+
+            if buffered >= chunk_size:
+                parts.extend(self.flush(output_dir, buffers, f"{part_prefix}-{len(parts):05d}"))
+                buffered = 0
+
+        parts.extend(self.flush(output_dir, buffers, f"{part_prefix}-{len(parts):05d}"))
+
+        # Only move the watermark once every part is on disk
+        if last is not None:
+            write_watermark(output_dir, *last)
+
+        if not counts:
+            self.stdout.write('No new confirmed predictions')
+            return
+        for species, count in sorted(counts.items()):
+            self.stdout.write(f"{species}: {count} confirmed predictions")
+        for part_path in parts:
+            self.stdout.write(f"Wrote {part_path}")
+
+    def flush(self, output_dir, buffers, part_name):
+        """Write and clear the buffered rows, one part file per species."""
+        part_paths = [
+            write_feedback_part(output_dir, species, species_rows, part_name)
+            for species, species_rows in buffers.items() if species_rows
+        ]
+        buffers.clear()
+        return part_paths
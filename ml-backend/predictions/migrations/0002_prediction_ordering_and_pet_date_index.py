@@ -0,0 +1,22 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pets', '0002_pet_indexes_and_medicalrecord_ordering'),
+        ('predictions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='prediction',
+            options={'ordering': ['-prediction_date', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='prediction',
+            index=models.Index(fields=['pet', '-prediction_date'], name='prediction_pet_date_idx'),
+        ),
+    ]
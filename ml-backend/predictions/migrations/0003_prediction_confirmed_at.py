@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+def backfill_confirmed_at(apps, schema_editor):
+    # Earlier confirmations have no timestamp; their prediction date is the closest we have
+    Prediction = apps.get_model('predictions', 'Prediction')
+    Prediction.objects.filter(is_confirmed=True, confirmed_at__isnull=True).update(
+        confirmed_at=models.F('prediction_date')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('predictions', '0002_prediction_ordering_and_pet_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='prediction',
+            name='confirmed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='prediction',
+            index=models.Index(fields=['confirmed_at', 'id'], name='prediction_confirmed_idx'),
+        ),
+        migrations.RunPython(backfill_confirmed_at, migrations.RunPython.noop),
+    ]
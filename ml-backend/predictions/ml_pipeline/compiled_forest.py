@@ -0,0 +1,266 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+TREE_LEAF = -1
+
+
+def top_n_indices(probabilities, n):
+    """
+    Column indices of the n largest probabilities in each row, largest first.
+
+    Uses ``argpartition`` so only the selected columns are sorted. Equal
+    probabilities are ordered by column index.
+
+    Args:
+        probabilities (numpy.ndarray): n_rows x n_classes matrix
+        n (int): Number of columns to keep per row
+
+    Returns:
+        numpy.ndarray: n_rows x min(n, n_classes) column indices
+    """
+    n_rows, n_classes = probabilities.shape
+    n = min(n, n_classes)
+    if n < n_classes:
+        indices = np.argpartition(-probabilities, n - 1, axis=1)[:, :n]
+    else:
+        indices = np.broadcast_to(np.arange(n_classes), (n_rows, n_classes))
+    top = np.take_along_axis(probabilities, indices, axis=1)
+    order = np.lexsort((indices, -top))
+    return np.take_along_axis(indices, order, axis=1)
+
+
+class CompiledForest:
+    """
+    A trained random forest classifier flattened into contiguous NumPy arrays.
+
+    Every tree's nodes are stored back to back: split feature, threshold and
+    absolute child indices. Leaves point to themselves, so a whole batch
+    walks all trees in lockstep for ``max_depth`` steps with no per-row
+    branching. Class distributions are kept for leaves only, in ``value``,
+    indexed through ``leaf_index``. ``predict_proba`` reproduces
+    scikit-learn's probabilities bit for bit (inputs are compared in float32
+    and tree outputs summed in tree order, as sklearn does when scoring on
+    one thread).
+
+    The arrays are a second copy of the forest next to the sklearn model,
+    about ``nbytes`` on top of it.
+    """
+
+    def __init__(self, feature, threshold, left, right, missing_left, leaf_index, value, roots, max_depth, classes,
+                 feature_names_in=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.leaf_index = leaf_index
+        self.value = value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.classes_ = classes
+        self.n_classes = len(classes)
+        self.n_trees = len(roots)
+        if feature_names_in is not None:
+            self.feature_names_in_ = feature_names_in
+
+    @staticmethod
+    def supports(model):
+        """Whether a model is a fitted single-output forest classifier that can be compiled."""
+        estimators = getattr(model, 'estimators_', None)
+        return (
+            bool(estimators)
+            and hasattr(model, 'classes_')
+            and getattr(model, 'n_outputs_', 1) == 1
+            and all(hasattr(tree, 'tree_') for tree in estimators)
+        )
+
+    @classmethod
+    def from_model(cls, model):
+        """
+        Compile a fitted ``RandomForestClassifier`` (or ``ExtraTreesClassifier``).
+
+        Args:
+            model: Fitted forest classifier
+
+        Returns:
+            CompiledForest: The compiled forest
+        """
+        if not cls.supports(model):
+            raise ValueError(f"Cannot compile {type(model).__name__}: expected a fitted single-output forest classifier")
+
+        n_classes = len(model.classes_)
+        trees = [tree.tree_ for tree in model.estimators_]
+        sizes = [tree.node_count for tree in trees]
+        roots = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.intp)
+        n_nodes = int(sum(sizes))
+
+        n_leaves = int(sum(tree.n_leaves for tree in trees))
+
+        # Node and feature indices fit in 32 bits; thresholds stay float64 so
+        # splits compare exactly as sklearn's do
+        feature = np.zeros(n_nodes, dtype=np.int32)
+        threshold = np.zeros(n_nodes, dtype=np.float64)
+        left = np.zeros(n_nodes, dtype=np.int32)
+        right = np.zeros(n_nodes, dtype=np.int32)
+        missing_left = np.zeros(n_nodes, dtype=bool)
+        leaf_index = np.zeros(n_nodes, dtype=np.int32)
+        value = np.zeros((n_leaves, n_classes), dtype=np.float64)
+
+        leaf_offset = 0
+        for tree, offset, size in zip(trees, roots, sizes):
+            nodes = slice(offset, offset + size)
+            own = np.arange(offset, offset + size)
+            is_leaf = tree.children_left == TREE_LEAF
+            leaves = np.flatnonzero(is_leaf)
+
+            feature[nodes] = np.where(is_leaf, 0, tree.feature)
+            threshold[nodes] = tree.threshold
+            left[nodes] = np.where(is_leaf, own, tree.children_left + offset)
+            right[nodes] = np.where(is_leaf, own, tree.children_right + offset)
+            missing = getattr(tree, 'missing_go_to_left', None)
+            if missing is not None:
+                missing_left[nodes] = missing.astype(bool)
+            # What the tree's predict_proba returns for rows ending in each leaf
+            leaf_index[offset + leaves] = np.arange(leaf_offset, leaf_offset + len(leaves))
+            value[leaf_offset:leaf_offset + len(leaves)] = tree.value[leaves, 0, :n_classes]
+            leaf_offset += len(leaves)
+
+        return cls(
+            feature, threshold, left, right, missing_left, leaf_index, value, roots,
+            max_depth=max(tree.max_depth for tree in trees),
+            classes=model.classes_,
+            feature_names_in=getattr(model, 'feature_names_in_', None)
+        )
+
+    @property
+    def nbytes(self):
+        """Memory held by the compiled arrays, in bytes."""
+        return sum(array.nbytes for array in (
+            self.feature, self.threshold, self.left, self.right, self.missing_left,
+            self.leaf_index, self.value, self.roots
+        ))
+
+    def apply(self, X):
+        """
+        Find the leaf each row reaches in every tree.
+
+        Args:
+            X: Feature matrix with one row per patient
+
+        Returns:
+            numpy.ndarray: n_rows x n_trees absolute leaf indices
+        """
+        # Trees split on float32 inputs, like sklearn's predict
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (len(X), self.n_trees))
+        has_missing = np.isnan(X).any()
+
+        for _ in range(self.max_depth):
+            values = X[rows, self.feature[nodes]]
+            go_left = values <= self.threshold[nodes]
+            if has_missing:
+                go_left |= np.isnan(values) & self.missing_left[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return nodes
+
+    def predict_proba(self, X):
+        """
+        Class probabilities averaged over all trees.
+
+        Args:
+            X: Feature matrix with one row per patient
+
+        Returns:
+            numpy.ndarray: n_rows x n_classes probabilities
+        """
+        leaves = self.leaf_index[self.apply(X)]
+        probabilities = np.zeros((len(leaves), self.n_classes))
+        # Tree by tree, in the same order sklearn accumulates them
+        for tree in range(self.n_trees):
+            probabilities += self.value[leaves[:, tree]]
+        probabilities /= self.n_trees
+        return probabilities
+
+    def predict_top_n(self, X, top_n=5):
+        """
+        The top N classes and their probabilities for every row.
+
+        Args:
+            X: Feature matrix with one row per patient
+            top_n (int): Number of classes to return per row
+
+        Returns:
+            tuple: (class indices, probabilities), both n_rows x top_n, largest first
+        """
+        probabilities = self.predict_proba(X)
+        indices = top_n_indices(probabilities, top_n)
+        return indices, np.take_along_axis(probabilities, indices, axis=1)
+
+
+def benchmark_compiled_forest(species='dog', batch_sizes=(1, 1000), repeats=20, top_n=5):
+    """
+    Compare sklearn predict_proba plus a full sort with the compiled forest.
+
+    Args:
+        species (str): Species model to use
+        batch_sizes (tuple): Number of patients scored per call
+        repeats (int): Calls timed per batch size
+        top_n (int): Number of predictions per patient
+
+    Returns:
+        dict: Milliseconds per call for each approach and batch size, plus the
+            compiled arrays' size in MB under 'compiled_mb'
+    """
+    try:
+        from model_registry import ModelRegistry, with_feature_names
+    except ImportError:
+        from .model_registry import ModelRegistry, with_feature_names
+
+    models_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'species_models')
+    entry = ModelRegistry(models_dir, [species], n_jobs=1).get(species)
+    if entry is None:
+        raise ValueError(f"No model found for {species} in {models_dir}")
+    compiled = entry.compiled if entry.compiled is not None else CompiledForest.from_model(entry.model)
+
+    rng = np.random.RandomState(42)
+    patients = [{
+        'Breed': 'Unknown',
+        'Age (years)': float(rng.uniform(0, 15)),
+        'Weight (kg)': float(rng.uniform(1, 40)),
+        'Symptoms': 'vomiting, lethargy' if i % 2 else 'coughing, sneezing'
+    } for i in range(max(batch_sizes))]
+    X_all = entry.encoder.encode_batch(patients)
+
+    def sklearn_top_n(X):
+        probabilities = entry.model.predict_proba(with_feature_names(entry.model, X))
+        return [sorted(zip(entry.model.classes_, row), key=lambda x: x[1], reverse=True)[:top_n]
+                for row in probabilities]
+
+    results = {}
+    for batch_size in batch_sizes:
+        X = X_all[:batch_size]
+        if not np.array_equal(entry.model.predict_proba(with_feature_names(entry.model, X)), compiled.predict_proba(X)):
+            print(f"Warning: compiled probabilities differ from sklearn for a batch of {batch_size}")
+
+        timings = {}
+        for name, score in [('sklearn', sklearn_top_n), ('compiled', lambda X: compiled.predict_top_n(X, top_n))]:
+            score(X)
+            start_time = time.perf_counter()
+            for _ in range(repeats):
+                score(X)
+            timings[name] = (time.perf_counter() - start_time) / repeats * 1000
+        results[batch_size] = timings
+        print(f"Batch of {batch_size}: sklearn {timings['sklearn']:.2f} ms, compiled {timings['compiled']:.2f} ms "
+              f"({timings['sklearn'] / timings['compiled']:.1f}x)")
+
+    results['compiled_mb'] = compiled.nbytes / 1024 / 1024
+    print(f"Compiled arrays: {results['compiled_mb']:.1f} MB on top of the sklearn model")
+    return results
+
+
+if __name__ == "__main__":
+    benchmark_compiled_forest(sys.argv[1] if len(sys.argv) > 1 else 'dog')
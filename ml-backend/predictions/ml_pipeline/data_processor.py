@@ -7,6 +7,11 @@ from sklearn.pipeline import Pipeline
 import pickle
 import os
 
+try:
+    from dataset_cache import load_dataset
+except ImportError:
+    from .dataset_cache import load_dataset
+
 class DataProcessor:
     def __init__(self, data_path):
         """Initialize the data processor with the path to the dataset."""
@@ -23,7 +28,7 @@ class DataProcessor:
         """Load the dataset from CSV file."""
         print(f"Loading data from {self.data_path}...")
         try:
-            self.data = pd.read_csv(self.data_path)
+            self.data = load_dataset(self.data_path)
             print(f"Data loaded successfully. Shape: {self.data.shape}")
             return self.data
         except Exception as e:
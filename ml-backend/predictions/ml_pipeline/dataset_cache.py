@@ -0,0 +1,173 @@
+import os
+import json
+import hashlib
+import pandas as pd
+
+# Low-cardinality text columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = ['Pet Species', 'Breed', 'Past Diagnosis', 'Treatment', 'Future Disease']
+
+CACHE_DIR_NAME = '.dataset_cache'
+CACHE_VERSION = 1
+
+# Parquet needs pyarrow; without it the cache falls back to pandas pickles,
+# which also keep the categorical dtypes
+try:
+    import pyarrow  # noqa: F401
+    CACHE_FORMAT = 'parquet'
+except ImportError:
+    CACHE_FORMAT = 'pickle'
+
+
+def read_csv_with_fallback(data_path, **kwargs):
+    """
+    Read a CSV file, retrying with other encodings on decode errors.
+
+    Args:
+        data_path (str): Path to the CSV file
+        **kwargs: Extra arguments for pandas.read_csv
+
+    Returns:
+        pandas.DataFrame: The loaded data
+    """
+    try:
+        return pd.read_csv(data_path, encoding='latin1', **kwargs)
+    except UnicodeDecodeError:
+        try:
+            return pd.read_csv(data_path, encoding='ISO-8859-1', **kwargs)
+        except UnicodeDecodeError:
+            return pd.read_csv(data_path, encoding='cp1252', **kwargs)
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Hash a file in chunks so large exports don't have to fit in memory."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_paths(source_path, cache_dir):
+    """Paths of the cached data and its metadata for a source CSV."""
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(source_path)), CACHE_DIR_NAME)
+    name = os.path.splitext(os.path.basename(source_path))[0]
+    extension = 'parquet' if CACHE_FORMAT == 'parquet' else 'pkl'
+    return (
+        cache_dir,
+        os.path.join(cache_dir, f"{name}.{extension}"),
+        os.path.join(cache_dir, f"{name}.meta.json")
+    )
+
+
+def _read_cache(data_path):
+    if CACHE_FORMAT == 'parquet':
+        return pd.read_parquet(data_path)
+    return pd.read_pickle(data_path)
+
+
+def _write_cache(df, data_path):
+    # Write to a temporary file first so concurrent readers never see a partial cache
+    tmp_path = f"{data_path}.{os.getpid()}.tmp"
+    if CACHE_FORMAT == 'parquet':
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, data_path)
+
+
+def _write_meta(meta, meta_path):
+    tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(meta, f, indent=4)
+    os.replace(tmp_path, meta_path)
+
+
+def to_categorical(df, categorical_columns=CATEGORICAL_COLUMNS):
+    """Convert the known low-cardinality text columns to categoricals in place."""
+    for col in categorical_columns:
+        if col in df.columns and df[col].dtype == object:
+            df[col] = df[col].astype('category')
+    return df
+
+
+def load_dataset(source_path, categorical=True, cache_dir=None, use_cache=True):
+    """
+    Load a CSV dataset through the columnar cache.
+
+    The first load parses the CSV and stores it in a columnar cache with
+    categorical dtypes. Later loads read the cache as long as the source is
+    unchanged: matching mtime and size skip straight to the cache, otherwise
+    the content hash decides whether the cache is still valid.
+
+    Args:
+        source_path (str): Path to the source CSV file
+        categorical (bool): Keep Species, Breed, Past Diagnosis, Treatment and
+            Future Disease as categoricals; False returns them as plain objects
+        cache_dir (str): Cache directory (defaults to .dataset_cache next to the source)
+        use_cache (bool): Set to False to always parse the CSV
+
+    Returns:
+        pandas.DataFrame: The loaded data
+    """
+    if not use_cache:
+        df = read_csv_with_fallback(source_path)
+        return to_categorical(df) if categorical else df
+
+    cache_dir, data_path, meta_path = _cache_paths(source_path, cache_dir)
+    stat = os.stat(source_path)
+
+    meta = None
+    if os.path.exists(meta_path) and os.path.exists(data_path):
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = None
+
+    cache_valid = False
+    source_hash = None
+    if meta and meta.get('version') == CACHE_VERSION and meta.get('format') == CACHE_FORMAT:
+        if meta.get('source_mtime_ns') == stat.st_mtime_ns and meta.get('source_size') == stat.st_size:
+            cache_valid = True
+        else:
+            # The file was touched; only its content decides whether to rebuild
+            source_hash = file_sha256(source_path)
+            if source_hash == meta.get('source_sha256'):
+                cache_valid = True
+                meta['source_mtime_ns'] = stat.st_mtime_ns
+                meta['source_size'] = stat.st_size
+                _write_meta(meta, meta_path)
+
+    df = None
+    if cache_valid:
+        try:
+            df = _read_cache(data_path)
+            print(f"Loaded {source_path} from cache ({CACHE_FORMAT})")
+        except Exception as e:
+            print(f"Warning: Could not read dataset cache {data_path}: {str(e)}")
+
+    if df is None:
+        print(f"Building dataset cache for {source_path}...")
+        df = to_categorical(read_csv_with_fallback(source_path))
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            _write_cache(df, data_path)
+            _write_meta({
+                'version': CACHE_VERSION,
+                'format': CACHE_FORMAT,
+                'source_path': os.path.basename(source_path),
+                'source_mtime_ns': stat.st_mtime_ns,
+                'source_size': stat.st_size,
+                'source_sha256': source_hash or file_sha256(source_path),
+                'categorical_columns': [col for col in CATEGORICAL_COLUMNS if col in df.columns]
+            }, meta_path)
+        except Exception as e:
+            print(f"Warning: Could not write dataset cache {data_path}: {str(e)}")
+
+    if not categorical:
+        for col in CATEGORICAL_COLUMNS:
+            if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype(object)
+
+    return df
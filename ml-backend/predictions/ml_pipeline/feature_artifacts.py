@@ -0,0 +1,108 @@
+import os
+import re
+import json
+
+# CountVectorizer's default token pattern; text is lowercased before matching
+SYMPTOM_TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+SYMPTOM_TOKEN_RE = re.compile(SYMPTOM_TOKEN_PATTERN)
+
+SYMPTOM_VOCABULARY_FILE = 'symptom_vocabulary.json'
+FREQUENCY_TABLES_FILE = 'frequency_tables.json'
+
+
+def tokenize_symptoms(symptoms_text):
+    """
+    Split a symptoms string into tokens exactly like the training CountVectorizer.
+
+    Args:
+        symptoms_text (str): Free-text symptoms
+
+    Returns:
+        list: Lowercased tokens
+    """
+    return SYMPTOM_TOKEN_RE.findall(symptoms_text.lower())
+
+
+def save_symptom_vocabulary(vectorizer, output_dir):
+    """
+    Save a fitted CountVectorizer's vocabulary next to the model.
+
+    Args:
+        vectorizer: Fitted CountVectorizer
+        output_dir (str): Species model directory
+
+    Returns:
+        str: Path of the saved vocabulary
+    """
+    vocabulary_path = os.path.join(output_dir, SYMPTOM_VOCABULARY_FILE)
+    with open(vocabulary_path, 'w') as f:
+        json.dump({
+            'token_pattern': vectorizer.token_pattern,
+            'lowercase': vectorizer.lowercase,
+            # token -> column of the vectorizer output (numpy ints aren't JSON)
+            'vocabulary': {token: int(column) for token, column in sorted(vectorizer.vocabulary_.items())}
+        }, f, indent=4)
+    return vocabulary_path
+
+
+def load_symptom_vocabulary(model_dir):
+    """
+    Load the symptom vocabulary saved next to a species model.
+
+    Args:
+        model_dir (str): Species model directory
+
+    Returns:
+        dict: token -> vectorizer column, or None for models trained before
+        the vocabulary was saved
+    """
+    vocabulary_path = os.path.join(model_dir, SYMPTOM_VOCABULARY_FILE)
+    if not os.path.exists(vocabulary_path):
+        return None
+
+    with open(vocabulary_path, 'r') as f:
+        saved = json.load(f)
+
+    if saved.get('token_pattern') != SYMPTOM_TOKEN_PATTERN or not saved.get('lowercase', True):
+        raise ValueError(f"Unsupported symptom tokenizer settings in {vocabulary_path}")
+
+    return saved['vocabulary']
+
+
+def save_frequency_tables(frequency_tables, output_dir):
+    """
+    Save the frequency-encoding tables computed during training.
+
+    Args:
+        frequency_tables (dict): Column name -> value_counts(normalize=True) Series
+        output_dir (str): Species model directory
+
+    Returns:
+        str: Path of the saved tables
+    """
+    tables_path = os.path.join(output_dir, FREQUENCY_TABLES_FILE)
+    with open(tables_path, 'w') as f:
+        json.dump({
+            column: {str(value): float(frequency) for value, frequency in frequency.items()}
+            for column, frequency in frequency_tables.items()
+        }, f, indent=4)
+    return tables_path
+
+
+def load_frequency_tables(model_dir):
+    """
+    Load the frequency-encoding tables saved next to a species model.
+
+    Args:
+        model_dir (str): Species model directory
+
+    Returns:
+        dict: Column name -> {value: frequency}, or None for models trained
+        before the tables were saved
+    """
+    tables_path = os.path.join(model_dir, FREQUENCY_TABLES_FILE)
+    if not os.path.exists(tables_path):
+        return None
+
+    with open(tables_path, 'r') as f:
+        return json.load(f)
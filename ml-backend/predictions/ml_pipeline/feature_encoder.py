@@ -0,0 +1,298 @@
+import math
+import numpy as np
+
+try:
+    from feature_artifacts import tokenize_symptoms
+except ImportError:
+    from .feature_artifacts import tokenize_symptoms
+
+# Same bins and labels as preprocess_patient_data / improved_engineer_features
+AGE_BINS = [0, 1, 3, 7, 12, 20]
+AGE_LABELS = ['Puppy/Kitten', 'Young', 'Adult', 'Senior', 'Geriatric']
+WEIGHT_BINS = [0, 2, 5, 10, 20, 50]
+WEIGHT_LABELS = ['Tiny', 'Small', 'Medium', 'Large', 'Giant']
+
+COMMON_SYMPTOMS = [
+    'vomiting', 'diarrhea', 'lethargy', 'fever', 'cough', 'sneezing',
+    'limping', 'pain', 'swelling', 'itching', 'rash', 'bleeding',
+    'loss', 'seizures'
+]
+
+# Placeholder for frequency features of models trained without saved tables
+DEFAULT_FREQUENCY = 0.5
+
+
+class PatientFeatureEncoder:
+    """
+    Pandas-free encoder for live predictions.
+
+    Built once per species from ``feature_names.pkl``. All column positions,
+    bin edges and symptom keyword positions are resolved up front, so
+    encoding a patient only writes numbers into a preallocated NumPy row.
+    The output matches ``websocket_server.preprocess_patient_data``.
+    """
+
+    def __init__(self, feature_names, symptom_vocabulary=None, frequency_tables=None):
+        """
+        Compile the encoder for a species.
+
+        Args:
+            feature_names (list): Feature names in the order the model expects
+            symptom_vocabulary (dict): Fitted token -> column vocabulary saved
+                at training time; without it symptoms fall back to keyword
+                matching
+            frequency_tables (dict): Column -> {value: frequency} tables saved
+                at training time; columns without a table use 0.5
+        """
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        self.index = {name: i for i, name in enumerate(self.feature_names)}
+
+        self.age_bins = np.asarray(AGE_BINS, dtype=float)
+        self.weight_bins = np.asarray(WEIGHT_BINS, dtype=float)
+        # Column of each bin's one-hot feature, or -1 if the model doesn't use it
+        self.age_columns = [self.index.get(f'Age_{label}', -1) for label in AGE_LABELS]
+        self.weight_columns = [self.index.get(f'Weight_{label}', -1) for label in WEIGHT_LABELS]
+
+        # Only tokens/keywords the model actually uses are kept
+        if symptom_vocabulary is not None:
+            self.symptom_token_columns = {
+                token: self.index[f'Symptom_{token}']
+                for token in symptom_vocabulary
+                if f'Symptom_{token}' in self.index
+            }
+            self.symptom_token_column_array = np.fromiter(
+                self.symptom_token_columns.values(), dtype=np.intp, count=len(self.symptom_token_columns)
+            )
+            self.symptom_columns = []
+        else:
+            self.symptom_token_columns = None
+            self.symptom_columns = [
+                (symptom, self.index[f'Symptom_{symptom}'])
+                for symptom in COMMON_SYMPTOMS
+                if f'Symptom_{symptom}' in self.index
+            ]
+
+        self.ratio_column = self.index.get('Age_Weight_Ratio', -1)
+
+        # Frequency features resolved through the saved training tables
+        frequency_tables = frequency_tables or {}
+        self.frequency_lookups = [
+            (col, self.index[f'{col}_Frequency'], table)
+            for col, table in frequency_tables.items()
+            if f'{col}_Frequency' in self.index
+        ]
+
+        # Remaining frequency features keep the 0.5 placeholder
+        def default_frequency_column(col):
+            if col in frequency_tables:
+                return -1
+            return self.index.get(f'{col}_Frequency', -1)
+
+        self.breed_frequency_column = default_frequency_column('Breed')
+        self.diagnosis_frequency_column = default_frequency_column('Past Diagnosis')
+        self.symptoms_frequency_column = default_frequency_column('Symptoms')
+        self.treatment_frequency_column = default_frequency_column('Treatment')
+
+    @staticmethod
+    def _fill(value):
+        """Apply the missing-value rules: None becomes 'Unknown', NaN becomes 0."""
+        if value is None:
+            return 'Unknown'
+        if isinstance(value, float) and math.isnan(value):
+            return 0
+        return value
+
+    @staticmethod
+    def _number(value):
+        """Numeric feature value; missing values (None or NaN) become 0."""
+        if value is None:
+            return 0.0
+        value = float(value)
+        return 0.0 if math.isnan(value) else value
+
+    @staticmethod
+    def _bin_index(bins, value):
+        """Index of the right-closed bin containing value, or -1 (same as pd.cut)."""
+        position = int(np.searchsorted(bins, value, side='left'))
+        if 1 <= position < len(bins):
+            return position - 1
+        return -1
+
+    def encode_into(self, patient_data, row):
+        """
+        Encode one patient into a preallocated row.
+
+        Args:
+            patient_data (dict): Patient information
+            row (numpy.ndarray): Float row of length ``n_features`` to write into
+
+        Returns:
+            numpy.ndarray: The filled row
+        """
+        row.fill(0.0)
+
+        # Raw inputs that are also model features are passed through as-is
+        for key, value in patient_data.items():
+            column = self.index.get(key)
+            if column is not None:
+                row[column] = self._number(value)
+
+        has_age = 'Age (years)' in patient_data
+        has_weight = 'Weight (kg)' in patient_data
+        age = self._number(patient_data['Age (years)']) if has_age else 0.0
+        weight = self._number(patient_data['Weight (kg)']) if has_weight else 0.0
+
+        # Age groups
+        if has_age:
+            bin_index = self._bin_index(self.age_bins, age)
+            for i, column in enumerate(self.age_columns):
+                if column >= 0:
+                    row[column] = 1.0 if i == bin_index else 0.0
+
+        # Weight categories
+        if has_weight:
+            bin_index = self._bin_index(self.weight_bins, weight)
+            for i, column in enumerate(self.weight_columns):
+                if column >= 0:
+                    row[column] = 1.0 if i == bin_index else 0.0
+
+        # Symptom text features
+        if 'Symptoms' in patient_data:
+            symptoms = self._fill(patient_data['Symptoms'])
+            if symptoms and self.symptom_token_columns is not None:
+                # Token counts, as produced by the training CountVectorizer
+                row[self.symptom_token_column_array] = 0.0
+                for token in tokenize_symptoms(symptoms):
+                    column = self.symptom_token_columns.get(token)
+                    if column is not None:
+                        row[column] += 1.0
+            elif symptoms:
+                symptoms_text = symptoms.lower()
+                for symptom, column in self.symptom_columns:
+                    row[column] = 1.0 if symptom in symptoms_text else 0.0
+
+        # Age_Weight_Ratio
+        if self.ratio_column >= 0:
+            row[self.ratio_column] = age / (weight + 0.1) if has_age and has_weight else 0.0
+
+        # Frequency encodings; unseen or missing values get 0
+        for col, column, table in self.frequency_lookups:
+            if col in patient_data:
+                row[column] = table.get(str(self._fill(patient_data[col])), 0.0)
+            else:
+                row[column] = 0.0
+
+        if self.breed_frequency_column >= 0 and 'Breed' in patient_data:
+            row[self.breed_frequency_column] = DEFAULT_FREQUENCY
+        if self.diagnosis_frequency_column >= 0:
+            row[self.diagnosis_frequency_column] = DEFAULT_FREQUENCY
+        if self.symptoms_frequency_column >= 0 and 'Symptoms' in patient_data:
+            row[self.symptoms_frequency_column] = DEFAULT_FREQUENCY
+        if self.treatment_frequency_column >= 0:
+            row[self.treatment_frequency_column] = DEFAULT_FREQUENCY
+
+        return row
+
+    def encode(self, patient_data):
+        """
+        Encode one patient into a new 1 x n_features matrix.
+
+        Args:
+            patient_data (dict): Patient information
+
+        Returns:
+            numpy.ndarray: Feature matrix with a single row
+        """
+        X = np.zeros((1, self.n_features))
+        self.encode_into(patient_data, X[0])
+        return X
+
+    def encode_batch(self, patient_data_list, out=None):
+        """
+        Encode several patients into one feature matrix.
+
+        Args:
+            patient_data_list (list): Patient information dictionaries
+            out (numpy.ndarray): Optional preallocated matrix with at least
+                ``len(patient_data_list)`` rows
+
+        Returns:
+            numpy.ndarray: Feature matrix with one row per patient
+        """
+        n_rows = len(patient_data_list)
+        if out is None:
+            out = np.zeros((n_rows, self.n_features))
+        X = out[:n_rows]
+        for i, patient_data in enumerate(patient_data_list):
+            self.encode_into(patient_data, X[i])
+        return X
+
+
+def benchmark_encoder(species='dog', iterations=2000):
+    """
+    Compare the compiled encoder with preprocess_patient_data on one species.
+
+    Args:
+        species (str): Species whose feature names are used
+        iterations (int): Number of encodings to time for each implementation
+
+    Returns:
+        dict: Mean microseconds per row for each implementation
+    """
+    import time
+    try:
+        import websocket_server
+    except ImportError:
+        from . import websocket_server
+
+    entry = websocket_server.registry.get(species)
+    if entry is None:
+        raise ValueError(f"No model loaded for species: {species}")
+
+    encoder = PatientFeatureEncoder(
+        entry.feature_names,
+        entry.symptom_vocabulary,
+        entry.frequency_tables
+    )
+    patient_data = {
+        'Breed': 'Aspin',
+        'Age (years)': 5.8,
+        'Weight (kg)': 24.0,
+        'Past Diagnosis': 'Dehydration',
+        'Symptoms': 'Vomiting; lethargy; loss of appetite',
+        'Treatment': 'Fluid therapy'
+    }
+
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        websocket_server.preprocess_patient_data(patient_data, species)
+    pandas_us = (time.perf_counter() - start_time) * 1e6 / iterations
+
+    row = np.zeros(encoder.n_features)
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        encoder.encode_into(patient_data, row)
+    encoder_us = (time.perf_counter() - start_time) * 1e6 / iterations
+
+    batch = [patient_data] * 64
+    out = np.zeros((len(batch), encoder.n_features))
+    start_time = time.perf_counter()
+    for _ in range(max(1, iterations // len(batch))):
+        encoder.encode_batch(batch, out=out)
+    batch_us = (time.perf_counter() - start_time) * 1e6 / (max(1, iterations // len(batch)) * len(batch))
+
+    results = {
+        'preprocess_patient_data_us': pandas_us,
+        'encoder_row_us': encoder_us,
+        'encoder_batch_us_per_row': batch_us
+    }
+    print(f"preprocess_patient_data: {pandas_us:.1f} us/row")
+    print(f"PatientFeatureEncoder (row): {encoder_us:.1f} us/row ({pandas_us / encoder_us:.0f}x)")
+    print(f"PatientFeatureEncoder (batch of 64): {batch_us:.1f} us/row")
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+    benchmark_encoder(sys.argv[1] if len(sys.argv) > 1 else 'dog')
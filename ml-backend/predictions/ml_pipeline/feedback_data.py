@@ -0,0 +1,117 @@
+import os
+import json
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    from dataset_cache import CACHE_FORMAT, to_categorical
+except ImportError:
+    from .dataset_cache import CACHE_FORMAT, to_categorical
+
+# Confirmed predictions are stored next to the species CSVs, one directory per species:
+# species_data/feedback/<species>/part-*.parquet (or .pkl without pyarrow)
+FEEDBACK_DIR_NAME = 'feedback'
+WATERMARK_FILE = 'watermark.json'
+
+# Training CSV columns, plus the prediction id used to drop re-exported rows
+TRAINING_COLUMNS = [
+    'Pet Species', 'Breed', 'Age (years)', 'Weight (kg)',
+    'Past Diagnosis', 'Symptoms', 'Treatment', 'Future Disease'
+]
+ID_COLUMN = 'Prediction ID'
+
+
+def species_feedback_dir(feedback_dir, species):
+    return os.path.join(feedback_dir, species.lower().replace(' ', '_'))
+
+
+def read_watermark(feedback_dir):
+    """
+    Read the position of the last exported confirmation.
+
+    Args:
+        feedback_dir (str): Feedback directory
+
+    Returns:
+        tuple: (confirmed_at, prediction_id), or (None, None) before the first export
+    """
+    watermark_path = os.path.join(feedback_dir, WATERMARK_FILE)
+    if not os.path.exists(watermark_path):
+        return None, None
+
+    with open(watermark_path, 'r') as f:
+        saved = json.load(f)
+    return datetime.fromisoformat(saved['confirmed_at']), saved['id']
+
+
+def write_watermark(feedback_dir, confirmed_at, prediction_id):
+    """Record the last exported confirmation, replacing the file in one step."""
+    os.makedirs(feedback_dir, exist_ok=True)
+    watermark_path = os.path.join(feedback_dir, WATERMARK_FILE)
+    tmp_path = f"{watermark_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'confirmed_at': confirmed_at.isoformat(), 'id': prediction_id}, f, indent=4)
+    os.replace(tmp_path, watermark_path)
+
+
+def write_feedback_part(feedback_dir, species, rows, part_name):
+    """
+    Append confirmed rows for a species as a new columnar part file.
+
+    Args:
+        feedback_dir (str): Feedback directory
+        species (str): Animal species
+        rows (list): Row dictionaries with TRAINING_COLUMNS and ID_COLUMN
+        part_name (str): File name without extension, unique per export
+
+    Returns:
+        str: Path of the written part
+    """
+    output_dir = species_feedback_dir(feedback_dir, species)
+    os.makedirs(output_dir, exist_ok=True)
+    df = pd.DataFrame(rows, columns=[ID_COLUMN] + TRAINING_COLUMNS)
+
+    extension = 'parquet' if CACHE_FORMAT == 'parquet' else 'pkl'
+    part_path = os.path.join(output_dir, f"{part_name}.{extension}")
+    # Readers only pick up complete parts
+    tmp_path = f"{part_path}.{os.getpid()}.tmp"
+    if CACHE_FORMAT == 'parquet':
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, part_path)
+    return part_path
+
+
+def load_feedback(feedback_dir, species, categorical=True):
+    """
+    Load every exported confirmation for a species as training rows.
+
+    A prediction confirmed again after an export appears in several parts;
+    only its latest row is kept.
+
+    Args:
+        feedback_dir (str): Feedback directory
+        species (str): Animal species
+        categorical (bool): Return the text columns as categoricals like load_dataset
+
+    Returns:
+        pandas.DataFrame: Rows in the training CSV columns (empty if nothing was exported)
+    """
+    species_dir = species_feedback_dir(feedback_dir, species)
+    part_paths = []
+    if os.path.isdir(species_dir):
+        part_paths = sorted(
+            os.path.join(species_dir, name) for name in os.listdir(species_dir)
+            if name.startswith('part-') and name.endswith(('.parquet', '.pkl'))
+        )
+    if not part_paths:
+        return pd.DataFrame(columns=TRAINING_COLUMNS)
+
+    df = pd.concat(
+        [pd.read_parquet(path) if path.endswith('.parquet') else pd.read_pickle(path) for path in part_paths],
+        ignore_index=True
+    )
+    df = df.drop_duplicates(subset=ID_COLUMN, keep='last').drop(columns=[ID_COLUMN]).reset_index(drop=True)
+    return to_categorical(df) if categorical else df
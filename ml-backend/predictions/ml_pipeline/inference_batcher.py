@@ -0,0 +1,186 @@
+import asyncio
+import time
+from collections import Counter
+
+
+class InferenceBatcher:
+    """
+    Per-species micro-batching queue for live predictions.
+
+    Requests for the same species that arrive within a short window are
+    stacked together and scored with a single call to ``score_batch``, and
+    each result is handed back to the coroutine that submitted it.
+    """
+
+    def __init__(self, score_batch, max_batch_size=64, window_ms=5.0, max_concurrency=1):
+        """
+        Initialize the batcher.
+
+        Args:
+            score_batch: Coroutine function ``(species, patient_data_list)``
+                returning one result per input row, in order; an exception
+                instance as a row's result is raised to that row's caller
+            max_batch_size (int): Maximum number of rows scored together
+            window_ms (float): How long to wait for more rows after the
+                first one arrives, in milliseconds
+            max_concurrency (int): Number of batches per species that may be
+                scored at the same time (e.g. the size of a process pool)
+        """
+        self.score_batch = score_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.window = max(0.0, float(window_ms)) / 1000.0
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.queues = {}
+        self.slots = {}
+        self.workers = {}
+        self.running = set()
+        self.batch_size_histogram = {}
+        self.queue_depth_histogram = {}
+        self.max_queue_depth = {}
+        self.total_requests = Counter()
+        self.total_batches = Counter()
+        self.total_scoring_time = Counter()
+
+    def _get_queue(self, species):
+        """Return the queue for a species, starting its worker on first use."""
+        if species not in self.queues:
+            self.queues[species] = asyncio.Queue()
+            self.batch_size_histogram[species] = Counter()
+            self.queue_depth_histogram[species] = Counter()
+            self.max_queue_depth[species] = 0
+            self.slots[species] = asyncio.Semaphore(self.max_concurrency)
+            self.workers[species] = asyncio.ensure_future(self._worker(species))
+        return self.queues[species]
+
+    async def submit(self, species, patient_data):
+        """
+        Queue one patient for scoring and wait for its result.
+
+        Args:
+            species (str): Animal species
+            patient_data (dict): Patient information
+
+        Returns:
+            The result produced by ``score_batch`` for this patient
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        queue = self._get_queue(species)
+        await queue.put((patient_data, future))
+
+        depth = queue.qsize()
+        if depth > self.max_queue_depth[species]:
+            self.max_queue_depth[species] = depth
+
+        return await future
+
+    async def _collect_batch(self, queue):
+        """Wait for the first request, then gather more until the window closes or the batch is full."""
+        batch = [await queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.window
+
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already queued without yielding to the loop
+            if not queue.empty():
+                batch.append(queue.get_nowait())
+                continue
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _worker(self, species):
+        """Drain the species queue forever, handing each batch to a scoring task."""
+        queue = self.queues[species]
+        slots = self.slots[species]
+
+        while True:
+            batch = await self._collect_batch(queue)
+            # Drop requests whose clients went away while they were queued
+            batch = [(data, future) for data, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+
+            self.batch_size_histogram[species][len(batch)] += 1
+            self.queue_depth_histogram[species][queue.qsize()] += 1
+            self.total_requests[species] += len(batch)
+            self.total_batches[species] += 1
+
+            # Wait for a free scoring slot; more requests keep queueing meanwhile
+            await slots.acquire()
+            task = asyncio.ensure_future(self._run_batch(species, batch))
+            # Keep a reference so the task isn't garbage collected mid-flight
+            self.running.add(task)
+            task.add_done_callback(self.running.discard)
+
+    async def _run_batch(self, species, batch):
+        """Score one batch and resolve the futures of its requests."""
+        start_time = time.perf_counter()
+        try:
+            results = await self.score_batch(species, [data for data, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.total_scoring_time[species] += time.perf_counter() - start_time
+            self.slots[species].release()
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        """
+        Get queue and batching statistics for tuning the batch window.
+
+        Returns:
+            dict: Per-species queue depth, batch counts and histograms
+        """
+        stats = {
+            'max_batch_size': self.max_batch_size,
+            'window_ms': self.window * 1000.0,
+            'max_concurrency': self.max_concurrency,
+            'species': {}
+        }
+
+        for species, queue in self.queues.items():
+            batches = self.total_batches[species]
+            stats['species'][species] = {
+                'queue_depth': queue.qsize(),
+                'max_queue_depth': self.max_queue_depth[species],
+                'requests': self.total_requests[species],
+                'batches': batches,
+                'mean_batch_size': self.total_requests[species] / batches if batches else 0.0,
+                'mean_scoring_ms': self.total_scoring_time[species] * 1000.0 / batches if batches else 0.0,
+                # JSON object keys must be strings
+                'batch_size_histogram': {
+                    str(size): count for size, count in sorted(self.batch_size_histogram[species].items())
+                },
+                'queue_depth_histogram': {
+                    str(depth): count for depth, count in sorted(self.queue_depth_histogram[species].items())
+                }
+            }
+
+        return stats
+
+    async def close(self):
+        """Cancel the per-species workers."""
+        for worker in self.workers.values():
+            worker.cancel()
+        await asyncio.gather(*self.workers.values(), return_exceptions=True)
+        self.workers.clear()
+        self.queues.clear()
+        self.slots.clear()
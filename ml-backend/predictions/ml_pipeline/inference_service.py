@@ -0,0 +1,401 @@
+# predictions/ml_pipeline/inference_service.py
+"""
+Species model inference shared by the Django API and the websocket server.
+
+Only scikit-learn models from ``species_models/`` are used here; nothing in
+this module imports TensorFlow.
+"""
+import os
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    from model_registry import ModelRegistry, with_feature_names
+    from prediction_cache import PredictionCache, feature_key
+    from compiled_forest import top_n_indices
+except ImportError:
+    from .model_registry import ModelRegistry, with_feature_names
+    from .prediction_cache import PredictionCache, feature_key
+    from .compiled_forest import top_n_indices
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.abspath(os.path.join(current_dir, '..', '..'))
+
+# Species models are loaded lazily, on the first request for each species
+species_list = ['dog', 'cat', 'chicken', 'fish', 'hamster', 'rabbit', 'snake', 'turtle']
+models_dir = os.path.join(project_root, 'species_models')
+# PREDICTION_COMPILE_FORESTS=1 scores forests through flat-array copies, which
+# are faster but hold a second copy of every loaded forest in memory
+registry = ModelRegistry(
+    models_dir, species_list,
+    compile_forests=os.environ.get('PREDICTION_COMPILE_FORESTS', '0') == '1'
+)
+
+# Current models and artifacts, kept in sync by the registry on every reload
+models = registry.models
+feature_names = registry.feature_names
+symptom_vocabularies = registry.symptom_vocabularies
+frequency_tables = registry.frequency_tables
+encoders = registry.encoders
+
+# Results of recently scored feature vectors; keys include the model version,
+# so a reload never serves stale predictions
+prediction_cache = PredictionCache(
+    max_entries=int(os.environ.get('PREDICTION_CACHE_MAX_ENTRIES', '10000')),
+    max_bytes=int(float(os.environ.get('PREDICTION_CACHE_MAX_MB', '64')) * 1024 * 1024),
+    ttl_seconds=float(os.environ.get('PREDICTION_CACHE_TTL_SECONDS', '3600'))
+)
+
+def init_worker(models_dir):
+    """
+    Initializer for scoring worker processes.
+    
+    Forked workers inherit the models the parent has already loaded and
+    share their pages copy-on-write (the websocket server loads every
+    species before starting its pool); any other species are loaded lazily,
+    into the worker's own memory, on its first batch for them.
+    
+    Args:
+        models_dir (str): Directory containing one subdirectory per species
+    """
+    # Each worker scores on a single core; the pool provides the parallelism
+    registry.n_jobs = 1
+    registry.models_dir = models_dir
+    
+    for model in models.values():
+        if hasattr(model, 'n_jobs'):
+            model.n_jobs = 1
+
+def get_prediction_with_confidence(model, X, top_n=5):
+    """
+    Get predictions with confidence scores and return top N most likely diseases.
+    
+    Args:
+        model: Trained classifier with predict_proba method
+        X: Feature vector for prediction
+        top_n: Number of top predictions to return
+        
+    Returns:
+        List of (disease, probability) tuples
+        
+    Raises:
+        Exception: Whatever the model raised while scoring
+    """
+    prediction = get_batch_predictions_with_confidence(model, X, top_n=top_n)[0]
+    if isinstance(prediction, Exception):
+        raise prediction
+    return prediction
+
+def get_batch_predictions_with_confidence(model, X, top_n=5):
+    """
+    Get the top N predictions for every row of a feature matrix with a single predict_proba call.
+    
+    Args:
+        model: Trained classifier or CompiledForest with predict_proba method
+        X: Feature matrix with one row per patient
+        top_n: Number of top predictions to return per row
+        
+    Returns:
+        List with one list of (disease, probability) tuples per row, or the
+        exception raised by the model in place of every row if scoring failed
+    """
+    try:
+        # Ensure X has all the features the model expects (encoded NumPy
+        # batches are already in the model's feature order)
+        if hasattr(model, 'feature_names_in_') and isinstance(X, pd.DataFrame):
+            missing_features = [f for f in model.feature_names_in_ if f not in X.columns]
+            if missing_features:
+                print(f"Warning: Model expects features that are not in input: {missing_features}")
+                # Add missing features with zeros
+                for feature in missing_features:
+                    X[feature] = 0
+            
+            # Ensure correct order of features
+            X = X[model.feature_names_in_]
+        
+        # Get probability distribution across all classes for the whole batch
+        probabilities = model.predict_proba(with_feature_names(model, X))
+        
+        # Get class names
+        class_names = model.classes_
+        
+        # Select the top N per row without sorting every class
+        top_indices = top_n_indices(probabilities, top_n)
+        
+        return [
+            [(class_names[i], float(row[i])) for i in indices]
+            for row, indices in zip(probabilities, top_indices)
+        ]
+    except Exception as e:
+        print(f"Error in prediction: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return [e] * len(X)
+
+def score_patients(species, patient_data_list, version=None, top_n=5, entry=None):
+    """
+    Preprocess and score a batch of patients of the same species.
+    
+    Runs either inline or inside a scoring worker process.
+    
+    Args:
+        species: Animal species
+        patient_data_list: List of patient information dictionaries
+        version: Model version the batch was submitted for; a worker process
+            holding another version reloads the species first
+        top_n: Number of top predictions to return per patient
+        entry: Model to score with (defaults to the registry's current one)
+        
+    Returns:
+        tuple: (list with one list of (disease, probability) tuples per
+        patient, or the exception raised while encoding or scoring that
+        patient; version of the model that scored them)
+        
+    Raises:
+        ValueError: If there is no usable model for the species
+        
+    Rows whose encoded features were scored recently by the same model
+    version are answered from ``prediction_cache`` without running the model.
+    """
+    # One entry for the whole batch, so a reload can't swap the model mid-batch
+    # (the first batch for a species loads it)
+    if entry is None:
+        entry = registry.get(species)
+    if version is not None and (entry is None or entry.version != version):
+        try:
+            registry.reload_species(species)
+            entry = registry.get(species)
+        except Exception as e:
+            if entry is None:
+                raise
+            print(f"Error reloading model for {species} in worker, using version {entry.version}: {str(e)}")
+    if entry is None:
+        raise ValueError(f"Species '{species}' not supported. Supported species: {registry.supported_species()}")
+    
+    encoder = entry.encoder
+    X = np.zeros((len(patient_data_list), encoder.n_features))
+    
+    # Encode row by row so one malformed patient doesn't fail the whole batch
+    results = [None] * len(patient_data_list)
+    valid_rows = []
+    cache_keys = {}
+    for i, patient_data in enumerate(patient_data_list):
+        try:
+            encoder.encode_into(patient_data, X[i])
+        except Exception as e:
+            print(f"Error preprocessing patient data: {str(e)}")
+            results[i] = e
+            continue
+        
+        if prediction_cache.enabled:
+            key = feature_key(species, entry.version, X[i], top_n)
+            cached = prediction_cache.get(key)
+            if cached is not None:
+                results[i] = cached
+                continue
+            cache_keys[i] = key
+        valid_rows.append(i)
+    
+    if len(valid_rows) < len(patient_data_list):
+        X = X[valid_rows]
+    
+    if valid_rows:
+        model = entry.compiled if entry.compiled is not None else entry.model
+        predictions = get_batch_predictions_with_confidence(model, X, top_n=top_n)
+        for i, prediction in zip(valid_rows, predictions):
+            results[i] = prediction
+            # Failed predictions are retried next time rather than cached
+            if i in cache_keys and not isinstance(prediction, Exception):
+                prediction_cache.put(cache_keys[i], prediction)
+    
+    return results, entry.version
+
+def get_recommended_diagnostics(predictions, species):
+    """
+    Get recommended diagnostics based on predicted diseases and species.
+    
+    Args:
+        predictions: List of (disease, probability) tuples
+        species: Animal species
+        
+    Returns:
+        List of recommended diagnostic tests
+    """
+    # Basic diagnostics for all cases
+    diagnostics = ["Complete Blood Count (CBC)", "Biochemistry Panel"]
+    
+    # Add disease-specific diagnostics
+    if predictions and len(predictions) > 0 and predictions[0][0] != "Error in prediction":
+        top_disease = predictions[0][0].lower()
+        
+        if any(term in top_disease for term in ["respiratory", "pneumonia", "bronchitis"]):
+            diagnostics.extend(["Chest X-ray", "Oxygen saturation measurement"])
+        
+        if any(term in top_disease for term in ["kidney", "renal", "urinary"]):
+            diagnostics.extend(["Urinalysis", "Kidney ultrasound"])
+        
+        if any(term in top_disease for term in ["liver", "hepatic", "jaundice"]):
+            diagnostics.extend(["Liver function tests", "Abdominal ultrasound"])
+        
+        if any(term in top_disease for term in ["cardiac", "heart", "murmur"]):
+            diagnostics.extend(["ECG", "Cardiac ultrasound"])
+        
+        if any(term in top_disease for term in ["neuro", "seizure", "paralysis"]):
+            diagnostics.extend(["Neurological examination", "MRI if available"])
+        
+        if any(term in top_disease for term in ["skin", "dermatitis", "allergy"]):
+            diagnostics.extend(["Skin scraping", "Cytology"])
+    
+    # Add species-specific diagnostics
+    if species.lower() == "dog":
+        if predictions and len(predictions) > 0 and predictions[0][0] != "Error in prediction":
+            top_disease = predictions[0][0].lower()
+            if any(term in top_disease for term in ["tick", "ehrlichia", "lyme"]):
+                diagnostics.append("Tick-borne disease panel")
+            if "parvo" in top_disease:
+                diagnostics.append("Parvovirus test")
+    
+    if species.lower() == "cat":
+        if predictions and len(predictions) > 0 and predictions[0][0] != "Error in prediction":
+            top_disease = predictions[0][0].lower()
+            if any(term in top_disease for term in ["urinary", "cystitis"]):
+                diagnostics.append("Urine culture")
+            if any(term in top_disease for term in ["fiv", "felv"]):
+                diagnostics.append("FIV/FeLV test")
+    
+    return diagnostics
+
+def generate_clinical_report(patient_data, predictions, species):
+    """
+    Generate a clinically useful report for veterinarians.
+    
+    Args:
+        patient_data: Dictionary of patient information
+        predictions: List of (disease, probability) tuples
+        species: Animal species
+        
+    Returns:
+        Dictionary with formatted report information
+    """
+    # Get recommended diagnostics
+    diagnostics = get_recommended_diagnostics(predictions, species)
+    
+    # Format predictions for display
+    formatted_predictions = []
+    for i, (disease, prob) in enumerate(predictions, 1):
+        confidence_level = "High" if prob > 0.7 else "Medium" if prob > 0.4 else "Low"
+        formatted_predictions.append({
+            "rank": i,
+            "disease": disease,
+            "probability": prob,
+            "confidence_level": confidence_level
+        })
+    
+    # Create report structure
+    report = {
+        "patient_info": {k: v for k, v in patient_data.items() if k != "Future Disease"},
+        "predictions": formatted_predictions,
+        "diagnostics": diagnostics,
+        "timestamp": datetime.now().isoformat(),
+        "report_id": str(uuid.uuid4())
+    }
+    
+    return report
+
+
+def predict_batch(species, patient_data_list, top_n=5):
+    """
+    Score several patients of one species with a single model call.
+    
+    Args:
+        species (str): Animal species
+        patient_data_list (list): Patient information dictionaries
+        top_n (int): Number of top predictions to return per patient
+        
+    Returns:
+        tuple: (list with one list of (disease, probability) tuples or
+        exception per patient, model version used)
+        
+    Raises:
+        ValueError: If there is no model for the species
+    """
+    species = species.lower()
+    entry = registry.get(species)
+    if entry is None:
+        raise ValueError(f"Species '{species}' not supported. Supported species: {registry.supported_species()}")
+    return score_patients(species, patient_data_list, top_n=top_n, entry=entry)
+
+def predict(species, patient_data, top_n=5):
+    """
+    Score one patient with the species model.
+    
+    Args:
+        species (str): Animal species
+        patient_data (dict): Patient information
+        top_n (int): Number of top predictions to return
+        
+    Returns:
+        tuple: (list of (disease, probability) tuples, model version used)
+        
+    Raises:
+        ValueError: If there is no model for the species
+    """
+    results, version = predict_batch(species, [patient_data], top_n=top_n)
+    if isinstance(results[0], Exception):
+        raise results[0]
+    return results[0], version
+
+def warm_up():
+    """Load every species model now so the first requests don't pay for it."""
+    registry.load_all()
+
+def benchmark_batch_scoring(species='dog', n=200):
+    """
+    Compare n single-patient predictions with one batch of n patients.
+    
+    Args:
+        species (str): Species model to use
+        n (int): Number of patients
+        
+    Returns:
+        dict: Patients per second for each approach
+    """
+    import time
+    
+    patients = [{
+        'Breed': 'Unknown',
+        'Age (years)': float(i % 15),
+        'Weight (kg)': float(1 + i % 40),
+        'Symptoms': 'vomiting, lethargy' if i % 2 else 'coughing, sneezing'
+    } for i in range(n)]
+    
+    # Load the model before timing
+    predict(species, patients[0])
+    
+    start_time = time.perf_counter()
+    for patient_data in patients:
+        predict(species, patient_data)
+    single_seconds = time.perf_counter() - start_time
+    
+    start_time = time.perf_counter()
+    predict_batch(species, patients)
+    batch_seconds = time.perf_counter() - start_time
+    
+    results = {
+        'single_per_second': n / single_seconds,
+        'batch_per_second': n / batch_seconds
+    }
+    print(f"{n} single predictions: {single_seconds * 1000:.1f} ms ({results['single_per_second']:.0f}/s)")
+    print(f"One batch of {n}: {batch_seconds * 1000:.1f} ms ({results['batch_per_second']:.0f}/s, "
+          f"{single_seconds / batch_seconds:.1f}x)")
+    return results
+
+if __name__ == "__main__":
+    import sys
+    benchmark_batch_scoring(
+        sys.argv[1] if len(sys.argv) > 1 else 'dog',
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    )
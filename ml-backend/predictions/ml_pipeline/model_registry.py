@@ -0,0 +1,450 @@
+import os
+import asyncio
+import threading
+from datetime import datetime
+
+import joblib
+import numpy as np
+import pandas as pd
+
+try:
+    from feature_encoder import PatientFeatureEncoder
+    from feature_artifacts import load_symptom_vocabulary, load_frequency_tables
+    from feature_artifacts import SYMPTOM_VOCABULARY_FILE, FREQUENCY_TABLES_FILE
+    from compiled_forest import CompiledForest
+except ImportError:
+    from .feature_encoder import PatientFeatureEncoder
+    from .feature_artifacts import load_symptom_vocabulary, load_frequency_tables
+    from .feature_artifacts import SYMPTOM_VOCABULARY_FILE, FREQUENCY_TABLES_FILE
+    from .compiled_forest import CompiledForest
+
+# Models are written uncompressed so they can be memory-mapped on load
+MODEL_COMPRESS = 0
+MODEL_MMAP_MODE = 'r'
+
+# Patient used to check a freshly loaded model before it starts serving
+WARM_UP_PATIENT = {
+    'Breed': 'Unknown',
+    'Age (years)': 3.0,
+    'Weight (kg)': 10.0,
+    'Past Diagnosis': 'Unknown',
+    'Symptoms': 'vomiting, lethargy',
+    'Treatment': 'Unknown'
+}
+
+
+def save_model(obj, path):
+    """
+    Save a model (or other artifact) in the uncompressed on-disk format.
+
+    Args:
+        obj: Object to save
+        path (str): Output path
+
+    Returns:
+        list: Files written by joblib
+    """
+    return joblib.dump(obj, path, compress=MODEL_COMPRESS)
+
+
+def load_model(path):
+    """
+    Load a saved model with its NumPy arrays memory-mapped read-only.
+
+    Arrays the model keeps as NumPy arrays (such as ``classes_``) stay mapped
+    and are shared between processes through the page cache. scikit-learn
+    trees copy their node and value arrays into private memory while
+    unpickling, so a forest's trees are not shared this way; mapping only
+    saves the extra read buffer during the load. Compressed files can't be
+    mapped and are loaded normally.
+
+    Args:
+        path (str): Path of the saved model
+
+    Returns:
+        The loaded object
+    """
+    return joblib.load(path, mmap_mode=MODEL_MMAP_MODE)
+
+
+def with_feature_names(model, X):
+    """
+    Label an encoded NumPy batch with the feature names the model was fitted with.
+
+    Encoded rows are already in the model's feature order; the names only
+    satisfy sklearn's feature-name check. Compiled forests take arrays as is.
+
+    Args:
+        model: Trained classifier or CompiledForest
+        X: Feature matrix with one row per patient
+
+    Returns:
+        Feature matrix the model can score without warnings
+    """
+    names = getattr(model, 'feature_names_in_', None)
+    if names is None or isinstance(model, CompiledForest) or isinstance(X, pd.DataFrame):
+        return X
+    return pd.DataFrame(X, columns=names)
+
+
+def build_encoder(model, features, species, symptom_vocabulary=None, species_frequency_tables=None):
+    """
+    Compile the live feature encoder for a species model.
+
+    Args:
+        model: Trained classifier
+        features (list): Feature names saved with the model
+        species (str): Animal species
+        symptom_vocabulary (dict): Fitted symptom vocabulary, if one was saved
+        species_frequency_tables (dict): Frequency-encoding tables, if they were saved
+
+    Returns:
+        PatientFeatureEncoder: Encoder producing rows in the model's feature order
+    """
+    model_features = getattr(model, 'feature_names_in_', None)
+    if model_features is not None and list(model_features) != list(features):
+        print(f"Warning: feature_names.pkl for {species} does not match the model; using the model's feature order")
+        features = list(model_features)
+    return PatientFeatureEncoder(features, symptom_vocabulary, species_frequency_tables)
+
+
+class SpeciesModel:
+    """
+    One loaded version of a species model and everything needed to score it.
+
+    Entries are never modified after they are installed; a reload builds a
+    new entry, so a batch that picked up the old one finishes on it.
+    """
+
+    def __init__(self, species, model, feature_names, symptom_vocabulary, frequency_tables, encoder, version,
+                 compiled=None):
+        self.species = species
+        self.model = model
+        # Flat-array copy of the forest used for scoring, or None to score with the model
+        self.compiled = compiled
+        self.feature_names = feature_names
+        self.symptom_vocabulary = symptom_vocabulary
+        self.frequency_tables = frequency_tables
+        self.encoder = encoder
+        self.version = version
+        self.loaded_at = datetime.now().isoformat()
+
+
+class ModelRegistry:
+    """
+    Species model registry that can reload models while the server keeps running.
+
+    Species are loaded lazily on their first request unless ``load_all`` is
+    called. New versions are loaded and warmed up off the event loop and then
+    swapped in with a single dict assignment. Readers take one
+    ``SpeciesModel`` per batch, so in-flight requests finish on the version
+    they started with.
+    """
+
+    def __init__(self, models_dir, species_list, n_jobs=None, compile_forests=False):
+        """
+        Initialize the registry.
+
+        Args:
+            models_dir (str): Directory containing one subdirectory per species
+            species_list (list): Species to serve
+            n_jobs (int): n_jobs to set on every loaded model (None keeps the saved value)
+            compile_forests (bool): Also compile forest models to flat arrays for scoring,
+                at the cost of a second copy of each forest in memory
+        """
+        self.models_dir = models_dir
+        self.species_list = list(species_list)
+        self.n_jobs = n_jobs
+        self.compile_forests = compile_forests
+        self.entries = {}
+        # Plain dict views of the current entries for code that reads them directly
+        self.models = {}
+        self.feature_names = {}
+        self.symptom_vocabularies = {}
+        self.frequency_tables = {}
+        self.encoders = {}
+        # Version of each species' files that last failed to load, so a broken
+        # model isn't reloaded on every request
+        self.failed_versions = {}
+        # Serializes loads so a watcher and a reload message don't race
+        self.load_lock = threading.Lock()
+
+    def species_dir(self, species):
+        return os.path.join(self.models_dir, species)
+
+    def file_version(self, species):
+        """
+        Version of the model files on disk, taken from their mtimes and sizes.
+
+        The optional symptom vocabulary and frequency tables are included, so
+        rewriting only the encoder artifacts also counts as a new version.
+
+        Args:
+            species (str): Animal species
+
+        Returns:
+            str: Version string, or None if the model files are missing
+        """
+        species_dir = self.species_dir(species)
+        parts = []
+        for file_name in ['model.pkl', 'feature_names.pkl']:
+            try:
+                stat = os.stat(os.path.join(species_dir, file_name))
+            except OSError:
+                return None
+            parts.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+        for file_name in [SYMPTOM_VOCABULARY_FILE, FREQUENCY_TABLES_FILE]:
+            try:
+                stat = os.stat(os.path.join(species_dir, file_name))
+                parts.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+            except OSError:
+                parts.append('none')
+        return '-'.join(parts)
+
+    def load_species(self, species):
+        """
+        Load a species model and its artifacts from disk without installing it.
+
+        Args:
+            species (str): Animal species
+
+        Returns:
+            SpeciesModel: The loaded model
+        """
+        species_dir = self.species_dir(species)
+        version = self.file_version(species)
+        if version is None:
+            raise FileNotFoundError(f"Model files not found for {species}")
+
+        model = load_model(os.path.join(species_dir, 'model.pkl'))
+        features = joblib.load(os.path.join(species_dir, 'feature_names.pkl'))
+        if self.n_jobs is not None and hasattr(model, 'n_jobs'):
+            model.n_jobs = self.n_jobs
+
+        symptom_vocabulary = load_symptom_vocabulary(species_dir)
+        if symptom_vocabulary is None:
+            print(f"No symptom vocabulary for {species}, using keyword matching")
+        species_frequency_tables = load_frequency_tables(species_dir)
+        if species_frequency_tables is None:
+            print(f"No frequency tables for {species}, using default frequencies")
+
+        encoder = build_encoder(model, features, species, symptom_vocabulary, species_frequency_tables)
+        compiled = None
+        if self.compile_forests and CompiledForest.supports(model):
+            compiled = CompiledForest.from_model(model)
+            print(f"Compiled {species} forest: {compiled.nbytes / 1024 / 1024:.1f} MB")
+        return SpeciesModel(
+            species, model, features, symptom_vocabulary, species_frequency_tables, encoder, version, compiled
+        )
+
+    def warm_up(self, entry):
+        """
+        Validate a loaded model with one prediction before it serves traffic.
+
+        Args:
+            entry (SpeciesModel): Model to check
+
+        Raises:
+            ValueError: If the model doesn't produce a valid probability row
+        """
+        X = entry.encoder.encode(WARM_UP_PATIENT)
+        probabilities = entry.model.predict_proba(with_feature_names(entry.model, X))
+        expected_shape = (1, len(entry.model.classes_))
+        if probabilities.shape != expected_shape:
+            raise ValueError(
+                f"Warm-up prediction for {entry.species} returned shape {probabilities.shape}, expected {expected_shape}"
+            )
+        if not np.all(np.isfinite(probabilities)):
+            raise ValueError(f"Warm-up prediction for {entry.species} returned non-finite probabilities")
+
+        # Score with the model itself if the compiled forest disagrees with it
+        # (multi-threaded sklearn sums trees in any order, so allow rounding)
+        if entry.compiled is not None and not np.allclose(
+                entry.compiled.predict_proba(X), probabilities, rtol=0, atol=1e-12):
+            print(f"Warning: compiled forest for {entry.species} does not match the model, using the model")
+            entry.compiled = None
+
+    def install(self, entry):
+        """Make a loaded model the current version for its species."""
+        species = entry.species
+        self.entries[species] = entry
+        self.models[species] = entry.model
+        self.feature_names[species] = entry.feature_names
+        self.encoders[species] = entry.encoder
+        if entry.symptom_vocabulary is not None:
+            self.symptom_vocabularies[species] = entry.symptom_vocabulary
+        else:
+            self.symptom_vocabularies.pop(species, None)
+        if entry.frequency_tables is not None:
+            self.frequency_tables[species] = entry.frequency_tables
+        else:
+            self.frequency_tables.pop(species, None)
+
+    def get(self, species):
+        """
+        Get the current model of a species, loading it on first use.
+
+        Args:
+            species (str): Animal species
+
+        Returns:
+            SpeciesModel: Current version, or None if the species has no usable model
+        """
+        entry = self.entries.get(species)
+        if entry is None and species in self.species_list:
+            entry = self.ensure_loaded(species)
+        return entry
+
+    async def get_async(self, species):
+        """
+        Get the current model of a species, loading it in a background thread on first use.
+
+        Args:
+            species (str): Animal species
+
+        Returns:
+            SpeciesModel: Current version, or None if the species has no usable model
+        """
+        entry = self.entries.get(species)
+        if entry is None and species in self.species_list:
+            loop = asyncio.get_running_loop()
+            entry = await loop.run_in_executor(None, self.ensure_loaded, species)
+        return entry
+
+    def ensure_loaded(self, species):
+        """
+        Load, check and install a species model unless it is already loaded.
+
+        Args:
+            species (str): Animal species
+
+        Returns:
+            SpeciesModel: Current version, or None if loading failed
+        """
+        with self.load_lock:
+            entry = self.entries.get(species)
+            if entry is not None:
+                return entry
+
+            version = self.file_version(species)
+            if version is None or self.failed_versions.get(species) == version:
+                return None
+
+            try:
+                entry = self.load_species(species)
+                self.warm_up(entry)
+                self.install(entry)
+                self.failed_versions.pop(species, None)
+                print(f"Loaded model for {species}")
+                return entry
+            except Exception as e:
+                self.failed_versions[species] = version
+                print(f"Error loading model for {species}: {str(e)}")
+                return None
+
+    def current_version(self, species):
+        """Version of the loaded model of a species, or None if it isn't loaded yet."""
+        entry = self.entries.get(species)
+        return entry.version if entry is not None else None
+
+    def is_supported(self, species):
+        """Whether a species has a loaded model or model files on disk, without loading it."""
+        return species in self.species_list and (species in self.entries or self.file_version(species) is not None)
+
+    def supported_species(self):
+        """Species whose model files are present, loaded or not."""
+        return [species for species in self.species_list if self.is_supported(species)]
+
+    def load_all(self):
+        """Load, check and install every species model found on disk up front."""
+        print(f"Loading models from: {self.models_dir}")
+
+        for species in self.species_list:
+            if self.file_version(species) is None:
+                print(f"Model files not found for {species}")
+                continue
+            self.ensure_loaded(species)
+
+        print(f"Loaded {len(self.entries)} models")
+
+    def reload_species(self, species):
+        """
+        Load, check and install a new version of a species model if its files changed.
+
+        The current version keeps serving until the new one has passed its
+        warm-up prediction; if loading or warm-up fails it stays in place.
+
+        Args:
+            species (str): Animal species
+
+        Returns:
+            str: 'reloaded' or 'unchanged'
+        """
+        with self.load_lock:
+            current = self.entries.get(species)
+            if current is not None and current.version == self.file_version(species):
+                return 'unchanged'
+
+            entry = self.load_species(species)
+            self.warm_up(entry)
+            self.install(entry)
+            print(f"Reloaded model for {species} (version {entry.version})")
+            return 'reloaded'
+
+    async def reload(self, species=None):
+        """
+        Reload changed species models in a background thread.
+
+        Args:
+            species (str): Species to reload, or None for every loaded species
+
+        Returns:
+            dict: Species -> 'reloaded', 'unchanged' or an error message
+        """
+        loop = asyncio.get_running_loop()
+        results = {}
+        for name in ([species] if species else list(self.entries.keys())):
+            if name not in self.species_list:
+                results[name] = 'error: unsupported species'
+                continue
+            try:
+                results[name] = await loop.run_in_executor(None, self.reload_species, name)
+            except Exception as e:
+                print(f"Error reloading model for {name}: {str(e)}")
+                results[name] = f"error: {str(e)}"
+        return results
+
+    async def watch(self, interval=10.0):
+        """
+        Poll the species directories and reload models whose files changed.
+
+        A change is only picked up once the files look the same on two
+        consecutive polls, so a model that is still being written isn't loaded.
+        Species that haven't been requested yet are left to load lazily.
+
+        Args:
+            interval (float): Seconds between polls
+        """
+        pending = {}
+        failed = {}
+        while True:
+            await asyncio.sleep(interval)
+            for species in self.species_list:
+                version = self.file_version(species)
+                current = self.entries.get(species)
+                if version is None or current is None or current.version == version:
+                    pending.pop(species, None)
+                    continue
+                if pending.get(species) != version:
+                    pending[species] = version
+                    continue
+                # Don't retry a broken file every poll; wait for it to change again
+                if failed.get(species) == version:
+                    continue
+
+                result = (await self.reload(species))[species]
+                if result.startswith('error'):
+                    failed[species] = version
+                else:
+                    failed.pop(species, None)
+                    pending.pop(species, None)
@@ -5,22 +5,61 @@ import pandas as pd
 import numpy as np
 import joblib
 import json
+from collections.abc import Mapping
 
 # Add the current directory to the path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
-def load_species_models(models_dir):
+from model_registry import load_model
+
+class LazySpeciesModels(Mapping):
+    """
+    Read-only mapping of species to (model, features) that loads each model on first access.
+    
+    Models are loaded with ``load_model``; scikit-learn copies each tree's
+    arrays into private memory, so every process holds its own copy of the
+    models it has used.
+    """
+    
+    def __init__(self, models_dir, species_paths):
+        self.models_dir = models_dir
+        self.species_paths = species_paths
+        self.loaded = {}
+    
+    def __getitem__(self, species):
+        if species not in self.loaded:
+            if species not in self.species_paths:
+                raise KeyError(species)
+            model_path, features_path = self.species_paths[species]
+            model = load_model(model_path)
+            features = joblib.load(features_path)
+            self.loaded[species] = (model, features)
+            print(f"Loaded model for {species} with {len(features)} features")
+        return self.loaded[species]
+    
+    def __contains__(self, species):
+        # Membership only checks that the files exist, it doesn't load the model
+        return species in self.species_paths
+    
+    def __iter__(self):
+        return iter(self.species_paths)
+    
+    def __len__(self):
+        return len(self.species_paths)
+
+def load_species_models(models_dir, lazy=True):
     """
     Load all species models from the models directory.
     
     Args:
         models_dir (str): Directory containing species model subdirectories
+        lazy (bool): Defer loading each model until its species is first used
         
     Returns:
-        dict: Dictionary mapping species to (model, features) tuples
+        Mapping: Species to (model, features) tuples
     """
-    species_models = {}
+    species_paths = {}
     
     # List all subdirectories (one per species)
     for species_dir in os.listdir(models_dir):
@@ -39,18 +78,21 @@ def load_species_models(models_dir):
             print(f"Warning: Missing files for species {species_dir}")
             continue
         
-        # Load model and features
+        species_paths[species_dir] = (model_path, features_path)
+    
+    species_models = LazySpeciesModels(models_dir, species_paths)
+    if lazy:
+        return species_models
+    
+    # Load every model now, skipping the ones that fail
+    loaded = {}
+    for species in species_paths:
         try:
-            model = joblib.load(model_path)
-            features = joblib.load(features_path)
-            
-            # Store in dictionary
-            species_models[species_dir] = (model, features)
-            print(f"Loaded model for {species_dir} with {len(features)} features")
+            loaded[species] = species_models[species]
         except Exception as e:
-            print(f"Error loading model for {species_dir}: {str(e)}")
+            print(f"Error loading model for {species}: {str(e)}")
     
-    return species_models
+    return loaded
 
 def predict_disease(input_data, species_models):
     """
@@ -73,8 +115,11 @@ def predict_disease(input_data, species_models):
             'available_species': list(species_models.keys())
         }
     
-    # Get model and features for this species
-    model, features = species_models[species]
+    # Get model and features for this species (loaded on first use)
+    try:
+        model, features = species_models[species]
+    except Exception as e:
+        return {'error': f"Error loading model for species '{species}': {str(e)}"}
     
     # Prepare input data as DataFrame
     input_df = pd.DataFrame([input_data])
@@ -0,0 +1,160 @@
+import sys
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def feature_key(species, version, row, top_n):
+    """
+    Canonical cache key for one encoded patient.
+
+    The key hashes the feature vector's float64 bytes together with the
+    species, model version and number of predictions, so a model reload
+    changes every key and old entries are never served.
+
+    Args:
+        species (str): Animal species
+        version (str): Model version the row is scored with
+        row (numpy.ndarray): Encoded feature vector
+        top_n (int): Number of predictions requested
+
+    Returns:
+        bytes: 16-byte digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{species}\0{version}\0{top_n}\0".encode())
+    # Adding 0.0 turns -0.0 into 0.0, which encode the same patient
+    digest.update((np.ascontiguousarray(row, dtype=np.float64) + 0.0).tobytes())
+    return digest.digest()
+
+
+def _result_size(result):
+    """Approximate memory used by a list of (disease, probability) tuples."""
+    size = sys.getsizeof(result)
+    for disease, probability in result:
+        size += sys.getsizeof((disease, probability)) + sys.getsizeof(disease) + sys.getsizeof(probability)
+    return size
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache of prediction results with a TTL and a memory cap.
+
+    Entries are evicted least recently used first once either the number of
+    entries or their approximate size exceeds its limit.
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=64 * 1024 * 1024, ttl_seconds=3600.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of cached results (0 disables the cache)
+            max_bytes (int): Approximate memory cap for keys and results
+            ttl_seconds (float): How long a result stays valid (0 means forever)
+        """
+        self.max_entries = max(0, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))
+        self.ttl = max(0.0, float(ttl_seconds))
+        self.entries = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def get(self, key):
+        """
+        Look up a result.
+
+        Args:
+            key (bytes): Key from ``feature_key``
+
+        Returns:
+            The cached result, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            result, size, expires_at = entry
+            if expires_at is not None and time.monotonic() >= expires_at:
+                del self.entries[key]
+                self.current_bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        """
+        Store a result, evicting the least recently used entries if needed.
+
+        Args:
+            key (bytes): Key from ``feature_key``
+            result (list): (disease, probability) tuples
+        """
+        if not self.enabled:
+            return
+
+        size = sys.getsizeof(key) + _result_size(result)
+        if size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+
+            self.entries[key] = (result, size, expires_at)
+            self.current_bytes += size
+
+            while len(self.entries) > self.max_entries or self.current_bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self.entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """
+        Get hit-rate and size metrics.
+
+        Returns:
+            dict: Counters, hit rate and current size
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'entries': len(self.entries),
+                'bytes': self.current_bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
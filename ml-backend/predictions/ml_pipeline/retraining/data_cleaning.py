@@ -1,6 +1,15 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
 
+# Add the parent pipeline directory to the path for the shared dataset cache
+pipeline_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+if pipeline_dir not in sys.path:
+    sys.path.append(pipeline_dir)
+
+from dataset_cache import load_dataset
+
 def clean_data(data_path):
     """
     Loads the data from the specified data path and performs basic cleaning.
@@ -11,14 +20,9 @@ def clean_data(data_path):
     Returns:
         pandas.DataFrame: The cleaned data.
     """
-    # Load the data
-    try:
-        df = pd.read_csv(data_path, encoding='latin1')
-    except UnicodeDecodeError:
-        try:
-            df = pd.read_csv(data_path, encoding='ISO-8859-1')
-        except UnicodeDecodeError:
-            df = pd.read_csv(data_path, encoding='cp1252')
+    # Load the data (parsed once, then served from the columnar cache);
+    # text columns stay plain objects for the one-hot encoding downstream
+    df = load_dataset(data_path, categorical=False)
     
     print(f"Loaded data with shape: {df.shape}")
     
@@ -1,7 +1,6 @@
 import pandas as pd
 import numpy as np
 from sklearn.utils import resample
-from collections import Counter
 
 def handle_class_imbalance(X_train, y_train, method='undersample', min_samples=50, max_samples=500):
     """
@@ -19,77 +18,61 @@ def handle_class_imbalance(X_train, y_train, method='undersample', min_samples=5
     """
     print(f"Handling class imbalance using {method} method...")
     
-    # Count samples per class
-    class_counts = Counter(y_train)
-    print(f"Original class distribution: {len(class_counts)} classes")
-    print(f"Min class count: {min(class_counts.values())}, Max class count: {max(class_counts.values())}")
+    # Group row positions by class in one pass, keeping classes in order of
+    # first appearance and rows in their original order within each class
+    y_values = np.asarray(y_train)
+    classes, first_positions, class_ids, counts = np.unique(
+        y_values, return_index=True, return_inverse=True, return_counts=True
+    )
+    rows_by_class = np.split(np.argsort(class_ids, kind='stable'), np.cumsum(counts)[:-1])
+    class_order = np.argsort(first_positions)
+    class_rows = [rows_by_class[i] for i in class_order]
     
-    # Combine X and y for resampling
-    train_data = pd.concat([X_train, pd.Series(y_train, name='target')], axis=1)
-    target_col = 'target'
+    print(f"Original class distribution: {len(classes)} classes")
+    print(f"Min class count: {counts.min()}, Max class count: {counts.max()}")
     
-    # Initialize resampled data
-    resampled_data = pd.DataFrame(columns=train_data.columns)
+    # Row positions to take for each class; resampling positions with the
+    # same seed picks exactly the rows resample() would pick from the frame
+    selected = []
+    moved_to_end = []
     
     if method in ['undersample', 'both']:
         # Undersample majority classes
-        for class_val, count in class_counts.items():
-            class_data = train_data[train_data[target_col] == class_val]
-            
-            # If class has more than max_samples, undersample it
-            if count > max_samples:
-                class_data = resample(
-                    class_data, 
-                    replace=False,
-                    n_samples=max_samples,
-                    random_state=42
-                )
-            
-            resampled_data = pd.concat([resampled_data, class_data])
+        for rows in class_rows:
+            if len(rows) > max_samples:
+                rows = resample(rows, replace=False, n_samples=max_samples, random_state=42)
+            selected.append(rows)
     
     if method in ['oversample', 'both']:
         # Oversample minority classes
-        for class_val, count in class_counts.items():
-            if method == 'both':
-                # If we've already undersampled, get the class data from resampled_data
-                class_data = resampled_data[resampled_data[target_col] == class_val]
-                count = len(class_data)
-            else:
-                # Otherwise get it from the original data
-                class_data = train_data[train_data[target_col] == class_val]
+        source_rows = selected if method == 'both' else class_rows
+        for i, rows in enumerate(list(source_rows)):
+            count = len(rows)
             
             # If class has fewer than min_samples, oversample it
             if count < min_samples:
                 # Calculate how many samples to generate
                 n_samples = min(min_samples, max(count * 2, min_samples))
-                
-                # Oversample with replacement
-                class_data_oversampled = resample(
-                    class_data,
-                    replace=True,
-                    n_samples=n_samples,
-                    random_state=42
-                )
+                oversampled = resample(rows, replace=True, n_samples=n_samples, random_state=42)
                 
                 if method == 'both':
-                    # Remove original samples from resampled_data and add oversampled ones
-                    resampled_data = resampled_data[resampled_data[target_col] != class_val]
-                    resampled_data = pd.concat([resampled_data, class_data_oversampled])
+                    # Oversampled classes replace their rows and move to the end
+                    selected[i] = rows[:0]
+                    moved_to_end.append(oversampled)
                 else:
-                    # Add oversampled data to resampled_data
-                    resampled_data = pd.concat([resampled_data, class_data_oversampled])
+                    selected.append(oversampled)
             elif method == 'oversample':
-                # If not oversampling this class, still add it to resampled_data
-                resampled_data = pd.concat([resampled_data, class_data])
+                selected.append(rows)
     
-    # Split back into X and y
-    X_resampled = resampled_data.drop(columns=[target_col])
-    y_resampled = resampled_data[target_col]
+    # Gather all rows with a single take
+    take = np.concatenate(selected + moved_to_end) if selected or moved_to_end else np.array([], dtype=np.intp)
+    X_resampled = X_train.iloc[take]
+    y_resampled = pd.Series(y_values[take], index=X_resampled.index, name='target')
     
     # Print resampling results
-    new_class_counts = Counter(y_resampled)
-    print(f"After resampling: {len(new_class_counts)} classes")
-    print(f"Min class count: {min(new_class_counts.values())}, Max class count: {max(new_class_counts.values())}")
+    new_counts = np.unique(y_resampled.to_numpy(), return_counts=True)[1]
+    print(f"After resampling: {len(new_counts)} classes")
+    print(f"Min class count: {new_counts.min()}, Max class count: {new_counts.max()}")
     print(f"Original data shape: {X_train.shape}, Resampled data shape: {X_resampled.shape}")
     
-    return X_resampled, y_resampled
\ No newline at end of file
+    return X_resampled, y_resampled
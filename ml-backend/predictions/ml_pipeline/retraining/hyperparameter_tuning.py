@@ -1,30 +1,30 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
+import time
+from scipy.stats import norm
+from sklearn.base import clone
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.gaussian_process.kernels import Matern, WhiteKernel
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, HalvingGridSearchCV, HalvingRandomSearchCV
+from sklearn.model_selection import ParameterGrid, cross_val_score
 from sklearn.linear_model import LogisticRegression, LinearRegression
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
 from sklearn.svm import SVC, SVR
 from sklearn.neighbors import KNeighborsClassifier, KNeighborsRegressor
 from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
 
-def tune_hyperparameters(X_train, y_train, model_name, problem_type='classification', method='grid', cv=5):
+def get_search_space(model_name, problem_type='classification'):
     """
-    Tunes hyperparameters for the specified model.
+    Gets the untuned model, its parameter grid and the scoring metric.
     
     Args:
-        X_train (pandas.DataFrame): Training feature matrix.
-        y_train (pandas.Series): Training target variable.
         model_name (str): Name of the model to tune.
         problem_type (str): 'classification' or 'regression'.
-        method (str): 'grid' or 'random' search.
-        cv (int): Number of cross-validation folds.
         
     Returns:
-        tuple: (best_model, best_params) - The best model and its parameters.
+        tuple: (model, param_grid, scoring)
     """
-    print(f"Tuning hyperparameters for {model_name} using {method} search...")
-    
-    # Define model and parameter grid based on model name and problem type
     if problem_type == 'classification':
         if model_name == 'LogisticRegression':
             model = LogisticRegression(random_state=42)
@@ -108,25 +108,205 @@ def tune_hyperparameters(X_train, y_train, model_name, problem_type='classificat
         
         scoring = 'neg_mean_squared_error'
     
+    return model, param_grid, scoring
+
+
+def _encode_candidates(candidates, param_grid):
+    """
+    Encodes parameter combinations as numeric vectors for the surrogate model.
+    
+    Each parameter becomes its position in the grid scaled to [0, 1], so ordered
+    values such as C or max_depth keep their order.
+    """
+    names = sorted(param_grid)
+    encoded = np.zeros((len(candidates), len(names)))
+    for j, name in enumerate(names):
+        values = param_grid[name]
+        scale = max(len(values) - 1, 1)
+        for i, params in enumerate(candidates):
+            encoded[i, j] = values.index(params[name]) / scale
+    return encoded
+
+
+def bayes_search(model, param_grid, scoring, X_train, y_train, cv=5, n_trials=20, n_initial=5, random_state=42):
+    """
+    Searches the parameter grid with Bayesian optimisation under a fixed trial budget.
+    
+    A Gaussian process fitted to the cross-validated scores so far picks the
+    next combination by expected improvement; the first n_initial trials are
+    chosen at random.
+    
+    Args:
+        model: Unfitted estimator.
+        param_grid (dict): Candidate values per parameter.
+        scoring (str): Scikit-learn scorer name.
+        X_train (pandas.DataFrame): Training feature matrix.
+        y_train (pandas.Series): Training target variable.
+        cv (int): Number of cross-validation folds.
+        n_trials (int): Number of parameter combinations to evaluate.
+        n_initial (int): Random trials before the surrogate model is used.
+        random_state (int): Random seed for reproducibility.
+        
+    Returns:
+        tuple: (best_model, best_params, best_score) - The refitted best model, its parameters and CV score.
+    """
+    candidates = list(ParameterGrid(param_grid))
+    encoded = _encode_candidates(candidates, param_grid)
+    rng = np.random.RandomState(random_state)
+    n_trials = min(n_trials, len(candidates))
+    
+    tried = []
+    scores = []
+    for trial in range(n_trials):
+        remaining = np.setdiff1d(np.arange(len(candidates)), tried)
+        if trial < n_initial:
+            index = rng.choice(remaining)
+        else:
+            surrogate = GaussianProcessRegressor(
+                kernel=Matern(nu=2.5) + WhiteKernel(), normalize_y=True, random_state=random_state
+            )
+            surrogate.fit(encoded[tried], scores)
+            mean, std = surrogate.predict(encoded[remaining], return_std=True)
+            std = np.maximum(std, 1e-9)
+            improvement = mean - max(scores)
+            z = improvement / std
+            expected_improvement = improvement * norm.cdf(z) + std * norm.pdf(z)
+            index = remaining[np.argmax(expected_improvement)]
+        
+        candidate_model = clone(model).set_params(**candidates[index])
+        score = cross_val_score(candidate_model, X_train, y_train, scoring=scoring, cv=cv, n_jobs=-1).mean()
+        tried.append(index)
+        scores.append(score)
+        print(f"Trial {trial + 1}/{n_trials}: {candidates[index]} -> {score:.4f}")
+    
+    best = int(np.argmax(scores))
+    best_params = candidates[tried[best]]
+    best_model = clone(model).set_params(**best_params)
+    best_model.fit(X_train, y_train)
+    return best_model, best_params, scores[best]
+
+
+def search_hyperparameters(model, param_grid, scoring, X_train, y_train, method='grid', cv=5, n_trials=20):
+    """
+    Runs one hyperparameter search.
+    
+    'halving' and 'halving_random' use successive halving: all candidates start
+    on a small budget and only the best third move on to a larger one. The
+    budget is the number of trees for forests and the number of samples
+    otherwise, and the first round's budget is chosen so the last round uses
+    close to all of it. 'halving_random' starts from n_trials candidates.
+    
+    Args:
+        model: Unfitted estimator.
+        param_grid (dict): Candidate values per parameter.
+        scoring (str): Scikit-learn scorer name.
+        X_train (pandas.DataFrame): Training feature matrix.
+        y_train (pandas.Series): Training target variable.
+        method (str): 'grid', 'random', 'halving', 'halving_random' or 'bayes'.
+        cv (int): Number of cross-validation folds.
+        n_trials (int): Number of candidates evaluated by 'random', 'halving_random' and 'bayes'.
+        
+    Returns:
+        tuple: (best_model, best_params, best_score) - The best model, its parameters and CV score.
+    """
+    if method == 'bayes':
+        return bayes_search(model, param_grid, scoring, X_train, y_train, cv=cv, n_trials=n_trials)
+    
+    if method in ('halving', 'halving_random'):
+        # 'exhaust' sizes the first round so the last one gets close to the full
+        # budget; the default 'smallest' would stop far below it
+        search_kwargs = {
+            'factor': 3, 'min_resources': 'exhaust', 'scoring': scoring, 'cv': cv,
+            'n_jobs': -1, 'random_state': 42, 'verbose': 1
+        }
+        if 'n_estimators' in param_grid:
+            # Use the number of trees as the budget rather than a parameter to search;
+            # the last round uses close to the largest forest in the grid
+            max_trees = max(param_grid['n_estimators'])
+            param_grid = {name: values for name, values in param_grid.items() if name != 'n_estimators'}
+            search_kwargs.update(resource='n_estimators', max_resources=max_trees)
+        if method == 'halving':
+            search = HalvingGridSearchCV(model, param_grid, **search_kwargs)
+        else:
+            # min_resources and n_candidates can't both be 'exhaust'
+            n_candidates = min(n_trials, len(ParameterGrid(param_grid)))
+            search = HalvingRandomSearchCV(model, param_grid, n_candidates=n_candidates, **search_kwargs)
+    elif method == 'grid':
+        search = GridSearchCV(model, param_grid, scoring=scoring, cv=cv, n_jobs=-1, verbose=1)
+    elif method == 'random':
+        search = RandomizedSearchCV(model, param_grid, n_iter=n_trials, scoring=scoring, cv=cv, n_jobs=-1, random_state=42, verbose=1)
+    else:
+        raise ValueError(f"Unsupported search method: {method}")
+    
+    search.fit(X_train, y_train)
+    return search.best_estimator_, search.best_params_, search.best_score_
+
+
+def tune_hyperparameters(X_train, y_train, model_name, problem_type='classification', method='grid', cv=5, n_trials=20):
+    """
+    Tunes hyperparameters for the specified model.
+    
+    Args:
+        X_train (pandas.DataFrame): Training feature matrix.
+        y_train (pandas.Series): Training target variable.
+        model_name (str): Name of the model to tune.
+        problem_type (str): 'classification' or 'regression'.
+        method (str): 'grid', 'random', 'halving', 'halving_random' or 'bayes' search.
+        cv (int): Number of cross-validation folds.
+        n_trials (int): Trial budget for 'random' and 'bayes' search.
+        
+    Returns:
+        tuple: (best_model, best_params) - The best model and its parameters.
+    """
+    print(f"Tuning hyperparameters for {model_name} using {method} search...")
+    
+    model, param_grid, scoring = get_search_space(model_name, problem_type)
+    
     # If there are no hyperparameters to tune, return the model as is
     if not param_grid:
         print(f"No hyperparameters to tune for {model_name}")
         model.fit(X_train, y_train)
         return model, {}
     
-    # Perform hyperparameter search
-    if method == 'grid':
-        search = GridSearchCV(model, param_grid, scoring=scoring, cv=cv, n_jobs=-1, verbose=1)
-    else:  # random search
-        search = RandomizedSearchCV(model, param_grid, n_iter=20, scoring=scoring, cv=cv, n_jobs=-1, random_state=42, verbose=1)
+    best_model, best_params, best_score = search_hyperparameters(
+        model, param_grid, scoring, X_train, y_train, method=method, cv=cv, n_trials=n_trials
+    )
     
-    search.fit(X_train, y_train)
+    print(f"Best parameters: {best_params}")
+    print(f"Best score: {best_score:.4f}")
     
-    # Get the best model and parameters
-    best_model = search.best_estimator_
-    best_params = search.best_params_
+    return best_model, best_params
+
+
+def benchmark_search_methods(X_train, y_train, model_name, problem_type='classification',
+                             methods=('grid', 'halving', 'halving_random', 'bayes'), cv=5, n_trials=20):
+    """
+    Compares search methods by best cross-validated score and wall-clock time.
     
-    print(f"Best parameters: {best_params}")
-    print(f"Best score: {search.best_score_:.4f}")
+    Args:
+        X_train (pandas.DataFrame): Training feature matrix.
+        y_train (pandas.Series): Training target variable.
+        model_name (str): Name of the model to tune.
+        problem_type (str): 'classification' or 'regression'.
+        methods (tuple): Search methods to run.
+        cv (int): Number of cross-validation folds.
+        n_trials (int): Trial budget for 'random' and 'bayes' search.
+        
+    Returns:
+        dict: Best score, best parameters and time in seconds for each method.
+    """
+    model, param_grid, scoring = get_search_space(model_name, problem_type)
+    report = {}
+    for method in methods:
+        start_time = time.time()
+        _, best_params, best_score = search_hyperparameters(
+            model, param_grid, scoring, X_train, y_train, method=method, cv=cv, n_trials=n_trials
+        )
+        report[method] = {'best_score': best_score, 'best_params': best_params, 'time': time.time() - start_time}
     
-    return best_model, best_params
\ No newline at end of file
+    baseline = report.get('grid')
+    print(f"\n{'Method':<16}{'Best score':>12}{'Time (s)':>12}{'Speed-up':>10}")
+    for method, result in report.items():
+        speed_up = f"{baseline['time'] / result['time']:.1f}x" if baseline else '-'
+        print(f"{method:<16}{result['best_score']:>12.4f}{result['time']:>12.1f}{speed_up:>10}")
+    return report
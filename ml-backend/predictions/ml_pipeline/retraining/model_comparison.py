@@ -1,25 +1,152 @@
-import pandas as pd
 import numpy as np
 from sklearn.linear_model import LogisticRegression, LinearRegression
 from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
 from sklearn.svm import SVC, SVR
 from sklearn.neighbors import KNeighborsClassifier, KNeighborsRegressor
 from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
-from sklearn.model_selection import cross_val_score
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import check_cv
+from joblib import Parallel, delayed, parallel_config
+import joblib
+import os
+import threading
 import time
+import psutil
 
-def compare_models(X_train, y_train, problem_type='classification', cv=5):
+# How often the worker's resident memory is sampled while a fold is fitted
+RSS_SAMPLE_INTERVAL = 0.01
+
+
+def dataset_hash(X, y):
+    """
+    Hash the training data so cached fold results can be matched to it.
+
+    Args:
+        X (pandas.DataFrame): Training feature matrix.
+        y (pandas.Series): Training target variable.
+
+    Returns:
+        str: Hex digest of the features, column names and target.
+    """
+    return joblib.hash((X, y))
+
+
+def _take(data, indices):
+    """Select rows by position from a DataFrame, Series or array."""
+    if hasattr(data, 'iloc'):
+        return data.iloc[indices]
+    return data[indices]
+
+
+def _fold_cache_path(cache_dir, data_hash, name, model, scoring, cv_splitter, fold):
+    """Path of the cached result for one estimator on one fold."""
+    key = joblib.hash((type(model).__name__, model.get_params(), scoring, repr(cv_splitter), fold))
+    return os.path.join(cache_dir, data_hash, f"{name}_{fold}_{key}.pkl")
+
+
+class _PeakRSS:
+    """
+    Track how far the process's resident memory rises above its starting point.
+
+    RSS is sampled from a background thread, so native allocations (libsvm,
+    the Cython tree builder) are counted and the fit itself isn't slowed
+    down. Spikes shorter than the sample interval can be missed.
+    """
+
+    def __enter__(self):
+        self.process = psutil.Process()
+        self.baseline = self.peak = self.process.memory_info().rss
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._sample, daemon=True)
+        self.thread.start()
+        return self
+
+    def _sample(self):
+        while not self.stopped.wait(RSS_SAMPLE_INTERVAL):
+            self.peak = max(self.peak, self.process.memory_info().rss)
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+
+    @property
+    def increase(self):
+        return self.peak - self.baseline
+
+
+def _evaluate_fold(model, X, y, train_index, test_index, scoring, cache_path=None):
+    """
+    Fit a clone of the model on one training fold and score it on the held-out fold.
+
+    Args:
+        model: Unfitted estimator.
+        X (pandas.DataFrame): Training feature matrix.
+        y (pandas.Series): Training target variable.
+        train_index (numpy.ndarray): Row positions to fit on.
+        test_index (numpy.ndarray): Row positions to score.
+        scoring (str): Scikit-learn scorer name.
+        cache_path (str): Where to store the result, or None to skip caching.
+
+    Returns:
+        dict: Fold score, start and end timestamps, and the rise in the
+        worker's resident memory during the fit in bytes.
+    """
+    start_time = time.time()
+    with _PeakRSS() as memory:
+        estimator = clone(model)
+        estimator.fit(_take(X, train_index), _take(y, train_index))
+        score = get_scorer(scoring)(estimator, _take(X, test_index), _take(y, test_index))
+    end_time = time.time()
+
+    result = {
+        'score': float(score),
+        'start': start_time,
+        'end': end_time,
+        'time': end_time - start_time,
+        'peak_memory': memory.increase
+    }
+    if cache_path is not None:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # Write to a temporary file first so a crash never leaves a truncated cache entry
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        joblib.dump(result, tmp_path)
+        os.replace(tmp_path, cache_path)
+    return result
+
+
+def _safe_evaluate_fold(*args):
+    """Run _evaluate_fold, returning a failed fit as an error entry instead of raising."""
+    try:
+        return _evaluate_fold(*args)
+    except Exception as e:
+        return {'error': str(e)}
+
+
+def compare_models(X_train, y_train, problem_type='classification', cv=5, n_jobs=-1, cache_dir=None):
     """
     Compares different models on the dataset.
     
+    Every (model, fold) pair is fitted as its own task under one joblib
+    backend, so slow models such as the SVM no longer hold up the rest.
+    When cache_dir is given each fold result is stored under the dataset
+    hash and the model's parameters, and unchanged folds are not refitted.
+    
     Args:
         X_train (pandas.DataFrame): Training feature matrix.
         y_train (pandas.Series): Training target variable.
         problem_type (str): 'classification' or 'regression'.
         cv (int): Number of cross-validation folds.
+        n_jobs (int): Number of parallel fold fits (-1 uses all cores).
+        cache_dir (str): Directory for cached fold results, or None to disable caching.
         
     Returns:
         tuple: (results, best_model_name) - Dictionary of model results and name of the best model.
+        Besides the scores, each model's entry has 'time' (wall time from its
+        first fold starting to its last finishing), 'fit_time' (summed fold
+        times), 'peak_memory_mb' (largest rise in a worker's resident memory
+        while fitting one fold, sampled every 10 ms) and 'cached_folds'.
     """
     print(f"Comparing models using {cv}-fold cross-validation...")
     
@@ -43,38 +170,91 @@ def compare_models(X_train, y_train, problem_type='classification', cv=5):
         }
         scoring = 'neg_mean_squared_error'
     
+    # Same folds as cross_val_score: stratified for classifiers, plain K-fold otherwise
+    cv_splitter = check_cv(cv, y_train, classifier=problem_type == 'classification')
+    folds = list(cv_splitter.split(X_train, y_train))
+    data_hash = dataset_hash(X_train, y_train) if cache_dir else None
+    
+    # Load cached fold results and collect the fits that still have to run
+    fold_results = {name: [None] * len(folds) for name in models}
+    tasks = []
+    for name, model in models.items():
+        for fold, (train_index, test_index) in enumerate(folds):
+            cache_path = None
+            if cache_dir:
+                cache_path = _fold_cache_path(cache_dir, data_hash, name, model, scoring, cv_splitter, fold)
+                if os.path.exists(cache_path):
+                    try:
+                        fold_results[name][fold] = dict(joblib.load(cache_path), cached=True)
+                        continue
+                    except Exception as e:
+                        # Truncated or unreadable entry: drop it and fit the fold again
+                        print(f"Discarding unreadable cache entry {cache_path}: {str(e)}")
+                        os.remove(cache_path)
+            tasks.append((name, fold, model, train_index, test_index, cache_path))
+    
+    n_cached = len(models) * len(folds) - len(tasks)
+    if n_cached:
+        print(f"Reusing {n_cached} cached fold results from {cache_dir}")
+    
+    # One shared backend for every fit, so folds of different models run side by side
+    start_time = time.time()
+    with parallel_config(backend='loky', n_jobs=n_jobs):
+        outputs = Parallel(return_as='generator')(
+            delayed(_safe_evaluate_fold)(model, X_train, y_train, train_index, test_index, scoring, cache_path)
+            for _, _, model, train_index, test_index, cache_path in tasks
+        )
+        for (name, fold, _, _, _, _), output in zip(tasks, outputs):
+            fold_results[name][fold] = output
+    print(f"Fitted {len(tasks)} folds in {time.time() - start_time:.2f}s")
+    
     # Evaluate each model
     results = {}
-    for name, model in models.items():
-        start_time = time.time()
+    for name, folds_for_model in fold_results.items():
+        errors = [result['error'] for result in folds_for_model if 'error' in result]
+        if errors:
+            print(f"Error evaluating {name}: {errors[0]}")
+            results[name] = {'error': errors[0]}
+            continue
         
-        try:
-            scores = cross_val_score(model, X_train, y_train, cv=cv, scoring=scoring)
-            
-            if problem_type == 'classification':
-                mean_score = scores.mean()
-                std_score = scores.std()
-                results[name] = {
-                    'mean_score': mean_score,
-                    'std_score': std_score,
-                    'time': time.time() - start_time
-                }
-                print(f"{name}: F1 = {mean_score:.4f} (±{std_score:.4f}), Time: {results[name]['time']:.2f}s")
-            else:  # regression
-                # Convert negative MSE to positive RMSE for easier interpretation
-                rmse_scores = np.sqrt(-scores)
-                mean_rmse = rmse_scores.mean()
-                std_rmse = rmse_scores.std()
-                results[name] = {
-                    'mean_rmse': mean_rmse,
-                    'std_rmse': std_rmse,
-                    'time': time.time() - start_time
-                }
-                print(f"{name}: RMSE = {mean_rmse:.4f} (±{std_rmse:.4f}), Time: {results[name]['time']:.2f}s")
+        scores = np.array([result['score'] for result in folds_for_model])
+        # Wall time from the model's first fold starting to its last one finishing
+        # (folds served from the cache took no time in this run)
+        fitted = [result for result in folds_for_model if not result.get('cached', False)]
+        elapsed = max(r['end'] for r in fitted) - min(r['start'] for r in fitted) if fitted else 0.0
+        fit_time = sum(result['time'] for result in fitted)
+        # Largest rise in a worker's resident memory while fitting one fold
+        peak_memory_mb = max(result['peak_memory'] for result in folds_for_model) / (1024 * 1024)
+        cached_folds = len(folds_for_model) - len(fitted)
         
-        except Exception as e:
-            print(f"Error evaluating {name}: {str(e)}")
-            results[name] = {'error': str(e)}
+        if problem_type == 'classification':
+            mean_score = scores.mean()
+            std_score = scores.std()
+            results[name] = {
+                'mean_score': mean_score,
+                'std_score': std_score,
+                'time': elapsed,
+                'fit_time': fit_time,
+                'peak_memory_mb': peak_memory_mb,
+                'cached_folds': cached_folds
+            }
+            print(f"{name}: F1 = {mean_score:.4f} (±{std_score:.4f}), Time: {elapsed:.2f}s, "
+                  f"Peak memory: {peak_memory_mb:.1f} MB")
+        else:  # regression
+            # Convert negative MSE to positive RMSE for easier interpretation
+            rmse_scores = np.sqrt(-scores)
+            mean_rmse = rmse_scores.mean()
+            std_rmse = rmse_scores.std()
+            results[name] = {
+                'mean_rmse': mean_rmse,
+                'std_rmse': std_rmse,
+                'time': elapsed,
+                'fit_time': fit_time,
+                'peak_memory_mb': peak_memory_mb,
+                'cached_folds': cached_folds
+            }
+            print(f"{name}: RMSE = {mean_rmse:.4f} (±{std_rmse:.4f}), Time: {elapsed:.2f}s, "
+                  f"Peak memory: {peak_memory_mb:.1f} MB")
     
     # Determine the best model
     if problem_type == 'classification':
@@ -39,7 +39,7 @@ except ImportError:
     from .model_optimization import diagnose_model_fit, address_overfitting, address_underfitting
 
 def retrain_model(data_path, target_column, problem_type='classification', 
-                 test_size=0.2, random_state=42, output_dir='model_output'):
+                 test_size=0.2, random_state=42, output_dir='model_output', tuning_method='grid'):
     """
     Complete pipeline for retraining a machine learning model
     
@@ -57,6 +57,8 @@ def retrain_model(data_path, target_column, problem_type='classification',
         Random seed for reproducibility
     output_dir : str
         Directory to save model artifacts
+    tuning_method : str
+        Hyperparameter search: 'grid', 'random', 'halving', 'halving_random' or 'bayes'
     
     Returns:
     --------
@@ -123,12 +125,15 @@ def retrain_model(data_path, target_column, problem_type='classification',
     
     # Step 8: Compare different models
     print("\nStep 8: Compare different models")
-    model_results, best_model_name = compare_models(X_train, y_train, problem_type)
+    # Fold results are cached per dataset and model, so reruns only refit what changed
+    model_results, best_model_name = compare_models(
+        X_train, y_train, problem_type, cache_dir=os.path.join(output_dir, 'comparison_cache')
+    )
     
     # Step 9: Hyperparameter tuning for the best model
     print("\nStep 9: Hyperparameter tuning")
     best_model, best_params = tune_hyperparameters(
-        X_train, y_train, best_model_name, problem_type, method='grid'
+        X_train, y_train, best_model_name, problem_type, method=tuning_method
     )
     
     # Step 10: Evaluate the best model
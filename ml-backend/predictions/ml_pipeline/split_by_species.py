@@ -1,75 +1,164 @@
 import pandas as pd
 import os
 
-def split_dataset_by_species(input_file, output_dir):
+try:
+    from dataset_cache import load_dataset
+except ImportError:
+    from .dataset_cache import load_dataset
+
+def species_file_name(species):
+    """Clean per-species file name (spaces become underscores, lowercase)."""
+    species_clean = str(species).lower().replace(' ', '_')
+    return f"future_{species_clean}_disease.csv"
+
+def write_species_summary(species_counts, species_files, output_dir):
+    """
+    Write species_summary.csv with the record count and file of each species.
+    
+    File names are stored relative to the output directory so the summary
+    stays valid when the directory is moved to another machine.
+    
+    Args:
+        species_counts (dict): Mapping of species to record counts
+        species_files (dict): Mapping of species to output file paths
+        output_dir (str): Directory holding the species files
+    
+    Returns:
+        str: Path of the summary file
+    """
+    summary = pd.DataFrame({
+        'Species': list(species_files.keys()),
+        'Count': [species_counts[species] for species in species_files.keys()],
+        'File': [os.path.basename(path) for path in species_files.values()]
+    })
+    
+    summary_file = os.path.join(output_dir, "species_summary.csv")
+    summary.to_csv(summary_file, index=False)
+    print(f"Saved summary to {summary_file}")
+    return summary_file
+
+def split_dataset_by_species(input_file, output_dir, stream=False, chunksize=100000):
     """
     Split the dataset by species and save as separate CSV files.
     
     Args:
         input_file (str): Path to the input CSV file
         output_dir (str): Directory to save the output files
+        stream (bool): Read the input in chunks instead of loading it whole
+        chunksize (int): Rows per chunk in streaming mode
     
     Returns:
         dict: Mapping of species to output file paths
     """
+    if stream:
+        return split_dataset_by_species_streaming(input_file, output_dir, chunksize=chunksize)
+    
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
     # Load the dataset
     print(f"Loading dataset from {input_file}...")
-    try:
-        df = pd.read_csv(input_file, encoding='latin1')
-    except UnicodeDecodeError:
-        try:
-            df = pd.read_csv(input_file, encoding='ISO-8859-1')
-        except UnicodeDecodeError:
-            df = pd.read_csv(input_file, encoding='cp1252')
+    df = load_dataset(input_file)
     
-    # Get unique species
     species_column = 'Pet Species'
-    species_list = df[species_column].unique()
-    print(f"Found {len(species_list)} unique species: {species_list}")
     
     # Create a mapping of species to file paths
     species_files = {}
+    species_counts = {}
     
-    # Split and save by species
-    for species in species_list:
-        # Filter data for this species
-        species_data = df[df[species_column] == species]
-        
-        # Create a clean filename (replace spaces with underscores, lowercase)
-        species_clean = species.lower().replace(' ', '_')
-        output_file = os.path.join(output_dir, f"future_{species_clean}_disease.csv")
+    # Split and save by species in one grouping pass
+    groups = df.groupby(species_column, sort=False, observed=True)
+    print(f"Found {groups.ngroups} unique species: {list(groups.groups.keys())}")
+    
+    for species, species_data in groups:
+        output_file = os.path.join(output_dir, species_file_name(species))
         
         # Save to CSV
         species_data.to_csv(output_file, index=False)
         
         # Store in mapping
         species_files[species] = output_file
+        species_counts[species] = len(species_data)
         
         print(f"Saved {len(species_data)} records for {species} to {output_file}")
     
     # Create a summary file with counts
-    summary = pd.DataFrame({
-        'Species': list(species_files.keys()),
-        'Count': [len(df[df[species_column] == species]) for species in species_files.keys()],
-        'File': list(species_files.values())
-    })
+    write_species_summary(species_counts, species_files, output_dir)
     
-    summary_file = os.path.join(output_dir, "species_summary.csv")
-    summary.to_csv(summary_file, index=False)
-    print(f"Saved summary to {summary_file}")
+    return species_files
+
+def split_dataset_by_species_streaming(input_file, output_dir, chunksize=100000):
+    """
+    Split the dataset by species in a single pass over fixed-size chunks.
+    
+    Each chunk's rows are appended to per-species CSV writers and counts are
+    kept incrementally, so memory use depends on the chunk size rather than
+    the size of the export.
+    
+    Args:
+        input_file (str): Path to the input CSV file
+        output_dir (str): Directory to save the output files
+        chunksize (int): Rows per chunk
+    
+    Returns:
+        dict: Mapping of species to output file paths
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    species_column = 'Pet Species'
+    
+    print(f"Streaming dataset from {input_file} in chunks of {chunksize} rows...")
+    
+    for encoding in ['latin1', 'ISO-8859-1', 'cp1252']:
+        # Writers are keyed by output file so species differing only in case share one
+        writers = {}
+        species_files = {}
+        species_counts = {}
+        try:
+            for chunk in pd.read_csv(input_file, encoding=encoding, chunksize=chunksize):
+                for species, species_data in chunk.groupby(species_column, sort=False):
+                    output_file = os.path.join(output_dir, species_file_name(species))
+                    if output_file not in writers:
+                        writers[output_file] = open(output_file, 'w', newline='', encoding='utf-8')
+                        species_data.to_csv(writers[output_file], index=False)
+                        species_files[species] = output_file
+                    else:
+                        species_data.to_csv(writers[output_file], index=False, header=False)
+                        species_files.setdefault(species, output_file)
+                    species_counts[species] = species_counts.get(species, 0) + len(species_data)
+            break
+        except UnicodeDecodeError:
+            print(f"Could not decode {input_file} as {encoding}, retrying")
+        finally:
+            for writer in writers.values():
+                writer.close()
+    
+    for species, output_file in species_files.items():
+        print(f"Saved {species_counts[species]} records for {species} to {output_file}")
+    
+    write_species_summary(species_counts, species_files, output_dir)
     
     return species_files
 
 if __name__ == "__main__":
+    import argparse
+    
     # Get the current directory
     current_dir = os.path.dirname(os.path.abspath(__file__))
     
-    # Define input and output paths
-    input_file = os.path.join(current_dir, "..", "..", "futurediseases.csv")
-    output_dir = os.path.join(current_dir, "..", "..", "species_data")
+    parser = argparse.ArgumentParser(description='Split the disease dataset into per-species CSV files')
+    parser.add_argument('--input-file', type=str,
+                        default=os.path.join(current_dir, "..", "..", "futuredisease.csv"),
+                        help='Source CSV file')
+    parser.add_argument('--output-dir', type=str,
+                        default=os.path.join(current_dir, "..", "..", "species_data"),
+                        help='Directory to save the species files')
+    parser.add_argument('--stream', action='store_true',
+                        help='Split in a single chunked pass with constant memory')
+    parser.add_argument('--chunksize', type=int, default=100000,
+                        help='Rows per chunk in streaming mode')
+    args = parser.parse_args()
     
     # Split the dataset
-    species_files = split_dataset_by_species(input_file, output_dir)
\ No newline at end of file
+    species_files = split_dataset_by_species(
+        args.input_file, args.output_dir, stream=args.stream, chunksize=args.chunksize
+    )
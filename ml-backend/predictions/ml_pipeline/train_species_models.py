@@ -7,16 +7,24 @@ from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.feature_selection import SelectFromModel
 from sklearn.metrics import classification_report, accuracy_score, f1_score
-from sklearn.utils import resample
-from collections import Counter
 from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.utils.class_weight import compute_class_weight
 import joblib
 import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout, redirect_stderr
 
 # Add the current directory to the path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(current_dir)
 
+from feature_artifacts import save_symptom_vocabulary, save_frequency_tables
+from feature_artifacts import load_symptom_vocabulary, load_frequency_tables
+from dataset_cache import load_dataset, to_categorical
+from feedback_data import FEEDBACK_DIR_NAME, ID_COLUMN, load_feedback
+from model_registry import save_model, build_encoder
+from retraining.handle_imbalance import handle_class_imbalance
+
 # Define all necessary functions directly in this file
 
 def clean_data(data_path):
@@ -29,23 +37,32 @@ def clean_data(data_path):
     Returns:
         pandas.DataFrame: The cleaned data.
     """
-    # Load the data
-    try:
-        df = pd.read_csv(data_path, encoding='latin1')
-    except UnicodeDecodeError:
-        try:
-            df = pd.read_csv(data_path, encoding='ISO-8859-1')
-        except UnicodeDecodeError:
-            df = pd.read_csv(data_path, encoding='cp1252')
+    # Load the data (parsed once, then served from the columnar cache)
+    df = load_dataset(data_path)
     
     print(f"Loaded data with shape: {df.shape}")
     
+    return clean_dataframe(df)
+
+def clean_dataframe(df):
+    """
+    Fills missing values and removes duplicate rows.
+    
+    Args:
+        df (pandas.DataFrame): Loaded data.
+        
+    Returns:
+        pandas.DataFrame: The cleaned data.
+    """
     # Handle missing values
     print(f"Missing values before cleaning:\n{df.isnull().sum()}")
     
     # For categorical features: fill with mode or create 'Unknown' category
-    for col in df.select_dtypes(include=['object']).columns:
-        df[col] = df[col].fillna(df[col].mode()[0] if not df[col].mode().empty else 'Unknown')
+    for col in df.select_dtypes(include=['object', 'category']).columns:
+        fill_value = df[col].mode()[0] if not df[col].mode().empty else 'Unknown'
+        if isinstance(df[col].dtype, pd.CategoricalDtype) and fill_value not in df[col].cat.categories:
+            df[col] = df[col].cat.add_categories([fill_value])
+        df[col] = df[col].fillna(fill_value)
     
     # For numerical features: fill with median (more robust than mean)
     for col in df.select_dtypes(include=['number']).columns:
@@ -61,8 +78,18 @@ def clean_data(data_path):
     
     return df
 
-def improved_engineer_features(df):
-    """Enhanced feature engineering with text features and better encoding."""
+def improved_engineer_features(df, artifacts=None):
+    """
+    Enhanced feature engineering with text features and better encoding.
+    
+    Args:
+        df (pandas.DataFrame): The cleaned data.
+        artifacts (dict): Optional dict that receives the fitted transformers
+            needed to reproduce these features at serving time.
+        
+    Returns:
+        pandas.DataFrame: The engineered data.
+    """
     print("Performing improved feature engineering...")
     
     # Make a copy of the dataframe
@@ -105,6 +132,9 @@ def improved_engineer_features(df):
             )
             df_engineered = pd.concat([df_engineered, symptom_df], axis=1)
             
+            if artifacts is not None:
+                artifacts['symptom_vectorizer'] = vectorizer
+            
             print(f"Added {len(symptom_feature_names)} symptom text features")
         except Exception as e:
             print(f"Warning: Could not process symptom text features: {str(e)}")
@@ -144,7 +174,9 @@ def improved_engineer_features(df):
                 # Calculate frequency of each category
                 frequency = df_engineered[col].value_counts(normalize=True)
                 # Map frequencies back to the dataframe
-                df_engineered[f'{col}_Frequency'] = df_engineered[col].map(frequency)
+                df_engineered[f'{col}_Frequency'] = df_engineered[col].map(frequency).astype(float)
+                if artifacts is not None:
+                    artifacts.setdefault('frequency_tables', {})[col] = frequency
                 print(f"Frequency encoded {col} with {df_engineered[col].nunique()} unique values")
             except Exception as e:
                 print(f"Warning: Could not frequency encode {col}: {str(e)}")
@@ -174,7 +206,7 @@ def improved_engineer_features(df):
     print(f"Improved feature engineering complete. New shape: {df_engineered.shape}")
     return df_engineered
 
-def better_select_features(X, y, problem_type='classification', max_features=100):
+def better_select_features(X, y, problem_type='classification', max_features=100, artifacts=None, n_jobs=None):
     """
     Better feature selection using embedded methods like Random Forest importance.
     
@@ -183,6 +215,9 @@ def better_select_features(X, y, problem_type='classification', max_features=100
         y (pandas.Series): The target variable.
         problem_type (str): 'classification' or 'regression'.
         max_features (int): Maximum number of features to select.
+        artifacts (dict): Optional dict that receives the frequency tables
+            of the categorical columns encoded here.
+        n_jobs (int): Number of cores for the selection forest.
         
     Returns:
         list: List of selected feature names.
@@ -199,7 +234,9 @@ def better_select_features(X, y, problem_type='classification', max_features=100
             # Calculate frequency of each category
             frequency = X[col].value_counts(normalize=True)
             # Map frequencies back to the dataframe
-            X[f'{col}_Frequency'] = X[col].map(frequency)
+            X[f'{col}_Frequency'] = X[col].map(frequency).astype(float)
+            if artifacts is not None:
+                artifacts.setdefault('frequency_tables', {})[col] = frequency
         
         # Drop original categorical columns
         X = X.drop(columns=categorical_columns)
@@ -211,13 +248,13 @@ def better_select_features(X, y, problem_type='classification', max_features=100
     # Initialize the selector
     if problem_type == 'classification':
         selector = SelectFromModel(
-            RandomForestClassifier(n_estimators=100, random_state=42),
+            RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=n_jobs),
             max_features=max_features
         )
     else:  # regression
         from sklearn.ensemble import RandomForestRegressor
         selector = SelectFromModel(
-            RandomForestRegressor(n_estimators=100, random_state=42),
+            RandomForestRegressor(n_estimators=100, random_state=42, n_jobs=n_jobs),
             max_features=max_features
         )
     
@@ -247,98 +284,21 @@ def better_select_features(X, y, problem_type='classification', max_features=100
         print("Using all features instead")
         return X.columns.tolist()
 
-def handle_class_imbalance(X_train, y_train, method='undersample', min_samples=50, max_samples=500):
+def balanced_class_weights(y, classes):
     """
-    Handle class imbalance using resampling techniques.
+    The per-class weights ``class_weight='balanced'`` computes for a target.
     
     Args:
-        X_train (pandas.DataFrame): Training feature matrix.
-        y_train (pandas.Series): Training target variable.
-        method (str): 'undersample', 'oversample', or 'both'.
-        min_samples (int): Minimum samples per class after resampling.
-        max_samples (int): Maximum samples per class after resampling.
+        y (array-like): Target values
+        classes (array-like): Classes to weight, all present in y
         
     Returns:
-        tuple: (X_resampled, y_resampled) - Resampled training data.
+        dict: Class -> weight
     """
-    print(f"Handling class imbalance using {method} method...")
-    
-    # Count samples per class
-    class_counts = Counter(y_train)
-    print(f"Original class distribution: {len(class_counts)} classes")
-    print(f"Min class count: {min(class_counts.values())}, Max class count: {max(class_counts.values())}")
-    
-    # Combine X and y for resampling
-    train_data = pd.concat([X_train, pd.Series(y_train, name='target')], axis=1)
-    target_col = 'target'
-    
-    # Initialize resampled data
-    resampled_data = pd.DataFrame(columns=train_data.columns)
-    
-    if method in ['undersample', 'both']:
-        # Undersample majority classes
-        for class_val, count in class_counts.items():
-            class_data = train_data[train_data[target_col] == class_val]
-            
-            # If class has more than max_samples, undersample it
-            if count > max_samples:
-                class_data = resample(
-                    class_data, 
-                    replace=False,
-                    n_samples=max_samples,
-                    random_state=42
-                )
-            
-            resampled_data = pd.concat([resampled_data, class_data])
-    
-    if method in ['oversample', 'both']:
-        # Oversample minority classes
-        for class_val, count in class_counts.items():
-            if method == 'both':
-                # If we've already undersampled, get the class data from resampled_data
-                class_data = resampled_data[resampled_data[target_col] == class_val]
-                count = len(class_data)
-            else:
-                # Otherwise get it from the original data
-                class_data = train_data[train_data[target_col] == class_val]
-            
-            # If class has fewer than min_samples, oversample it
-            if count < min_samples:
-                # Calculate how many samples to generate
-                n_samples = min(min_samples, max(count * 2, min_samples))
-                
-                # Oversample with replacement
-                class_data_oversampled = resample(
-                    class_data,
-                    replace=True,
-                    n_samples=n_samples,
-                    random_state=42
-                )
-                
-                if method == 'both':
-                    # Remove original samples from resampled_data and add oversampled ones
-                    resampled_data = resampled_data[resampled_data[target_col] != class_val]
-                    resampled_data = pd.concat([resampled_data, class_data_oversampled])
-                else:
-                    # Add oversampled data to resampled_data
-                    resampled_data = pd.concat([resampled_data, class_data_oversampled])
-            elif method == 'oversample':
-                # If not oversampling this class, still add it to resampled_data
-                resampled_data = pd.concat([resampled_data, class_data])
-    
-    # Split back into X and y
-    X_resampled = resampled_data.drop(columns=[target_col])
-    y_resampled = resampled_data[target_col]
-    
-    # Print resampling results
-    new_class_counts = Counter(y_resampled)
-    print(f"After resampling: {len(new_class_counts)} classes")
-    print(f"Min class count: {min(new_class_counts.values())}, Max class count: {max(new_class_counts.values())}")
-    print(f"Original data shape: {X_train.shape}, Resampled data shape: {X_resampled.shape}")
-    
-    return X_resampled, y_resampled
+    weights = compute_class_weight('balanced', classes=np.asarray(classes), y=np.asarray(y))
+    return dict(zip(classes, weights))
 
-def train_species_model(species_file, target_column, output_dir, test_size=0.2):
+def train_species_model(species_file, target_column, output_dir, test_size=0.2, n_jobs=-1):
     """
     Train a model for a specific species.
     
@@ -347,6 +307,7 @@ def train_species_model(species_file, target_column, output_dir, test_size=0.2):
         target_column (str): Name of the target column
         output_dir (str): Directory to save the model and artifacts
         test_size (float): Proportion of data to use for testing
+        n_jobs (int): Number of cores for the random forests (-1 for all)
     
     Returns:
         tuple: (model, metrics) - The trained model and its performance metrics
@@ -363,11 +324,23 @@ def train_species_model(species_file, target_column, output_dir, test_size=0.2):
     
     # Step 1: Data Cleaning
     print("\nStep 1: Data Cleaning")
-    df = clean_data(species_file)
+    df = load_dataset(species_file)
+    print(f"Loaded data with shape: {df.shape}")
+    
+    # Add confirmed clinic outcomes exported by export_confirmed_predictions,
+    # before cleaning so they are filled and deduplicated like the CSV rows
+    feedback = load_feedback(os.path.join(os.path.dirname(species_file), FEEDBACK_DIR_NAME), species)
+    if not feedback.empty:
+        print(f"Adding {len(feedback)} confirmed predictions from the clinic")
+        # Categoricals with different categories concatenate as objects
+        df = to_categorical(pd.concat([df, feedback], ignore_index=True))
+    
+    df = clean_dataframe(df)
     
     # Step 2: Feature Engineering
     print("\nStep 2: Feature Engineering")
-    df_engineered = improved_engineer_features(df)
+    feature_artifacts = {}
+    df_engineered = improved_engineer_features(df, artifacts=feature_artifacts)
     
     # Step 3: Split data into features and target
     if target_column in df_engineered.columns:
@@ -383,7 +356,9 @@ def train_species_model(species_file, target_column, output_dir, test_size=0.2):
     
     # Step 4: Feature Selection
     print("\nStep 4: Feature Selection")
-    selected_features = better_select_features(X, y, max_features=50)
+    selected_features = better_select_features(
+        X, y, max_features=50, artifacts=feature_artifacts, n_jobs=n_jobs
+    )
     X_selected = X[selected_features]
     
     # Step 5: Split data into train and test sets
@@ -407,10 +382,13 @@ def train_species_model(species_file, target_column, output_dir, test_size=0.2):
         min_samples_leaf=2,
         class_weight='balanced',
         random_state=42,
-        n_jobs=-1
+        n_jobs=n_jobs
     )
     
     model.fit(X_train_balanced, y_train_balanced)
+    # Keep the weights 'balanced' used as an explicit dict, so incremental
+    # updates weight new trees by the original distribution
+    model.set_params(class_weight=balanced_class_weights(y_train_balanced, model.classes_))
     
     # Step 8: Evaluate the model
     print("\nStep 8: Evaluate Model")
@@ -430,7 +408,11 @@ def train_species_model(species_file, target_column, output_dir, test_size=0.2):
     # Step 9: Save the model and artifacts
     print("\nStep 9: Save Model and Artifacts")
     model_path = os.path.join(species_output_dir, 'model.pkl')
-    joblib.dump(model, model_path)
+    # Uncompressed so serving can memory-map it, and replaced in one step so
+    # the serving registry never loads a partial file
+    tmp_path = f"{model_path}.{os.getpid()}.tmp"
+    save_model(model, tmp_path)
+    os.replace(tmp_path, model_path)
     print(f"Model saved to {model_path}")
     
     # Save feature names
@@ -438,6 +420,16 @@ def train_species_model(species_file, target_column, output_dir, test_size=0.2):
     joblib.dump(selected_features, feature_names_path)
     print(f"Feature names saved to {feature_names_path}")
     
+    # Save the fitted symptom vocabulary so serving builds the same text features
+    if 'symptom_vectorizer' in feature_artifacts:
+        vocabulary_path = save_symptom_vocabulary(feature_artifacts['symptom_vectorizer'], species_output_dir)
+        print(f"Symptom vocabulary saved to {vocabulary_path}")
+    
+    # Save the frequency-encoding tables so serving looks up real frequencies
+    if 'frequency_tables' in feature_artifacts:
+        tables_path = save_frequency_tables(feature_artifacts['frequency_tables'], species_output_dir)
+        print(f"Frequency tables saved to {tables_path}")
+    
     # Save metrics
     metrics = {
         'accuracy': accuracy,
@@ -454,6 +446,167 @@ def train_species_model(species_file, target_column, output_dir, test_size=0.2):
     
     return model, metrics
 
+def update_species_model(species, new_data, output_dir, target_column='Future Disease', replay_file=None,
+                         n_new_trees=20, max_trees=None, replay_per_class=20, n_jobs=-1):
+    """
+    Grow an existing species forest with trees trained on new records.
+    
+    The saved model is refitted with ``warm_start`` so its current trees are
+    kept and only ``n_new_trees`` are trained, on the new records plus the most
+    recent ``replay_per_class`` rows of each disease from the species training
+    file. The replayed rows keep every known disease in the new trees' training
+    data, so all trees share one set of classes. With ``max_trees`` the oldest
+    trees are dropped once the forest grows past that size.
+    
+    Args:
+        species (str): Animal species
+        new_data (pandas.DataFrame): New records in the training column names
+        output_dir (str): Directory holding the species model directories
+        target_column (str): Name of the target column
+        replay_file (str): Species training CSV to replay recent rows from
+        n_new_trees (int): Number of trees to add
+        max_trees (int): Largest forest to keep, or None to keep every tree
+        replay_per_class (int): Recent training rows replayed per disease
+        n_jobs (int): Number of cores for fitting the new trees (-1 for all)
+    
+    Returns:
+        tuple: (model, metrics) - The updated model and its update metrics
+    """
+    species_output_dir = os.path.join(output_dir, species)
+    model_path = os.path.join(species_output_dir, 'model.pkl')
+    
+    # Loaded without memory-mapping: the forest is modified and the file rewritten
+    model = joblib.load(model_path)
+    features = joblib.load(os.path.join(species_output_dir, 'feature_names.pkl'))
+    encoder = build_encoder(
+        model, features, species,
+        load_symptom_vocabulary(species_output_dir), load_frequency_tables(species_output_dir)
+    )
+    classes = model.classes_.copy()
+    
+    # Same filling and deduplication as the training CSV
+    new_data = clean_dataframe(new_data.copy())
+    
+    # Diseases the forest has never seen can't be added tree by tree
+    known = new_data[target_column].astype(str).isin(classes)
+    if not known.all():
+        print(f"Skipping {(~known).sum()} new records with diseases the model doesn't know; "
+              f"they are picked up by the next full retrain")
+    new_data = new_data[known]
+    if new_data.empty:
+        raise ValueError(f"No new records for {species} with a disease known to the current model")
+    
+    training_data = [new_data]
+    replay = None
+    if replay_file is not None:
+        replay = clean_data(replay_file)
+        replay = replay[replay[target_column].astype(str).isin(classes)]
+        training_data.append(replay.groupby(target_column, observed=True).tail(replay_per_class))
+    training_data = pd.concat(training_data, ignore_index=True)
+    
+    missing = set(classes) - set(training_data[target_column].astype(str))
+    if missing:
+        raise ValueError(
+            f"Incremental update for {species} has no rows for {len(missing)} known diseases; "
+            f"pass a replay file or run a full retrain"
+        )
+    
+    def encode(df):
+        # Keep the feature names the forest was fitted with
+        X = encoder.encode_batch(df.drop(columns=[target_column]).to_dict('records'))
+        return pd.DataFrame(X, columns=encoder.feature_names), df[target_column].astype(str).to_numpy()
+    
+    X_new, y_new = encode(new_data)
+    X_train, y_train = encode(training_data)
+    accuracy_before = accuracy_score(y_new, model.predict(X_new))
+    
+    # A 'balanced' preset would be recomputed from the small update set; use
+    # the weights recorded at training time, or the full replay file's
+    # distribution for models saved before they were recorded
+    class_weight = model.class_weight
+    if isinstance(class_weight, str):
+        if replay is not None and set(classes) <= set(replay[target_column].astype(str)):
+            class_weight = balanced_class_weights(replay[target_column].astype(str), classes)
+        else:
+            class_weight = None
+        print(f"Replacing class_weight='{model.class_weight}' with "
+              f"{'weights from the replay file' if class_weight else 'unweighted classes'} for the new trees")
+    
+    n_trees_before = len(model.estimators_)
+    model.set_params(
+        warm_start=True, n_estimators=n_trees_before + n_new_trees, n_jobs=n_jobs, class_weight=class_weight
+    )
+    model.fit(X_train, y_train)
+    model.set_params(warm_start=False)
+    if not np.array_equal(model.classes_, classes):
+        raise ValueError(f"Incremental update for {species} changed the model's classes")
+    
+    # Drop the oldest trees to keep the forest within budget
+    if max_trees is not None and len(model.estimators_) > max_trees:
+        del model.estimators_[:len(model.estimators_) - max_trees]
+        model.n_estimators = max_trees
+    
+    accuracy_after = accuracy_score(y_new, model.predict(X_new))
+    print(f"Added {n_new_trees} trees to {species} on {len(training_data)} rows ({len(new_data)} new), "
+          f"{len(model.estimators_)} trees kept")
+    print(f"Accuracy on new records: {accuracy_before:.4f} -> {accuracy_after:.4f}")
+    
+    # Replace the model in one step so the serving registry never loads a partial file
+    tmp_path = f"{model_path}.{os.getpid()}.tmp"
+    save_model(model, tmp_path)
+    os.replace(tmp_path, model_path)
+    print(f"Model saved to {model_path}")
+    
+    metrics = {
+        'new_samples': len(new_data),
+        'training_samples': len(training_data),
+        'trees_added': n_new_trees,
+        'trees_pruned': n_trees_before + n_new_trees - len(model.estimators_),
+        'n_estimators': len(model.estimators_),
+        'accuracy_before': accuracy_before,
+        'accuracy_after': accuracy_after
+    }
+    
+    metrics_path = os.path.join(species_output_dir, 'metrics.json')
+    saved_metrics = {}
+    if os.path.exists(metrics_path):
+        with open(metrics_path, 'r') as f:
+            saved_metrics = json.load(f)
+    saved_metrics['last_incremental_update'] = metrics
+    with open(metrics_path, 'w') as f:
+        json.dump(saved_metrics, f, indent=4)
+    
+    return model, metrics
+
+def train_species_model_logged(species_file, target_column, output_dir, n_jobs):
+    """
+    Train one species model in a worker process, logging to its own file.
+    
+    Args:
+        species_file (str): Path to the species-specific CSV file
+        target_column (str): Name of the target column
+        output_dir (str): Directory to save the model and artifacts
+        n_jobs (int): Number of cores this species may use
+    
+    Returns:
+        tuple: (species, metrics, log_path)
+    """
+    species = os.path.basename(species_file).split('_')[1]
+    species_output_dir = os.path.join(output_dir, species)
+    os.makedirs(species_output_dir, exist_ok=True)
+    log_path = os.path.join(species_output_dir, 'training.log')
+    
+    with open(log_path, 'w') as log_file, redirect_stdout(log_file), redirect_stderr(log_file):
+        # Only the metrics go back to the parent; the model is already on disk
+        _, metrics = train_species_model(
+            species_file=species_file,
+            target_column=target_column,
+            output_dir=output_dir,
+            n_jobs=n_jobs
+        )
+    
+    return species, metrics, log_path
+
 def main():
     parser = argparse.ArgumentParser(description='Train species-specific disease prediction models')
     parser.add_argument('--data-dir', type=str, default='species_data',
@@ -464,6 +617,20 @@ def main():
                         help='Directory to save models and artifacts')
     parser.add_argument('--species', type=str, default='all',
                         help='Specific species to train (or "all" for all species)')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Number of species to train concurrently')
+    parser.add_argument('--cores', type=int, default=os.cpu_count() or 1,
+                        help='Total cores shared by all concurrent trainings')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Add trees to the existing model instead of training from scratch')
+    parser.add_argument('--new-data', type=str,
+                        help='CSV file or exported feedback part of new records for --incremental')
+    parser.add_argument('--new-trees', type=int, default=20,
+                        help='Number of trees added by --incremental')
+    parser.add_argument('--max-trees', type=int, default=None,
+                        help='Drop the oldest trees beyond this forest size')
+    parser.add_argument('--replay-per-class', type=int, default=20,
+                        help='Recent training rows per disease mixed into --incremental updates')
     
     args = parser.parse_args()
     
@@ -495,6 +662,37 @@ def main():
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
     
+    if args.incremental:
+        if args.species.lower() == 'all' or not args.new_data:
+            print("Error: --incremental needs a single --species and --new-data.")
+            sys.exit(1)
+        species_clean = args.species.lower().replace(' ', '_')
+        species_file = os.path.join(data_dir, f"future_{species_clean}_disease.csv")
+        if not os.path.exists(species_file):
+            print(f"Warning: {species_file} not found, updating without replayed training rows")
+            species_file = None
+        
+        if args.new_data.endswith('.parquet'):
+            new_data = pd.read_parquet(args.new_data)
+        elif args.new_data.endswith('.pkl'):
+            new_data = pd.read_pickle(args.new_data)
+        else:
+            new_data = load_dataset(args.new_data, categorical=False, use_cache=False)
+        new_data = new_data.drop(columns=[ID_COLUMN], errors='ignore')
+        
+        _, metrics = update_species_model(
+            species=species_clean,
+            new_data=new_data,
+            output_dir=output_dir,
+            target_column=args.target,
+            replay_file=species_file,
+            n_new_trees=args.new_trees,
+            max_trees=args.max_trees,
+            replay_per_class=args.replay_per_class
+        )
+        print(json.dumps(metrics, indent=4))
+        return
+    
     # Get species files
     if args.species.lower() == 'all':
         # Find all CSV files in the data directory
@@ -526,17 +724,39 @@ def main():
     
     # Train models for each species
     results = {}
-    for species_file in species_files:
-        try:
-            species = os.path.basename(species_file).split('_')[1]
-            model, metrics = train_species_model(
-                species_file=species_file,
-                target_column=args.target,
-                output_dir=output_dir
-            )
-            results[species] = metrics
-        except Exception as e:
-            print(f"Error training model for {species_file}: {str(e)}")
+    jobs = max(1, min(args.jobs, len(species_files)))
+    
+    if jobs == 1:
+        for species_file in species_files:
+            try:
+                species = os.path.basename(species_file).split('_')[1]
+                model, metrics = train_species_model(
+                    species_file=species_file,
+                    target_column=args.target,
+                    output_dir=output_dir
+                )
+                results[species] = metrics
+            except Exception as e:
+                print(f"Error training model for {species_file}: {str(e)}")
+    else:
+        # Split the core budget between concurrent species so the forests
+        # don't oversubscribe the machine
+        n_jobs = max(1, args.cores // jobs)
+        print(f"Training {len(species_files)} species with {jobs} workers, {n_jobs} cores each")
+        
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {
+                pool.submit(train_species_model_logged, species_file, args.target, output_dir, n_jobs): species_file
+                for species_file in species_files
+            }
+            for future in as_completed(futures):
+                species_file = futures[future]
+                try:
+                    species, metrics, log_path = future.result()
+                    results[species] = metrics
+                    print(f"Finished {species} (log: {log_path})")
+                except Exception as e:
+                    print(f"Error training model for {species_file}: {str(e)}")
     
     # Print summary of results
     print("\n\n" + "="*50)
@@ -4,42 +4,34 @@ import websockets
 import json
 import os
 import sys
-import joblib
 import pandas as pd
-import numpy as np
-import uuid
-from datetime import datetime
+from collections import Counter
 import inspect
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
 # Add the project root to the path
 current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.abspath(os.path.join(current_dir, '..', '..'))
 sys.path.append(project_root)
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
 
-# Load models for each species
-models = {}
-feature_names = {}
-species_list = ['dog', 'cat', 'chicken', 'fish', 'hamster', 'rabbit', 'snake', 'turtle']
-models_dir = os.path.join(project_root, 'species_models')
-
-print(f"Loading models from: {models_dir}")
-
-for species in species_list:
-    species_dir = os.path.join(models_dir, species)
-    model_path = os.path.join(species_dir, 'model.pkl')
-    features_path = os.path.join(species_dir, 'feature_names.pkl')
-    
-    if os.path.exists(model_path) and os.path.exists(features_path):
-        try:
-            models[species] = joblib.load(model_path)
-            feature_names[species] = joblib.load(features_path)
-            print(f"Loaded model for {species}")
-        except Exception as e:
-            print(f"Error loading model for {species}: {str(e)}")
-    else:
-        print(f"Model files not found for {species}")
-
-print(f"Loaded {len(models)} models")
+try:
+    from inference_batcher import InferenceBatcher
+    from feature_artifacts import tokenize_symptoms
+    from inference_service import (
+        registry, models_dir, feature_names, symptom_vocabularies, frequency_tables,
+        init_worker, score_patients, generate_clinical_report, prediction_cache
+    )
+except ImportError:
+    from .inference_batcher import InferenceBatcher
+    from .feature_artifacts import tokenize_symptoms
+    from .inference_service import (
+        registry, models_dir, feature_names, symptom_vocabularies, frequency_tables,
+        init_worker, score_patients, generate_clinical_report, prediction_cache
+    )
 
 # Prediction functions
 def preprocess_patient_data(patient_data, species):
@@ -88,15 +80,22 @@ def preprocess_patient_data(patient_data, species):
     
     # Process symptoms text if available
     if 'Symptoms' in df.columns and df['Symptoms'].iloc[0]:
-        # Simple keyword extraction (in a real system, you'd use the same vectorizer as training)
         symptoms_text = df['Symptoms'].iloc[0].lower()
-        common_symptoms = [
-            'vomiting', 'diarrhea', 'lethargy', 'fever', 'cough', 'sneezing',
-            'limping', 'pain', 'swelling', 'itching', 'rash', 'bleeding',
-            'loss', 'seizures'  # Added missing symptoms
-        ]
-        for symptom in common_symptoms:
-            df[f'Symptom_{symptom}'] = 1 if symptom in symptoms_text else 0
+        vocabulary = symptom_vocabularies.get(species)
+        if vocabulary is not None:
+            # Token counts over the vocabulary fitted at training time
+            token_counts = Counter(tokenize_symptoms(symptoms_text))
+            for token in vocabulary:
+                df[f'Symptom_{token}'] = token_counts.get(token, 0)
+        else:
+            # Simple keyword extraction for models trained without a saved vocabulary
+            common_symptoms = [
+                'vomiting', 'diarrhea', 'lethargy', 'fever', 'cough', 'sneezing',
+                'limping', 'pain', 'swelling', 'itching', 'rash', 'bleeding',
+                'loss', 'seizures'  # Added missing symptoms
+            ]
+            for symptom in common_symptoms:
+                df[f'Symptom_{symptom}'] = 1 if symptom in symptoms_text else 0
     
     # Add missing features that the model expects
     # Age_Weight_Ratio
@@ -105,20 +104,29 @@ def preprocess_patient_data(patient_data, species):
     else:
         df['Age_Weight_Ratio'] = 0  # Default value
     
-    # Frequency encodings (simplified)
-    if 'Breed' in df.columns:
+    # Frequency encodings
+    tables = frequency_tables.get(species)
+    if tables is not None:
+        # Look up the training frequencies; unseen or missing values get 0
+        for col, table in tables.items():
+            if col in df.columns:
+                df[f'{col}_Frequency'] = table.get(str(df[col].iloc[0]), 0.0)
+            else:
+                df[f'{col}_Frequency'] = 0.0
+    
+    # Defaults for models trained without saved frequency tables
+    if 'Breed' in df.columns and 'Breed_Frequency' not in df.columns:
         df['Breed_Frequency'] = 0.5  # Default value
     
-    if 'Past Diagnosis' in df.columns:
-        df['Past Diagnosis_Frequency'] = 0.5  # Default value
-    else:
+    if 'Past Diagnosis_Frequency' not in df.columns:
         df['Past Diagnosis_Frequency'] = 0.5  # Default value
     
-    if 'Symptoms' in df.columns:
+    if 'Symptoms' in df.columns and 'Symptoms_Frequency' not in df.columns:
         df['Symptoms_Frequency'] = 0.5  # Default value
     
     # Add Treatment_Frequency if needed
-    df['Treatment_Frequency'] = 0.5  # Default value
+    if 'Treatment_Frequency' not in df.columns:
+        df['Treatment_Frequency'] = 0.5  # Default value
     
     # Select only the features used by the model
     if species in feature_names:
@@ -147,142 +155,32 @@ def preprocess_patient_data(patient_data, species):
         print(f"No feature names available for species: {species}")
         return df
 
-def get_prediction_with_confidence(model, X, top_n=5):
-    """
-    Get predictions with confidence scores and return top N most likely diseases.
-    
-    Args:
-        model: Trained classifier with predict_proba method
-        X: Feature vector for prediction
-        top_n: Number of top predictions to return
-        
-    Returns:
-        List of (disease, probability) tuples
-    """
-    try:
-        # Ensure X has all the features the model expects
-        if hasattr(model, 'feature_names_in_'):
-            missing_features = [f for f in model.feature_names_in_ if f not in X.columns]
-            if missing_features:
-                print(f"Warning: Model expects features that are not in input: {missing_features}")
-                # Add missing features with zeros
-                for feature in missing_features:
-                    X[feature] = 0
-            
-            # Ensure correct order of features
-            X = X[model.feature_names_in_]
-        
-        # Get probability distribution across all classes
-        probabilities = model.predict_proba(X)[0]
-        
-        # Get class names
-        class_names = model.classes_
-        
-        # Create (disease, probability) pairs
-        disease_probs = [(class_names[i], float(probabilities[i])) for i in range(len(class_names))]
-        
-        # Sort by probability (descending)
-        disease_probs.sort(key=lambda x: x[1], reverse=True)
-        
-        # Return top N predictions
-        return disease_probs[:top_n]
-    except Exception as e:
-        print(f"Error in prediction: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        return [("Error in prediction", 0.0)]
+# Process pool used for scoring when the server runs with --workers
+executor = None
 
-def get_recommended_diagnostics(predictions, species):
+async def score_batch(species, patient_data_list):
     """
-    Get recommended diagnostics based on predicted diseases and species.
+    Score a batch of patients, off the event loop when a process pool is configured.
     
     Args:
-        predictions: List of (disease, probability) tuples
         species: Animal species
+        patient_data_list: List of patient information dictionaries
         
     Returns:
-        List of recommended diagnostic tests
+        List with one list of (disease, probability) tuples per patient
     """
-    # Basic diagnostics for all cases
-    diagnostics = ["Complete Blood Count (CBC)", "Biochemistry Panel"]
+    if executor is None:
+        results, _ = score_patients(species, patient_data_list)
+        return results
     
-    # Add disease-specific diagnostics
-    if predictions and len(predictions) > 0 and predictions[0][0] != "Error in prediction":
-        top_disease = predictions[0][0].lower()
-        
-        if any(term in top_disease for term in ["respiratory", "pneumonia", "bronchitis"]):
-            diagnostics.extend(["Chest X-ray", "Oxygen saturation measurement"])
-        
-        if any(term in top_disease for term in ["kidney", "renal", "urinary"]):
-            diagnostics.extend(["Urinalysis", "Kidney ultrasound"])
-        
-        if any(term in top_disease for term in ["liver", "hepatic", "jaundice"]):
-            diagnostics.extend(["Liver function tests", "Abdominal ultrasound"])
-        
-        if any(term in top_disease for term in ["cardiac", "heart", "murmur"]):
-            diagnostics.extend(["ECG", "Cardiac ultrasound"])
-        
-        if any(term in top_disease for term in ["neuro", "seizure", "paralysis"]):
-            diagnostics.extend(["Neurological examination", "MRI if available"])
-        
-        if any(term in top_disease for term in ["skin", "dermatitis", "allergy"]):
-            diagnostics.extend(["Skin scraping", "Cytology"])
-    
-    # Add species-specific diagnostics
-    if species.lower() == "dog":
-        if predictions and len(predictions) > 0 and predictions[0][0] != "Error in prediction":
-            top_disease = predictions[0][0].lower()
-            if any(term in top_disease for term in ["tick", "ehrlichia", "lyme"]):
-                diagnostics.append("Tick-borne disease panel")
-            if "parvo" in top_disease:
-                diagnostics.append("Parvovirus test")
-    
-    if species.lower() == "cat":
-        if predictions and len(predictions) > 0 and predictions[0][0] != "Error in prediction":
-            top_disease = predictions[0][0].lower()
-            if any(term in top_disease for term in ["urinary", "cystitis"]):
-                diagnostics.append("Urine culture")
-            if any(term in top_disease for term in ["fiv", "felv"]):
-                diagnostics.append("FIV/FeLV test")
-    
-    return diagnostics
+    # Workers compare this with their own copy and pick up reloads lazily
+    version = registry.current_version(species)
+    loop = asyncio.get_running_loop()
+    results, _ = await loop.run_in_executor(executor, score_patients, species, patient_data_list, version)
+    return results
 
-def generate_clinical_report(patient_data, predictions, species):
-    """
-    Generate a clinically useful report for veterinarians.
-    
-    Args:
-        patient_data: Dictionary of patient information
-        predictions: List of (disease, probability) tuples
-        species: Animal species
-        
-    Returns:
-        Dictionary with formatted report information
-    """
-    # Get recommended diagnostics
-    diagnostics = get_recommended_diagnostics(predictions, species)
-    
-    # Format predictions for display
-    formatted_predictions = []
-    for i, (disease, prob) in enumerate(predictions, 1):
-        confidence_level = "High" if prob > 0.7 else "Medium" if prob > 0.4 else "Low"
-        formatted_predictions.append({
-            "rank": i,
-            "disease": disease,
-            "probability": prob,
-            "confidence_level": confidence_level
-        })
-    
-    # Create report structure
-    report = {
-        "patient_info": {k: v for k, v in patient_data.items() if k != "Future Disease"},
-        "predictions": formatted_predictions,
-        "diagnostics": diagnostics,
-        "timestamp": datetime.now().isoformat(),
-        "report_id": str(uuid.uuid4())
-    }
-    
-    return report
+# Shared micro-batching queue; main() replaces it with the configured window
+batcher = InferenceBatcher(score_batch)
 
 # Message handler function - separated from the connection handler
 async def handle_message(websocket, message):
@@ -299,26 +197,46 @@ async def handle_message(websocket, message):
             await websocket.send(json.dumps({'type': 'pong'}))
             return
         
+        # Report batching statistics for tuning the batch window
+        if data.get('type') == 'stats':
+            stats = {'type': 'stats', 'stats': batcher.stats()}
+            # With --workers each scoring process keeps its own cache, which
+            # this process can't see, so cache stats are only reported inline
+            if executor is None:
+                stats['cache'] = prediction_cache.stats()
+            await websocket.send(json.dumps(stats))
+            return
+        
+        # Reload retrained models without restarting the server
+        if data.get('type') == 'reload':
+            species = data.get('species')
+            results = await registry.reload(species.lower() if species else None)
+            await websocket.send(json.dumps({
+                'type': 'reload',
+                'results': results,
+                'versions': {name: entry.version for name, entry in registry.entries.items()}
+            }))
+            return
+        
         # Extract patient data and species
         patient_data = data.get('patient_data', {})
         species = data.get('species', '').lower()
         
         print(f"Processing prediction for species: {species}")
         
-        # Validate species
-        if species not in models:
-            error_msg = f"Species '{species}' not supported. Supported species: {list(models.keys())}"
+        # Validate species; the first request for a species loads its model
+        # in a background thread
+        if await registry.get_async(species) is None:
+            error_msg = f"Species '{species}' not supported. Supported species: {registry.supported_species()}"
             print(f"Error: {error_msg}")
             await websocket.send(json.dumps({
                 'error': error_msg
             }))
             return
         
-        # Preprocess patient data
-        X = preprocess_patient_data(patient_data, species)
-        
-        # Get predictions with confidence
-        predictions = get_prediction_with_confidence(models[species], X, top_n=5)
+        # Queue the patient; it is preprocessed and scored together with
+        # any other requests for this species that arrive in the same window
+        predictions = await batcher.submit(species, patient_data)
         
         # Generate clinical report
         report = generate_clinical_report(patient_data, predictions, species)
@@ -373,12 +291,43 @@ async def modern_handler(websocket):
         print(f"Unexpected error in connection handler: {str(e)}")
 
 # Start WebSocket server
-async def main():
+async def main(host="0.0.0.0", port=8765, batch_window_ms=5.0, max_batch_size=64, workers=0,
+               watch_interval=10.0, preload=False):
     # Use 0.0.0.0 to listen on all network interfaces, not just localhost
-    host = "0.0.0.0"
-    port = 8765
+    # (override with --host)
+    global batcher, executor
+    
+    if preload or workers > 0:
+        # Load every species before forking workers so they share its pages
+        # copy-on-write; the parent needs them anyway to track reloads
+        registry.load_all()
+    
+    if workers > 0:
+        # Score in worker processes so predictions never block pings or other sockets
+        print(f"Starting {workers} scoring worker processes")
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            # Only forked workers inherit the parent's models
+            mp_context=multiprocessing.get_context('fork') if sys.platform.startswith('linux') else None,
+            initializer=init_worker,
+            initargs=(models_dir,)
+        )
+    
+    batcher = InferenceBatcher(
+        score_batch,
+        max_batch_size=max_batch_size,
+        window_ms=batch_window_ms,
+        max_concurrency=max(1, workers)
+    )
+    
+    watcher = None
+    if watch_interval > 0:
+        # Pick up retrained models from species_models/ without dropping connections
+        print(f"Watching {models_dir} for new models every {watch_interval} s")
+        watcher = asyncio.ensure_future(registry.watch(watch_interval))
     
     print(f"Starting WebSocket server on {host}:{port}...")
+    print(f"Batching up to {max_batch_size} requests per species within {batch_window_ms} ms")
     
     try:
         # Check websockets version by inspecting the signature of websockets.serve
@@ -407,9 +356,43 @@ async def main():
         await asyncio.Future()
     except Exception as e:
         print(f"Error starting WebSocket server: {str(e)}")
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        await batcher.close()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='WebSocket server for species-specific disease prediction')
+    parser.add_argument('--host', type=str, default='0.0.0.0',
+                        help='Interface to listen on')
+    parser.add_argument('--port', type=int, default=8765,
+                        help='Port to listen on')
+    parser.add_argument('--batch-window-ms', type=float, default=5.0,
+                        help='How long to wait for more requests of the same species before scoring a batch')
+    parser.add_argument('--max-batch-size', type=int, default=64,
+                        help='Maximum number of requests scored in one batch')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='Number of scoring worker processes (0 scores on the event loop)')
+    parser.add_argument('--watch-interval', type=float, default=10.0,
+                        help='Seconds between checks for retrained models (0 disables watching)')
+    parser.add_argument('--preload', action='store_true',
+                        help='Load every species model at startup instead of on its first request '
+                             '(always done with --workers)')
+    return parser.parse_args()
 
 if __name__ == "__main__":
+    args = parse_args()
     try:
-        asyncio.run(main())
+        asyncio.run(main(
+            host=args.host,
+            port=args.port,
+            batch_window_ms=args.batch_window_ms,
+            max_batch_size=args.max_batch_size,
+            workers=args.workers,
+            watch_interval=args.watch_interval,
+            preload=args.preload
+        ))
     except KeyboardInterrupt:
         print("Server stopped by user")
\ No newline at end of file
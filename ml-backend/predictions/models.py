@@ -1,6 +1,12 @@
 from django.db import models
+from django.utils import timezone
 from pets.models import Pet, MedicalRecord
 
+class PredictionQuerySet(models.QuerySet):
+    def for_owner(self, user):
+        """Predictions for the user's pets, with each pet fetched in the same query."""
+        return self.filter(pet__owner=user).select_related('pet')
+
 class Prediction(models.Model):
     pet = models.ForeignKey(Pet, on_delete=models.CASCADE)
     medical_record = models.ForeignKey(MedicalRecord, on_delete=models.CASCADE)
@@ -15,6 +21,31 @@ class Prediction(models.Model):
         null=True, 
         blank=True
     )
+    # When the outcome was confirmed; the training export resumes from here
+    confirmed_at = models.DateTimeField(null=True, blank=True)
+
+    objects = PredictionQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-prediction_date', '-id']
+        indexes = [
+            # A pet's prediction history, newest first
+            models.Index(fields=['pet', '-prediction_date'], name='prediction_pet_date_idx'),
+            # Confirmations in export order
+            models.Index(fields=['confirmed_at', 'id'], name='prediction_confirmed_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Stamp the confirmation time whenever is_confirmed changes
+        confirmed_at = self.confirmed_at
+        if self.is_confirmed and self.confirmed_at is None:
+            self.confirmed_at = timezone.now()
+        elif not self.is_confirmed:
+            self.confirmed_at = None
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'is_confirmed' in update_fields and self.confirmed_at != confirmed_at:
+            kwargs['update_fields'] = set(update_fields) | {'confirmed_at'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Prediction for {self.pet.name}: {self.predicted_disease}"
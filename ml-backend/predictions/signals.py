@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .events import broadcast_predictions
+from .models import Prediction
+
+
+@receiver(post_save, sender=Prediction)
+def announce_prediction(sender, instance, created, **kwargs):
+    # bulk_create doesn't send post_save; bulk writers broadcast themselves
+    if created:
+        transaction.on_commit(lambda: broadcast_predictions([instance]))
@@ -1,3 +1,674 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+import warnings
+from contextlib import redirect_stdout, redirect_stderr
+from unittest import mock
 
-# Create your tests here.
+import joblib
+
+import numpy as np
+import pandas as pd
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+from sklearn.dummy import DummyClassifier
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import cross_val_score
+from sklearn.tree import DecisionTreeClassifier
+
+from pets.models import Pet, MedicalRecord
+from predictions.ml_pipeline import websocket_server
+from predictions.ml_pipeline.feature_encoder import PatientFeatureEncoder
+from predictions.ml_pipeline import inference_service
+from predictions.ml_pipeline import train_species_models
+from predictions.ml_pipeline.compiled_forest import CompiledForest, top_n_indices
+from predictions.ml_pipeline.feedback_data import load_feedback
+from predictions.ml_pipeline.model_registry import ModelRegistry
+from predictions.ml_pipeline.prediction_cache import PredictionCache, feature_key
+from predictions.models import Prediction
+from predictions.ml_pipeline.retraining import handle_imbalance
+from predictions.ml_pipeline.retraining import benchmark_imbalance
+from predictions.ml_pipeline.retraining import model_comparison
+from predictions.ml_pipeline.retraining import hyperparameter_tuning
+
+# Every kind of feature the live preprocessing can produce, plus raw inputs
+# and training-only features that are always zero at serving time
+ENCODER_FEATURES = [
+    'Age (years)', 'Weight (kg)', 'Age_Weight_Ratio',
+    'Age_Puppy/Kitten', 'Age_Young', 'Age_Adult', 'Age_Senior', 'Age_Geriatric',
+    'Weight_Tiny', 'Weight_Small', 'Weight_Medium', 'Weight_Large', 'Weight_Giant',
+    'Symptom_vomiting', 'Symptom_lethargy', 'Symptom_loss', 'Symptom_seizures', 'Symptom_wheezing',
+    'Breed_Frequency', 'Past Diagnosis_Frequency', 'Symptoms_Frequency', 'Treatment_Frequency',
+    'Pet Species_Dog', 'Age_Group_Adult', 'Had_Dehydration',
+]
+
+
+# Vocabulary as saved by a fitted CountVectorizer (token -> vectorizer column)
+SYMPTOM_VOCABULARY = {'appetite': 0, 'lethargy': 1, 'loss': 2, 'vomiting': 3, 'wheezing': 4}
+
+
+# Frequency tables as saved from value_counts(normalize=True)
+FREQUENCY_TABLES = {
+    'Breed': {'Aspin': 0.625, 'Beagle': 0.375},
+    'Past Diagnosis': {'Dehydration': 0.2, 'Unknown': 0.05},
+    'Treatment': {'Fluid therapy': 0.4},
+}
+
+
+class PatientFeatureEncoderTests(SimpleTestCase):
+    def assert_parity(self, patient_data, symptom_vocabulary=None, frequency_tables=None):
+        vocabularies = {'dog': symptom_vocabulary} if symptom_vocabulary is not None else {}
+        tables = {'dog': frequency_tables} if frequency_tables is not None else {}
+        with mock.patch.dict(websocket_server.feature_names, {'dog': ENCODER_FEATURES}), \
+                mock.patch.dict(websocket_server.symptom_vocabularies, vocabularies, clear=True), \
+                mock.patch.dict(websocket_server.frequency_tables, tables, clear=True):
+            expected = websocket_server.preprocess_patient_data(patient_data, 'dog').to_numpy(dtype=float)
+        encoded = PatientFeatureEncoder(ENCODER_FEATURES, symptom_vocabulary, frequency_tables).encode(patient_data)
+        np.testing.assert_array_equal(encoded, expected)
+
+    def test_matches_preprocess_patient_data(self):
+        self.assert_parity({
+            'Breed': 'Aspin',
+            'Age (years)': 5.8,
+            'Weight (kg)': 24.0,
+            'Past Diagnosis': 'Dehydration',
+            'Symptoms': 'Vomiting; Lethargy; Loss of appetite',
+            'Treatment': 'Fluid therapy'
+        })
+
+    def test_matches_on_bin_edges_and_out_of_range_values(self):
+        for age, weight in [(0, 0), (1, 2), (3, 5), (20, 50), (21, 60), (0.5, 1.5)]:
+            with self.subTest(age=age, weight=weight):
+                self.assert_parity({'Age (years)': age, 'Weight (kg)': weight, 'Symptoms': 'seizures'})
+
+    def test_matches_with_missing_fields(self):
+        self.assert_parity({})
+        self.assert_parity({'Age (years)': 4})
+        self.assert_parity({'Weight (kg)': 4.5, 'Symptoms': ''})
+        self.assert_parity({'Age (years)': float('nan'), 'Weight (kg)': 3, 'Symptoms': None})
+
+    def test_missing_numbers_are_scored_as_zero(self):
+        encoder = PatientFeatureEncoder(ENCODER_FEATURES)
+        np.testing.assert_array_equal(
+            encoder.encode({'Age (years)': None, 'Weight (kg)': float('nan'), 'Symptoms': 'cough'}),
+            encoder.encode({'Age (years)': 0.0, 'Weight (kg)': 0.0, 'Symptoms': 'cough'})
+        )
+
+    def test_matches_with_fitted_symptom_vocabulary(self):
+        self.assert_parity(
+            {'Age (years)': 3, 'Weight (kg)': 4, 'Symptoms': 'Vomiting; vomiting; Wheezing, loss of appetite'},
+            SYMPTOM_VOCABULARY
+        )
+        self.assert_parity({'Age (years)': 3, 'Symptoms': ''}, SYMPTOM_VOCABULARY)
+
+    def test_vocabulary_counts_tokens_like_count_vectorizer(self):
+        encoder = PatientFeatureEncoder(ENCODER_FEATURES, SYMPTOM_VOCABULARY)
+        row = encoder.encode({'Symptoms': 'Vomiting; vomiting, seizures'})[0]
+        self.assertEqual(row[ENCODER_FEATURES.index('Symptom_vomiting')], 2.0)
+        # 'seizures' is a model feature but not in the fitted vocabulary
+        self.assertEqual(row[ENCODER_FEATURES.index('Symptom_seizures')], 0.0)
+
+    def test_matches_with_saved_frequency_tables(self):
+        self.assert_parity({
+            'Breed': 'Beagle',
+            'Past Diagnosis': None,
+            'Symptoms': 'Panting',
+            'Treatment': 'Cooling therapy'
+        }, frequency_tables=FREQUENCY_TABLES)
+        self.assert_parity({'Age (years)': 2}, frequency_tables=FREQUENCY_TABLES)
+
+    def test_frequency_tables_replace_placeholder(self):
+        encoder = PatientFeatureEncoder(ENCODER_FEATURES, frequency_tables=FREQUENCY_TABLES)
+        row = encoder.encode({'Breed': 'Aspin', 'Treatment': 'Surgery', 'Symptoms': 'Cough'})[0]
+        self.assertEqual(row[ENCODER_FEATURES.index('Breed_Frequency')], 0.625)
+        self.assertEqual(row[ENCODER_FEATURES.index('Treatment_Frequency')], 0.0)
+        self.assertEqual(row[ENCODER_FEATURES.index('Past Diagnosis_Frequency')], 0.0)
+        # No table was saved for Symptoms, so it keeps the placeholder
+        self.assertEqual(row[ENCODER_FEATURES.index('Symptoms_Frequency')], 0.5)
+
+    def test_batch_matches_single_rows(self):
+        encoder = PatientFeatureEncoder(ENCODER_FEATURES)
+        patients = [
+            {'Age (years)': 2, 'Weight (kg)': 8, 'Symptoms': 'vomiting'},
+            {'Age (years)': 13, 'Weight (kg)': 30, 'Breed': 'Beagle'},
+        ]
+        batch = encoder.encode_batch(patients)
+        for i, patient_data in enumerate(patients):
+            np.testing.assert_array_equal(batch[i], encoder.encode(patient_data)[0])
+
+
+class HandleClassImbalanceTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        # Classes of very different sizes, interleaved and with a shuffled index
+        labels = ['Heatstroke'] * 40 + ['Parvo'] * 3 + ['Mange'] * 12 + ['Otitis'] * 1
+        labels = list(np.array(labels, dtype=object)[rng.permutation(len(labels))])
+        index = rng.permutation(len(labels)) + 100
+        self.X = pd.DataFrame({
+            'Age (years)': rng.uniform(0, 15, len(labels)),
+            'Weight (kg)': rng.uniform(1, 40, len(labels)),
+        }, index=index)
+        self.y = pd.Series(labels, index=index, name='Future Disease')
+
+    def test_matches_concat_implementation(self):
+        for method in ['undersample', 'oversample', 'both']:
+            with self.subTest(method=method), redirect_stdout(None):
+                expected_X, expected_y = benchmark_imbalance.handle_class_imbalance_concat(
+                    self.X, self.y, method=method, min_samples=5, max_samples=10
+                )
+                X, y = handle_imbalance.handle_class_imbalance(
+                    self.X, self.y, method=method, min_samples=5, max_samples=10
+                )
+            # The concat version can widen dtypes when it starts from an empty frame
+            pd.testing.assert_frame_equal(X, expected_X, check_dtype=False, check_index_type=False)
+            self.assertEqual(list(y.index), list(expected_y.index))
+            self.assertEqual(list(y), list(expected_y))
+
+
+class ModelRegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.species_dir = os.path.join(self.tmp.name, 'dog')
+        os.makedirs(self.species_dir)
+
+    def save_model(self, classes, mtime):
+        features = ['Age (years)', 'Weight (kg)']
+        model = DummyClassifier(strategy='prior').fit(np.zeros((len(classes), 2)), classes)
+        for name, obj in [('model.pkl', model), ('feature_names.pkl', features)]:
+            path = os.path.join(self.species_dir, name)
+            joblib.dump(obj, path)
+            # Explicit mtimes so the version changes even on coarse filesystems
+            os.utime(path, (mtime, mtime))
+
+    def test_reload_swaps_in_new_version(self):
+        self.save_model(['Parvo', 'Mange'], mtime=1000)
+        registry = ModelRegistry(self.tmp.name, ['dog'])
+        with redirect_stdout(None):
+            registry.load_all()
+        old_entry = registry.get('dog')
+
+        with redirect_stdout(None):
+            self.assertEqual(registry.reload_species('dog'), 'unchanged')
+            self.save_model(['Parvo', 'Mange', 'Otitis'], mtime=2000)
+            self.assertEqual(registry.reload_species('dog'), 'reloaded')
+
+        new_entry = registry.get('dog')
+        self.assertIsNot(new_entry, old_entry)
+        self.assertIs(registry.models['dog'], new_entry.model)
+        # A batch that took the old entry still scores on the old model
+        self.assertEqual(list(old_entry.model.classes_), ['Mange', 'Parvo'])
+        self.assertEqual(list(new_entry.model.classes_), ['Mange', 'Otitis', 'Parvo'])
+
+    def test_scores_encoded_rows_without_feature_name_warnings(self):
+        X = pd.DataFrame({'Age (years)': [1.0, 9.0], 'Weight (kg)': [4.0, 30.0]})
+        model = DecisionTreeClassifier(random_state=0).fit(X, ['Parvo', 'Arthritis'])
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            predictions = inference_service.get_batch_predictions_with_confidence(model, X.to_numpy(), top_n=1)
+        self.assertEqual(predictions, [[('Parvo', 1.0)], [('Arthritis', 1.0)]])
+
+    def test_reload_picks_up_new_encoder_artifacts(self):
+        self.save_model(['Parvo', 'Mange'], mtime=1000)
+        registry = ModelRegistry(self.tmp.name, ['dog'])
+        with redirect_stdout(None):
+            registry.load_all()
+            self.assertIsNone(registry.get('dog').frequency_tables)
+
+            # Retraining that only rewrites the frequency tables
+            with open(os.path.join(self.species_dir, 'frequency_tables.json'), 'w') as f:
+                json.dump(FREQUENCY_TABLES, f)
+            self.assertEqual(registry.reload_species('dog'), 'reloaded')
+        self.assertIsNotNone(registry.get('dog').frequency_tables)
+
+    def test_failed_warm_up_keeps_current_version(self):
+        self.save_model(['Parvo', 'Mange'], mtime=1000)
+        registry = ModelRegistry(self.tmp.name, ['dog'])
+        with redirect_stdout(None):
+            registry.load_all()
+        old_entry = registry.get('dog')
+
+        self.save_model(['Parvo', 'Mange', 'Otitis'], mtime=2000)
+        with mock.patch.object(registry, 'warm_up', side_effect=ValueError('bad model')), \
+                redirect_stdout(None):
+            with self.assertRaises(ValueError):
+                registry.reload_species('dog')
+        self.assertIs(registry.get('dog'), old_entry)
+
+    def test_species_load_lazily_on_first_use(self):
+        self.save_model(['Parvo', 'Mange'], mtime=1000)
+        registry = ModelRegistry(self.tmp.name, ['dog', 'cat'])
+        self.assertEqual(registry.entries, {})
+        self.assertEqual(registry.supported_species(), ['dog'])
+
+        with redirect_stdout(None):
+            entry = registry.get('dog')
+            self.assertIsNone(registry.get('cat'))
+        self.assertEqual(list(registry.entries), ['dog'])
+        self.assertIs(registry.get('dog'), entry)
+
+
+class PredictEndpointTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('vet', password='secret')
+        self.pet = Pet.objects.create(name='Bantay', owner=self.user, species='dog', breed='Aspin', age=5, weight=24.0)
+        self.record = MedicalRecord.objects.create(pet=self.pet, symptoms='Vomiting', diagnosis='Dehydration')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_predict_uses_species_model(self):
+        predictions = [('Parvovirus', 0.7), ('Gastroenteritis', 0.2)]
+        with mock.patch.object(inference_service, 'predict', return_value=(predictions, 'v1')) as predict:
+            response = self.client.post('/api/predictions/predictions/predict/', {
+                'pet_id': self.pet.id,
+                'medical_record_id': self.record.id,
+                'symptoms': 'Vomiting; lethargy'
+            }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        species, patient_data = predict.call_args[0]
+        self.assertEqual(species, 'dog')
+        self.assertEqual(patient_data['Symptoms'], 'Vomiting; lethargy')
+        self.assertEqual(patient_data['Past Diagnosis'], 'Dehydration')
+        prediction = Prediction.objects.get()
+        self.assertEqual(prediction.predicted_disease, 'Parvovirus')
+        self.assertEqual(prediction.details['model_version'], 'v1')
+
+    def test_scoring_failure_is_not_saved(self):
+        class BrokenModel:
+            classes_ = np.array(['Parvovirus'])
+
+            def predict_proba(self, X):
+                raise ValueError('model failed')
+
+        with redirect_stdout(None), redirect_stderr(None):
+            results = inference_service.get_batch_predictions_with_confidence(BrokenModel(), np.zeros((2, 3)))
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+
+        with mock.patch.object(inference_service, 'predict_batch', return_value=(results[:1], 'v1')):
+            response = self.client.post('/api/predictions/predictions/predict/', {
+                'pet_id': self.pet.id,
+                'medical_record_id': self.record.id
+            }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Prediction.objects.exists())
+
+    def test_unsupported_species_is_rejected(self):
+        self.pet.species = 'bird'
+        self.pet.save()
+        with redirect_stdout(None):
+            response = self.client.post('/api/predictions/predictions/predict/', {
+                'pet_id': self.pet.id,
+                'medical_record_id': self.record.id
+            }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('not supported', response.data['error'])
+
+
+class BatchPredictEndpointTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('shelter', password='secret')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.items = []
+        for i, species in enumerate(['dog', 'chicken', 'dog', 'chicken', 'dog']):
+            pet = Pet.objects.create(name=f'Pet {i}', owner=self.user, species=species, breed='Mixed', age=i, weight=2.0 + i)
+            record = MedicalRecord.objects.create(pet=pet, symptoms='Lethargy')
+            self.items.append({'pet_id': pet.id, 'medical_record_id': record.id})
+
+    def test_scores_each_species_once_and_saves_in_bulk(self):
+        def fake_predict_batch(species, patient_data_list):
+            return [[(f'{species}-disease', 0.9)] for _ in patient_data_list], 'v1'
+
+        other_user = User.objects.create_user('other', password='secret')
+        other_pet = Pet.objects.create(name='Other', owner=other_user, species='dog', breed='Mixed', age=1, weight=3.0)
+        other_record = MedicalRecord.objects.create(pet=other_pet, symptoms='Cough')
+        items = self.items + [{'pet_id': other_pet.id, 'medical_record_id': other_record.id}]
+
+        with mock.patch.object(inference_service, 'predict_batch', side_effect=fake_predict_batch) as predict_batch:
+            response = self.client.post('/api/predictions/predictions/batch/', {'items': items}, format='json')
+            lines = response.data['results']
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(call[0][0] for call in predict_batch.call_args_list), ['chicken', 'dog'])
+        self.assertEqual([line['index'] for line in lines], list(range(len(items))))
+        self.assertEqual(lines[1]['predicted_disease'], 'chicken-disease')
+        self.assertEqual(lines[2]['predicted_disease'], 'dog-disease')
+        # Another owner's pet is reported, not scored
+        self.assertIn('error', lines[-1])
+        self.assertEqual(Prediction.objects.count(), len(self.items))
+
+    def test_scoring_failures_are_reported_per_item(self):
+        def fake_predict_batch(species, patient_data_list):
+            if species == 'chicken':
+                return [ValueError('model failed') for _ in patient_data_list], 'v1'
+            return [[('Parvovirus', 0.9)] for _ in patient_data_list], 'v1'
+
+        with mock.patch.object(inference_service, 'predict_batch', side_effect=fake_predict_batch):
+            response = self.client.post('/api/predictions/predictions/batch/', {'items': self.items}, format='json')
+            lines = response.data['results']
+
+        self.assertEqual(lines[1], {'index': 1, 'error': 'model failed'})
+        self.assertEqual(lines[0]['predicted_disease'], 'Parvovirus')
+        self.assertEqual(
+            list(Prediction.objects.values_list('predicted_disease', flat=True).distinct()), ['Parvovirus']
+        )
+        self.assertEqual(Prediction.objects.count(), 3)
+
+    def test_bad_ids_are_reported_per_item(self):
+        items = self.items[:2] + [
+            {'pet_id': str(self.items[2]['pet_id']), 'medical_record_id': str(self.items[2]['medical_record_id'])},
+            {'pet_id': 'abc', 'medical_record_id': self.items[3]['medical_record_id']},
+            {'pet_id': [1], 'medical_record_id': {'id': 1}},
+        ]
+        with mock.patch.object(inference_service, 'predict_batch',
+                               side_effect=lambda species, rows: ([[('Parvovirus', 0.9)] for _ in rows], 'v1')):
+            response = self.client.post('/api/predictions/predictions/batch/', {'items': items}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        # Ids sent as numeric strings are looked up like integers
+        self.assertEqual(results[2]['pet_id'], self.items[2]['pet_id'])
+        for result in results[3:]:
+            self.assertEqual(set(result), {'index', 'error'})
+        self.assertEqual(Prediction.objects.count(), 3)
+
+    def test_rejects_empty_batch(self):
+        response = self.client.post('/api/predictions/predictions/batch/', {'items': []}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class PredictionCacheTests(SimpleTestCase):
+    def key(self, value, version='v1'):
+        return feature_key('dog', version, np.array([value, 1.0, 0.0]), 5)
+
+    def test_key_depends_on_features_and_model_version(self):
+        self.assertEqual(self.key(2.0), feature_key('dog', 'v1', np.array([2.0, 1.0, -0.0]), 5))
+        self.assertNotEqual(self.key(2.0), self.key(3.0))
+        self.assertNotEqual(self.key(2.0), self.key(2.0, version='v2'))
+
+    def test_lru_eviction_and_hit_rate(self):
+        cache = PredictionCache(max_entries=2)
+        cache.put(self.key(1), [('Parvo', 0.9)])
+        cache.put(self.key(2), [('Mange', 0.8)])
+        self.assertEqual(cache.get(self.key(1)), [('Parvo', 0.9)])
+        # Key 2 is now the least recently used
+        cache.put(self.key(3), [('Otitis', 0.7)])
+        self.assertIsNone(cache.get(self.key(2)))
+
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['evictions']), (1, 1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_ttl_expiry(self):
+        cache = PredictionCache(ttl_seconds=10)
+        with mock.patch('predictions.ml_pipeline.prediction_cache.time.monotonic', return_value=100.0):
+            cache.put(self.key(1), [('Parvo', 0.9)])
+        with mock.patch('predictions.ml_pipeline.prediction_cache.time.monotonic', return_value=111.0):
+            self.assertIsNone(cache.get(self.key(1)))
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_memory_cap(self):
+        cache = PredictionCache(max_bytes=2000)
+        for i in range(50):
+            cache.put(self.key(i), [('Disease %d' % i, 0.5)])
+        stats = cache.stats()
+        self.assertLessEqual(stats['bytes'], 2000)
+        self.assertLess(stats['entries'], 50)
+        self.assertGreater(stats['evictions'], 0)
+
+
+class CompareModelsTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.X = pd.DataFrame({
+            'Age (years)': rng.uniform(0, 15, 60),
+            'Weight (kg)': rng.uniform(1, 40, 60),
+        })
+        self.y = pd.Series(np.where(self.X['Age (years)'] > 7, 'Arthritis', 'Parvo'))
+
+    def test_matches_cross_val_score_and_reuses_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with redirect_stdout(None):
+                results, best_model_name = model_comparison.compare_models(
+                    self.X, self.y, cv=3, n_jobs=2, cache_dir=cache_dir
+                )
+            expected = cross_val_score(
+                DecisionTreeClassifier(random_state=42), self.X, self.y, cv=3, scoring='f1_weighted'
+            )
+            self.assertAlmostEqual(results['DecisionTree']['mean_score'], expected.mean())
+            self.assertIn(best_model_name, results)
+            for result in results.values():
+                self.assertGreaterEqual(result['peak_memory_mb'], 0)
+                self.assertGreater(result['fit_time'], 0)
+                self.assertEqual(result['cached_folds'], 0)
+
+            # Same data and parameters: nothing is refitted
+            with redirect_stdout(None), mock.patch.object(model_comparison, '_evaluate_fold') as evaluate_fold:
+                cached_results, _ = model_comparison.compare_models(
+                    self.X, self.y, cv=3, n_jobs=1, cache_dir=cache_dir
+                )
+            evaluate_fold.assert_not_called()
+            self.assertEqual(cached_results['DecisionTree']['mean_score'], results['DecisionTree']['mean_score'])
+            self.assertEqual(cached_results['DecisionTree']['cached_folds'], 3)
+
+            # A truncated entry is discarded and its fold fitted again
+            cache_files = sorted(
+                os.path.join(root, name) for root, _, names in os.walk(cache_dir) for name in names
+            )
+            with open(cache_files[0], 'r+b') as f:
+                f.truncate(10)
+            with redirect_stdout(None):
+                repaired_results, _ = model_comparison.compare_models(
+                    self.X, self.y, cv=3, n_jobs=1, cache_dir=cache_dir
+                )
+            self.assertEqual(sum(result['cached_folds'] for result in repaired_results.values()), len(cache_files) - 1)
+            self.assertEqual(repaired_results['DecisionTree']['mean_score'], results['DecisionTree']['mean_score'])
+
+
+class HyperparameterSearchTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.X = pd.DataFrame({
+            'Age (years)': rng.uniform(0, 15, 90),
+            'Weight (kg)': rng.uniform(1, 40, 90),
+        })
+        self.y = pd.Series(np.where(self.X['Age (years)'] > 7, 'Arthritis', 'Parvo'))
+
+    def test_search_methods_report_score_and_time(self):
+        with redirect_stdout(None):
+            report = hyperparameter_tuning.benchmark_search_methods(
+                self.X, self.y, 'KNN', methods=('grid', 'halving', 'bayes'), cv=3, n_trials=6
+            )
+        self.assertEqual(set(report), {'grid', 'halving', 'bayes'})
+        for result in report.values():
+            self.assertGreater(result['best_score'], 0.5)
+            self.assertGreater(result['time'], 0)
+
+    def test_halving_search_ends_near_the_largest_forest(self):
+        model, param_grid, scoring = hyperparameter_tuning.get_search_space('RandomForest')
+        for method in ['halving', 'halving_random']:
+            with redirect_stdout(None):
+                best_model, best_params, _ = hyperparameter_tuning.search_hyperparameters(
+                    model, param_grid, scoring, self.X, self.y, method=method, cv=3, n_trials=4
+                )
+            # 189 trees after 7/21/63 for the full grid, 198 after 66 for four candidates
+            self.assertGreaterEqual(best_model.n_estimators, 180)
+            self.assertEqual(best_params['n_estimators'], best_model.n_estimators)
+
+    def test_bayes_search_respects_trial_budget(self):
+        model, param_grid, scoring = hyperparameter_tuning.get_search_space('KNN')
+        with redirect_stdout(None), mock.patch.object(
+            hyperparameter_tuning, 'cross_val_score', wraps=hyperparameter_tuning.cross_val_score
+        ) as cv_score:
+            best_model, best_params, _ = hyperparameter_tuning.bayes_search(
+                model, param_grid, scoring, self.X, self.y, cv=3, n_trials=7
+            )
+        self.assertEqual(cv_score.call_count, 7)
+        self.assertEqual(best_model.get_params()['n_neighbors'], best_params['n_neighbors'])
+
+
+class IncrementalSpeciesModelTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        species_dir = os.path.join(self.tmp.name, 'dog')
+        os.makedirs(species_dir)
+
+        rng = np.random.RandomState(0)
+        self.records = pd.DataFrame({
+            'Age (years)': rng.uniform(0, 15, 60).round(1),
+            'Weight (kg)': rng.uniform(1, 40, 60).round(1),
+        })
+        self.records['Future Disease'] = np.where(self.records['Age (years)'] > 7, 'Arthritis', 'Parvo')
+        self.replay_file = os.path.join(self.tmp.name, 'future_dog_disease.csv')
+        self.records.to_csv(self.replay_file, index=False)
+
+        features = ['Age (years)', 'Weight (kg)']
+        model = RandomForestClassifier(n_estimators=5, class_weight='balanced', random_state=42)
+        model.fit(self.records[features], self.records['Future Disease'])
+        joblib.dump(model, os.path.join(species_dir, 'model.pkl'))
+        joblib.dump(features, os.path.join(species_dir, 'feature_names.pkl'))
+
+    def test_adds_trees_and_prunes_oldest(self):
+        new_data = pd.DataFrame({
+            'Age (years)': [2.0, 12.0, 9.0],
+            'Weight (kg)': [5.0, 30.0, 20.0],
+            'Future Disease': ['Parvo', 'Arthritis', 'Otitis'],
+        })
+        old_model = joblib.load(os.path.join(self.tmp.name, 'dog', 'model.pkl'))
+        with redirect_stdout(None):
+            model, metrics = train_species_models.update_species_model(
+                'dog', new_data, self.tmp.name, replay_file=self.replay_file,
+                n_new_trees=3, max_trees=6, replay_per_class=5, n_jobs=1
+            )
+
+        # Five old trees plus three new ones, minus the two oldest
+        self.assertEqual(len(model.estimators_), 6)
+        self.assertEqual((metrics['trees_added'], metrics['trees_pruned'], metrics['new_samples']), (3, 2, 2))
+        self.assertEqual(list(model.classes_), list(old_model.classes_))
+
+        saved = joblib.load(os.path.join(self.tmp.name, 'dog', 'model.pkl'))
+        self.assertEqual(saved.n_estimators, 6)
+        probabilities = saved.predict_proba(pd.DataFrame({'Age (years)': [3.0], 'Weight (kg)': [8.0]}))
+        self.assertEqual(probabilities.shape, (1, 2))
+
+    def test_new_trees_keep_the_original_class_weights(self):
+        # Only Parvo cases are new; 'balanced' recomputed on them would skew the new trees
+        new_data = pd.DataFrame({'Age (years)': [1.0, 2.0, 3.0], 'Weight (kg)': [4.0, 5.0, 6.0],
+                                 'Future Disease': ['Parvo'] * 3})
+        with redirect_stdout(None), warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always')
+            model, _ = train_species_models.update_species_model(
+                'dog', new_data, self.tmp.name, replay_file=self.replay_file,
+                n_new_trees=3, replay_per_class=2, n_jobs=1
+            )
+
+        self.assertFalse([w for w in caught if 'warm_start' in str(w.message)])
+        expected = train_species_models.balanced_class_weights(self.records['Future Disease'], model.classes_)
+        self.assertEqual(model.class_weight, expected)
+        # Every original class is still predicted
+        predicted = model.predict(self.records[['Age (years)', 'Weight (kg)']])
+        self.assertEqual(set(predicted), set(model.classes_))
+
+    def test_rejects_update_missing_known_diseases(self):
+        new_data = pd.DataFrame({'Age (years)': [2.0], 'Weight (kg)': [5.0], 'Future Disease': ['Parvo']})
+        with redirect_stdout(None), self.assertRaises(ValueError):
+            train_species_models.update_species_model('dog', new_data, self.tmp.name, n_new_trees=3)
+
+
+class ExportConfirmedPredictionsTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.user = User.objects.create_user('vet', password='secret')
+        pet = Pet.objects.create(name='Bantay', owner=self.user, species='dog', breed='Aspin', age=5, weight=24.0)
+        record = MedicalRecord.objects.create(pet=pet, symptoms='Vomiting', treatment='Fluid therapy')
+        self.predictions = [
+            Prediction.objects.create(pet=pet, medical_record=record, predicted_disease=disease, confidence_score=0.8)
+            for disease in ['Parvovirus', 'Heatstroke', 'Mange']
+        ]
+
+    def confirm(self, prediction):
+        prediction.is_confirmed = True
+        prediction.confirmed_by = self.user
+        prediction.save(update_fields=['is_confirmed', 'confirmed_by'])
+
+    def export(self):
+        call_command('export_confirmed_predictions', output_dir=self.tmp.name, stdout=io.StringIO())
+        return load_feedback(self.tmp.name, 'dog', categorical=False)
+
+    def test_exports_only_new_confirmations(self):
+        self.confirm(self.predictions[0])
+        self.confirm(self.predictions[1])
+        # One query to stamp untimed confirmations, one streamed export query
+        with self.assertNumQueries(2):
+            feedback = self.export()
+        self.assertEqual(sorted(feedback['Future Disease']), ['Heatstroke', 'Parvovirus'])
+        row = feedback.iloc[0]
+        self.assertEqual((row['Pet Species'], row['Breed'], row['Symptoms']), ('Dog', 'Aspin', 'Vomiting'))
+        self.assertEqual((row['Past Diagnosis'], row['Treatment']), ('Unknown', 'Fluid therapy'))
+
+        # Only the new confirmation is written on the next run
+        self.confirm(self.predictions[2])
+        feedback = self.export()
+        self.assertEqual(len(feedback), 3)
+        part_files = os.listdir(os.path.join(self.tmp.name, 'dog'))
+        self.assertEqual(len(part_files), 2)
+
+    def test_exports_confirmations_made_with_queryset_update(self):
+        Prediction.objects.filter(id=self.predictions[0].id).update(is_confirmed=True)
+        call_command(
+            'export_confirmed_predictions', output_dir=self.tmp.name, stdout=io.StringIO(), stderr=io.StringIO()
+        )
+        feedback = load_feedback(self.tmp.name, 'dog', categorical=False)
+        self.assertEqual(list(feedback['Future Disease']), ['Parvovirus'])
+
+    def test_confirmation_time_is_recorded(self):
+        prediction = self.predictions[0]
+        self.assertIsNone(prediction.confirmed_at)
+        self.confirm(prediction)
+        prediction.refresh_from_db()
+        self.assertIsNotNone(prediction.confirmed_at)
+
+
+class CompiledForestTests(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.RandomState(0)
+        self.X = rng.uniform(0, 40, (1000, 6))
+        y = np.array(['Parvo', 'Mange', 'Otitis', 'Heatstroke', 'Rabies', 'Distemper'])[
+            (self.X[:, 0] // 7 + (self.X[:, 1] > 20)).astype(int) % 6
+        ]
+        # One thread, so sklearn sums the trees in a fixed order
+        self.model = RandomForestClassifier(n_estimators=30, max_depth=12, random_state=42, n_jobs=1)
+        self.model.fit(self.X[:800], y[:800])
+        self.compiled = CompiledForest.from_model(self.model)
+
+    def test_probabilities_match_sklearn_exactly(self):
+        for X in [self.X[800:801], self.X[800:]]:
+            np.testing.assert_array_equal(self.compiled.predict_proba(X), self.model.predict_proba(X))
+
+    def test_stores_class_values_for_leaves_only(self):
+        n_leaves = sum(tree.tree_.n_leaves for tree in self.model.estimators_)
+        self.assertEqual(self.compiled.value.shape, (n_leaves, 6))
+
+    def test_top_n_matches_full_sort(self):
+        probabilities = np.random.RandomState(1).dirichlet(np.ones(40), size=100)
+        expected = np.argsort(-probabilities, axis=1)[:, :5]
+        np.testing.assert_array_equal(top_n_indices(probabilities, 5), expected)
+
+        # Forest outputs have ties; the selected probabilities still match
+        probabilities = self.model.predict_proba(self.X[800:])
+        top = np.take_along_axis(probabilities, top_n_indices(probabilities, 3), axis=1)
+        np.testing.assert_array_equal(top, -np.sort(-probabilities, axis=1)[:, :3])
+        self.assertEqual(top_n_indices(probabilities, 10).shape, (200, 6))
+
+    def test_batch_predictions_use_compiled_forest(self):
+        X = self.X[800:810]
+        self.assertEqual(
+            inference_service.get_batch_predictions_with_confidence(self.compiled, X, top_n=3),
+            inference_service.get_batch_predictions_with_confidence(self.model, X, top_n=3)
+        )
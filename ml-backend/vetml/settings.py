@@ -75,23 +75,77 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'vetml.wsgi.application'
-
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer',  # For development
-    },
-}
+ASGI_APPLICATION = 'vetml.asgi.application'
+
+# Channel layer: Redis (or any Redis-compatible server) when CHANNEL_REDIS_URL
+# is set, which group broadcasts need as soon as there is more than one ASGI
+# worker; otherwise the in-process layer for development
+CHANNEL_REDIS_URL = os.environ.get('CHANNEL_REDIS_URL')
+
+if CHANNEL_REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {
+                'hosts': [CHANNEL_REDIS_URL],
+                'capacity': int(os.environ.get('CHANNEL_LAYER_CAPACITY', '1000')),
+                'expiry': int(os.environ.get('CHANNEL_LAYER_EXPIRY', '60')),
+            },
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',  # For development
+        },
+    }
 
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# DB_ENGINE=postgresql for deployments; SQLite is meant for development and tests
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE in ('postgresql', 'postgres'):
+    DB_POOL = os.environ.get('DB_POOL', 'false').lower() in ('1', 'true', 'yes')
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'vetml'),
+            'USER': os.environ.get('DB_USER', 'vetml'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # Persistent connections; Django's pool (psycopg 3) manages its own
+            # connections and can't be combined with CONN_MAX_AGE
+            'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    if DB_POOL:
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+            'timeout': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                # WAL lets readers run alongside the single writer
+                'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+                # Take the write lock when a transaction starts, so a reader
+                # upgrading to a writer can't fail immediately with "database is locked"
+                'transaction_mode': 'IMMEDIATE',
+                # Seconds to wait for the write lock
+                'timeout': float(os.environ.get('DB_BUSY_TIMEOUT', '20')),
+            },
+        }
     }
-}
 
 
 # Password validation
@@ -150,6 +204,17 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Load the species prediction models when the app starts rather than on the
+# first /predict request (off by default so management commands stay fast)
+PREDICTION_MODEL_WARM_UP = os.environ.get('PREDICTION_MODEL_WARM_UP', 'false').lower() in ('1', 'true', 'yes')
+
+# Live predictions over Channels: scoring pool ('thread' or 'process') and
+# micro-batching of requests for the same species
+PREDICTION_EXECUTOR = os.environ.get('PREDICTION_EXECUTOR', 'thread')
+PREDICTION_EXECUTOR_WORKERS = int(os.environ.get('PREDICTION_EXECUTOR_WORKERS', '0')) or None
+PREDICTION_BATCH_WINDOW_MS = float(os.environ.get('PREDICTION_BATCH_WINDOW_MS', '5'))
+PREDICTION_MAX_BATCH_SIZE = int(os.environ.get('PREDICTION_MAX_BATCH_SIZE', '64'))
+
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
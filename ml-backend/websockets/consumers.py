@@ -0,0 +1,200 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+
+from pets.models import Pet, MedicalRecord
+from predictions.events import prediction_events_group
+from predictions.models import Prediction
+from predictions.ml_pipeline import inference_service
+from predictions.ml_pipeline.inference_batcher import InferenceBatcher
+
+# Scoring pool and batching queue shared by every connection in this ASGI process
+_executor = None
+_batcher = None
+_batcher_loop = None
+
+
+def get_executor():
+    """
+    Get the pool that runs CPU-bound scoring off the event loop.
+
+    ``PREDICTION_EXECUTOR`` selects a ``'thread'`` or ``'process'`` pool and
+    ``PREDICTION_EXECUTOR_WORKERS`` its size.
+
+    Returns:
+        concurrent.futures.Executor: The shared executor
+    """
+    global _executor
+    if _executor is None:
+        workers = getattr(settings, 'PREDICTION_EXECUTOR_WORKERS', None) or os.cpu_count() or 1
+        if getattr(settings, 'PREDICTION_EXECUTOR', 'thread') == 'process':
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=inference_service.init_worker,
+                initargs=(inference_service.models_dir,)
+            )
+        else:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='prediction')
+    return _executor
+
+
+async def score_batch(species, patient_data_list):
+    """
+    Score a batch of patients in the shared executor.
+
+    Args:
+        species: Animal species
+        patient_data_list: List of patient information dictionaries
+
+    Returns:
+        List with one (predictions, model version) tuple per patient, or the
+        exception raised for that patient
+    """
+    executor = get_executor()
+    version = inference_service.registry.current_version(species)
+    loop = asyncio.get_running_loop()
+    # Workers reload a species whose files changed since the version submitted,
+    # so record the version they report rather than the one they were sent
+    results, scored_version = await loop.run_in_executor(
+        executor, inference_service.score_patients, species, patient_data_list, version
+    )
+    return [result if isinstance(result, Exception) else (result, scored_version) for result in results]
+
+
+def get_batcher():
+    """Get the micro-batching queue shared by every connection in this process."""
+    global _batcher, _batcher_loop
+    # The batcher's queues and workers belong to one event loop
+    loop = asyncio.get_running_loop()
+    if _batcher is None or _batcher_loop is not loop:
+        _batcher_loop = loop
+        _batcher = InferenceBatcher(
+            score_batch,
+            max_batch_size=getattr(settings, 'PREDICTION_MAX_BATCH_SIZE', 64),
+            window_ms=getattr(settings, 'PREDICTION_BATCH_WINDOW_MS', 5.0),
+            max_concurrency=getattr(settings, 'PREDICTION_EXECUTOR_WORKERS', None) or os.cpu_count() or 1
+        )
+    return _batcher
+
+
+class PredictionConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Live species predictions over the Django ASGI server.
+
+    Speaks the same protocol as ``websocket_server.handle_message``; requests
+    that include ``pet_id`` and ``medical_record_id`` are also saved as
+    ``Prediction`` rows. Every connection also receives new predictions for
+    the user's pets as ``prediction.created`` messages.
+    """
+
+    events_group = None
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close()
+            return
+
+        if self.channel_layer is not None:
+            self.events_group = prediction_events_group(user.id)
+            await self.channel_layer.group_add(self.events_group, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, code):
+        if self.events_group is not None:
+            await self.channel_layer.group_discard(self.events_group, self.channel_name)
+
+    async def prediction_created(self, event):
+        """Forward predictions broadcast to the user's prediction-events group."""
+        await self.send_json({'type': 'prediction.created', 'predictions': event['predictions']})
+
+    async def receive_json(self, content, **kwargs):
+        try:
+            # Check if it's a ping message
+            if content.get('type') == 'ping':
+                await self.send_json({'type': 'pong'})
+                return
+
+            # Report batching statistics for tuning the batch window
+            if content.get('type') == 'stats':
+                stats = {'type': 'stats', 'stats': get_batcher().stats()}
+                # A process pool keeps one cache per worker, out of reach of this process
+                if not isinstance(get_executor(), ProcessPoolExecutor):
+                    stats['cache'] = inference_service.prediction_cache.stats()
+                await self.send_json(stats)
+                return
+
+            # Extract patient data and species
+            patient_data = content.get('patient_data', {})
+            species = content.get('species', '').lower()
+
+            # Predictions saved for a pet are always scored with its own species model
+            pet = medical_record = None
+            if content.get('pet_id') and content.get('medical_record_id'):
+                pet, medical_record = await self.get_pet_and_record(content['pet_id'], content['medical_record_id'])
+                if species and species != pet.species.lower():
+                    await self.send_json({
+                        'error': f"Species '{species}' does not match the pet's species '{pet.species}'"
+                    })
+                    return
+                species = pet.species.lower()
+
+            # Validate species against the model files; the model itself is
+            # loaded by whichever thread or worker process scores it
+            if not inference_service.registry.is_supported(species):
+                await self.send_json({
+                    'error': f"Species '{species}' not supported. "
+                             f"Supported species: {inference_service.registry.supported_species()}"
+                })
+                return
+
+            predictions, model_version = await get_batcher().submit(species, patient_data)
+
+            response = {
+                'success': True,
+                'predictions': [{'disease': disease, 'probability': prob} for disease, prob in predictions],
+                'report': inference_service.generate_clinical_report(patient_data, predictions, species)
+            }
+
+            # Persist the prediction when it belongs to a known pet
+            if pet is not None:
+                response['prediction_id'] = await self.save_prediction(
+                    pet, medical_record, species, predictions, model_version
+                )
+
+            await self.send_json(response)
+
+        except (Pet.DoesNotExist, MedicalRecord.DoesNotExist):
+            await self.send_json({'error': 'Pet or medical record not found'})
+        except Exception as e:
+            print(f"Error processing message: {str(e)}")
+            await self.send_json({'error': f"Error processing request: {str(e)}"})
+
+    @database_sync_to_async
+    def get_pet_and_record(self, pet_id, medical_record_id):
+        pet = Pet.objects.get(id=pet_id, owner=self.scope['user'])
+        medical_record = MedicalRecord.objects.get(id=medical_record_id, pet=pet)
+        return pet, medical_record
+
+    @database_sync_to_async
+    def save_prediction(self, pet, medical_record, species, predictions, model_version):
+        prediction = Prediction.objects.create(
+            pet=pet,
+            medical_record=medical_record,
+            predicted_disease=predictions[0][0],
+            confidence_score=predictions[0][1],
+            details={
+                'species': species,
+                'model_version': model_version,
+                'top_predictions': [
+                    {'disease': disease, 'probability': probability}
+                    for disease, probability in predictions
+                ],
+                'diagnostics': inference_service.get_recommended_diagnostics(predictions, species)
+            }
+        )
+        return prediction.id
@@ -0,0 +1,7 @@
+from django.urls import re_path
+
+from . import consumers
+
+websocket_urlpatterns = [
+    re_path(r'^ws/predictions/$', consumers.PredictionConsumer.as_asgi()),
+]
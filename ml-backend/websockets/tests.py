@@ -0,0 +1,151 @@
+import os
+from contextlib import redirect_stdout
+from unittest import mock
+
+import fakeredis
+from channels.db import database_sync_to_async
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import AnonymousUser, User
+from django.test import TransactionTestCase, override_settings
+from fakeredis.aioredis import FakeConnection
+
+from pets.models import Pet, MedicalRecord
+from predictions.models import Prediction
+from predictions.ml_pipeline import inference_service
+from websockets.consumers import PredictionConsumer
+
+
+def fake_score_patients(species, patient_data_list, version=None):
+    return [[('Parvovirus', 0.8), ('Gastroenteritis', 0.1)] for _ in patient_data_list], 'v2'
+
+
+class PredictionConsumerTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('vet', password='secret')
+        self.pet = Pet.objects.create(name='Bantay', owner=self.user, species='dog', breed='Aspin', age=5, weight=24.0)
+        self.record = MedicalRecord.objects.create(pet=self.pet, symptoms='Vomiting')
+        registry = inference_service.registry
+        self.patches = [
+            mock.patch.object(registry, 'is_supported', return_value=True),
+            mock.patch.object(registry, 'current_version', return_value='v1'),
+            mock.patch.object(inference_service, 'score_patients', side_effect=fake_score_patients),
+        ]
+        for patch in self.patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def communicator(self, user):
+        communicator = WebsocketCommunicator(PredictionConsumer.as_asgi(), '/ws/predictions/')
+        communicator.scope['user'] = user
+        return communicator
+
+    async def test_rejects_anonymous_users(self):
+        communicator = self.communicator(AnonymousUser())
+        connected, _ = await communicator.connect()
+        self.assertFalse(connected)
+
+    async def test_predicts_and_saves_prediction(self):
+        communicator = self.communicator(self.user)
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+
+        await communicator.send_json_to({'type': 'ping'})
+        self.assertEqual(await communicator.receive_json_from(), {'type': 'pong'})
+
+        with redirect_stdout(None):
+            await communicator.send_json_to({
+                'species': 'Dog',
+                'patient_data': {'Age (years)': 5, 'Weight (kg)': 24, 'Symptoms': 'vomiting'},
+                'pet_id': self.pet.id,
+                'medical_record_id': self.record.id
+            })
+            response = await communicator.receive_json_from(timeout=5)
+        await communicator.disconnect()
+
+        self.assertTrue(response['success'])
+        self.assertEqual(response['predictions'][0], {'disease': 'Parvovirus', 'probability': 0.8})
+        prediction = await Prediction.objects.aget(id=response['prediction_id'])
+        self.assertEqual(prediction.predicted_disease, 'Parvovirus')
+        # The version reported by the scorer, not the one the batch was submitted for
+        self.assertEqual(prediction.details['model_version'], 'v2')
+        self.assertIn('diagnostics', prediction.details)
+
+    async def test_validates_species_without_loading_the_model(self):
+        communicator = self.communicator(self.user)
+        self.assertTrue((await communicator.connect())[0])
+
+        with mock.patch.object(inference_service.registry, 'ensure_loaded') as ensure_loaded, redirect_stdout(None):
+            await communicator.send_json_to({
+                'species': 'dog',
+                'patient_data': {'Age (years)': 5, 'Weight (kg)': 24, 'Symptoms': 'vomiting'}
+            })
+            response = await communicator.receive_json_from(timeout=5)
+        await communicator.disconnect()
+
+        self.assertTrue(response['success'])
+        ensure_loaded.assert_not_called()
+
+    async def test_rejects_species_that_does_not_match_the_pet(self):
+        communicator = self.communicator(self.user)
+        self.assertTrue((await communicator.connect())[0])
+
+        await communicator.send_json_to({
+            'species': 'cat',
+            'patient_data': {'Age (years)': 5, 'Weight (kg)': 24, 'Symptoms': 'vomiting'},
+            'pet_id': self.pet.id,
+            'medical_record_id': self.record.id
+        })
+        response = await communicator.receive_json_from(timeout=5)
+        await communicator.disconnect()
+
+        self.assertIn('does not match', response['error'])
+        self.assertFalse(await Prediction.objects.aexists())
+
+
+class PredictionEventsTests(TransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('vet', password='secret')
+        self.other_user = User.objects.create_user('other', password='secret')
+        self.pet = Pet.objects.create(name='Bantay', owner=self.user, species='dog', breed='Aspin', age=5, weight=24.0)
+        self.record = MedicalRecord.objects.create(pet=self.pet, symptoms='Vomiting')
+
+    def communicator(self, user):
+        communicator = WebsocketCommunicator(PredictionConsumer.as_asgi(), '/ws/predictions/')
+        communicator.scope['user'] = user
+        return communicator
+
+    async def assert_fan_out(self):
+        owner = self.communicator(self.user)
+        other = self.communicator(self.other_user)
+        self.assertTrue((await owner.connect())[0])
+        self.assertTrue((await other.connect())[0])
+
+        prediction = await database_sync_to_async(Prediction.objects.create)(
+            pet=self.pet, medical_record=self.record, predicted_disease='Parvovirus', confidence_score=0.8
+        )
+
+        event = await owner.receive_json_from(timeout=5)
+        self.assertEqual(event['type'], 'prediction.created')
+        self.assertEqual([item['id'] for item in event['predictions']], [prediction.id])
+        # Clinicians of other owners don't see it
+        self.assertTrue(await other.receive_nothing(timeout=0.2))
+
+        await owner.disconnect()
+        await other.disconnect()
+
+    async def test_new_predictions_fan_out_to_owner(self):
+        await self.assert_fan_out()
+
+    async def test_new_predictions_fan_out_through_redis(self):
+        # An in-process fakeredis server unless CHANNEL_REDIS_TEST_URL points at a real Redis;
+        # channels_redis builds its connection pools from the host dict
+        host = os.environ.get('CHANNEL_REDIS_TEST_URL') or {
+            'connection_class': FakeConnection, 'server': fakeredis.FakeServer()
+        }
+        with override_settings(CHANNEL_LAYERS={
+            'default': {
+                'BACKEND': 'channels_redis.core.RedisChannelLayer',
+                'CONFIG': {'hosts': [host]},
+            },
+        }):
+            await self.assert_fan_out()